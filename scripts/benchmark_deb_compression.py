@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+from argparse import ArgumentParser
+from argparse import RawTextHelpFormatter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from robenv.deb.archive import read_deb
+from robenv.ros_package.deb_compression import DebCompression
+
+
+def _collect_debs(paths: list[Path]) -> list[Path]:
+    debs: list[Path] = []
+    for path in paths:
+        debs.extend(sorted(path.glob("*.deb")) if path.is_dir() else [path])
+    return debs
+
+
+def _benchmark(roots: list[Path], compression: DebCompression | None, output: Path) -> tuple[float, float, int]:
+    """Build and extract all package roots, returns the build seconds, the extraction seconds and the total size."""
+    output.mkdir()
+    # without a compression dpkg-deb chooses, as it does for `robenv install` without --deb-compression
+    environment = {**os.environ, **compression.get_environment()} if compression is not None else dict(os.environ)
+    arguments = [compression.dpkg_deb_arguments] if compression is not None else []
+
+    start = time.perf_counter()
+    for root in roots:
+        subprocess.run(
+            [  # noqa: S603, S607
+                "dpkg-deb",
+                "--build",
+                "--root-owner-group",
+                *arguments,
+                str(root),
+                str(output / f"{root.name}.deb"),
+            ],
+            check=True,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+        )
+    build_time = time.perf_counter() - start
+
+    debs = sorted(output.glob("*.deb"))
+    start = time.perf_counter()
+    for deb in debs:
+        read_deb(deb, extract_to=output / deb.stem)
+    extract_time = time.perf_counter() - start
+
+    return build_time, extract_time, sum(deb.stat().st_size for deb in debs)
+
+
+def main() -> None:
+    arg_parse = ArgumentParser(
+        formatter_class=RawTextHelpFormatter,
+        description="Compare the deb compressions of `robenv install --deb-compression`",
+        epilog=f"""Examples:
+    Benchmark the debs of a workspace build:
+        {sys.argv[0]} dist
+""",
+    )
+    arg_parse.add_argument(
+        "debs",
+        metavar="DEB",
+        nargs="+",
+        type=Path,
+        help="deb-files or folders containing them, e.g. the dist folder of `robenv install`",
+    )
+    args = arg_parse.parse_args()
+
+    debs = _collect_debs(args.debs)
+    if len(debs) == 0:
+        print("No deb-files found")
+        raise SystemExit(1)
+
+    with TemporaryDirectory() as temporary_directory:
+        work = Path(temporary_directory)
+        roots = []
+        for deb in debs:
+            root = work / "roots" / deb.stem
+            root.parent.mkdir(exist_ok=True)
+            subprocess.run(["dpkg-deb", "--raw-extract", str(deb), str(root)], check=True)  # noqa: S603, S607
+            roots.append(root)
+
+        print(f"{len(roots)} deb-files")
+        print(f"{'compression':<12}{'build [s]':>12}{'extract [s]':>14}{'size [KiB]':>14}")
+        for compression in [None, *DebCompression]:
+            name = compression.value if compression is not None else "default"
+            build_time, extract_time, size = _benchmark(roots, compression, work / name)
+            print(f"{name:<12}{build_time:>12.2f}{extract_time:>14.2f}{size // 1024:>14}")
+
+
+if __name__ == "__main__":
+    main()
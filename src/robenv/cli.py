@@ -41,6 +41,7 @@ from robenv.commands.clear_cache import ClearCacheCommand
 from robenv.commands.info import InfoCommand
 from robenv.commands.initialize import InitRobenvCommand
 from robenv.commands.install import InstallCommand
+from robenv.commands.owns import OwnsCommand
 from robenv.commands.remove import RemoveCommand
 from robenv.commands.rosdep_add import RosdepAddCommand
 from robenv.commands.rosdep_generate import RosdepGenerateCommand
@@ -64,6 +65,7 @@ commands = [
     RunCommand(),
     AddCommand(),
     ClearCacheCommand(),
+    OwnsCommand(),
 ]
 
 
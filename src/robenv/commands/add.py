@@ -31,6 +31,7 @@
 #
 from __future__ import annotations
 
+from concurrent.futures import CancelledError
 from dataclasses import dataclass
 from logging import getLogger
 from math import ceil
@@ -44,13 +45,15 @@ from cleo.helpers import argument
 from cleo.helpers import option
 from deb_pkg_tools.package import parse_filename
 
+from robenv.deb.archive import InvalidDebError
 from robenv.environment.env import DebName
+from robenv.environment.env import FileAlreadyInstalledError
 from robenv.environment.env import Installable
 from robenv.environment.env import RobEnv
-from robenv.environment.run_command import CommandAbortedError
-from robenv.environment.run_command import CommandFailedError
 from robenv.environment.run_command import run_command
 from robenv.ros_package.package import PackageName
+from robenv.rosdep.rosdep import ResolvedPackageName
+from robenv.rosdep.rosdep import Rosdep
 from robenv.util.file_logger import write_log
 
 
@@ -171,19 +174,47 @@ class AddCommand(Command):
                 _logger.error("deb file: %s doesn't exist", str(candidate.path))
                 return 3
 
-            _logger.info("Installing %s", candidate.name)
-            try:
-                installable = Installable(PackageName(candidate.name), DebName(candidate.path.name), candidate.path)
-                robenv.install(installable, overwrite=self.option("overwrite"), check_dependencies=check_dependencies)
-                _logger.info("install %s was successful", candidate.path.name)
-            except CommandAbortedError:
-                _logger.exception("install %s aborted", candidate.name)
-                return 2
-            except CommandFailedError as e:
-                _logger.exception("Command failed unexpectedly")
-                write_log(robenv.path, candidate.name, e.output)
-                _logger.exception("install %s failed", candidate.name)
-                return 1
-            # for NOTUSED see https://github.com/python-poetry/cleo/issues/130
-            self.call("rosdep add", f"NOTUSED {candidate.name} {parse_filename(candidate.path.name).name}")
-        return 0
+        names = ", ".join(candidate.name for candidate in candidates)
+        _logger.info("Installing %s", names)
+        exit_code = 0
+        try:
+            robenv.install_many(
+                [
+                    Installable(PackageName(candidate.name), DebName(candidate.path.name), candidate.path)
+                    for candidate in candidates
+                ],
+                overwrite=self.option("overwrite"),
+                check_dependencies=check_dependencies,
+            )
+            _logger.info("install %s was successful", names)
+        except CancelledError:
+            _logger.exception("install %s aborted", names)
+            return 2
+        except InvalidDebError as e:
+            failed = next((candidate.name for candidate in candidates if candidate.path == e.path), names)
+            _logger.exception("install %s failed", failed)
+            write_log(robenv.path, failed, str(e))
+            exit_code = 1
+        except (FileAlreadyInstalledError, OSError) as e:
+            _logger.exception("install %s failed", names)
+            write_log(robenv.path, names, str(e))
+            exit_code = 1
+
+        self._add_to_rosdep(
+            robenv,
+            [candidate for candidate in candidates if robenv.is_installed(PackageName(candidate.name))],
+        )
+        return exit_code
+
+    @staticmethod
+    def _add_to_rosdep(robenv: RobEnv, candidates: list[Candidates]) -> None:
+        if len(candidates) == 0:
+            return
+
+        rosdep = robenv.rosdep
+        system = Rosdep.get_rosdep_system()
+        for candidate in candidates:
+            resolved_name = ResolvedPackageName(parse_filename(candidate.path.name).name)
+            rosdep.add(system, PackageName(candidate.name), resolved_name)
+        rosdep.save()
+        _logger.info("Added dependencies to rosdep structure")
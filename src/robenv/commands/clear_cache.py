@@ -38,6 +38,7 @@ from cleo.helpers import argument
 
 from robenv.catkin_profile import CatkinProfile
 from robenv.ros_package.builder import Builder
+from robenv.ros_package.package_cache import PackageCache
 from robenv.ros_package.workspace import ROSWorkspace
 
 
@@ -56,6 +57,7 @@ class ClearCacheCommand(Command):
         workspace = ROSWorkspace.from_workspace(
             workspace_path=Path(self.argument("workspace")),
             profile=CatkinProfile.with_no_blacklist(),
+            package_cache=PackageCache.default(),
         )
 
         for package in workspace.ros_packages:
@@ -33,21 +33,42 @@ from __future__ import annotations
 
 from logging import getLogger
 from pathlib import Path
+from shutil import which
 
 from cleo.commands.command import Command
+from cleo.exceptions import CleoUserError
 from cleo.helpers import argument
 from cleo.helpers import option
 
 from robenv.commands.util import get_workspace
 from robenv.environment.env import RobEnv
+from robenv.environment.run_command import CommandFailedError
+from robenv.environment.run_command import run_command
+from robenv.ros_package.build_cache import BuildCache
+from robenv.ros_package.build_directories import BuildDirectories
 from robenv.ros_package.builder import Builder
+from robenv.ros_package.builder import BuildResult
 from robenv.ros_package.checker import Checker
+from robenv.ros_package.compiler_cache import CompilerCache
+from robenv.ros_package.compiler_cache import CompilerCacheStatistics
+from robenv.ros_package.deb_compression import DebCompression
+from robenv.ros_package.debian_cache import DebianCache
+from robenv.ros_package.memory_history import BuildMemoryHistory
 from robenv.util.cpu_count import get_cpu_count
+from robenv.util.jobserver import Jobserver
+from robenv.util.pressure import AdaptiveConcurrency
+from robenv.util.size import parse_size
 
 
 _logger = getLogger(__name__)
 
 
+class InvalidDebCompressionError(CleoUserError):
+    def __init__(self, compression: str) -> None:
+        choices = ", ".join(choice.value for choice in DebCompression)
+        super().__init__(f"'{compression}' is not a valid deb compression, choose one of: {choices}")
+
+
 class InstallCommand(Command):
     name = "install"
     aliases = ["build"]
@@ -99,9 +120,65 @@ class InstallCommand(Command):
             short_name="j",
             flag=False,
             description="How many projects can we build concurrently at maximum? "
-            "0 or below means that we use your core-count",
+            "0 or below means that we use your core-count, "
+            "auto adapts it up to your core-count to the CPU and memory pressure of the system",
+            value_required=False,
+        ),
+        option(
+            "cpu-budget",
+            flag=False,
+            description="How many compile jobs may run at once across all concurrent package builds? "
+            "They share a make jobserver, 0 or below means that we use your core-count",
             value_required=False,
         ),
+        option(
+            "memory-budget",
+            flag=False,
+            description="Only start further builds while their predicted peak memory usage stays below this, "
+            "e.g. 8G. By default the memory available at the start is used",
+        ),
+        option(
+            "no-memory-admission",
+            description="Start builds regardless of their predicted memory usage and don't record it",
+        ),
+        option(
+            "no-build-cache",
+            description="Always build packages and run bloom, even if an unchanged result is cached",
+        ),
+        option(
+            "build-cache-size",
+            flag=False,
+            description="Maximum size of each of the caches of built deb-files and debian folders, e.g. 512M or 5G",
+            default="5G",
+        ),
+        option(
+            "ccache",
+            description="Compile through ccache, so that rebuilds of packages reuse unchanged objects",
+        ),
+        option(
+            "ccache-size",
+            flag=False,
+            description="Maximum size of the ccache of the robenv, e.g. 512M or 5G",
+            default="5G",
+        ),
+        option(
+            "incremental",
+            description="Keep the build directories of cmake packages and build them with Ninja, "
+            "so that rebuilds only recompile what changed",
+        ),
+        option(
+            "incremental-size",
+            flag=False,
+            description="Maximum size of the kept build directories, e.g. 10G or 50G",
+            default="20G",
+        ),
+        option(
+            "deb-compression",
+            flag=False,
+            description="Compression of the built deb-files: none, zstd or xz. "
+            "By default dpkg-deb chooses, which usually means a slow single-threaded xz. "
+            "zstd needs dpkg-deb 1.21.18 or newer, focal's dpkg-deb does not support it",
+        ),
     ]
 
     @property
@@ -120,6 +197,72 @@ class InstallCommand(Command):
     def _check_will_fail(self) -> bool:
         return bool(self.option("check-launchfiles-will-fail"))
 
+    def _build_cache(self, robenv: RobEnv) -> BuildCache | None:
+        if self.option("no-build-cache"):
+            return None
+
+        return BuildCache(robenv.path / "cache/builds", parse_size(self.option("build-cache-size")))
+
+    def _debian_cache(self, robenv: RobEnv) -> DebianCache | None:
+        if self.option("no-build-cache"):
+            return None
+
+        return DebianCache(robenv.path / "cache/debian", parse_size(self.option("build-cache-size")))
+
+    def _compiler_cache(self, robenv: RobEnv) -> CompilerCache | None:
+        if not self.option("ccache"):
+            return None
+
+        if which("ccache") is None:
+            _logger.warning("ccache is not installed, building without it")
+            return None
+
+        return CompilerCache(robenv.path / "cache/ccache", parse_size(self.option("ccache-size")))
+
+    def _build_directories(self, robenv: RobEnv, cpu_budget: int | None) -> BuildDirectories | None:
+        if not self.option("incremental"):
+            return None
+
+        if which("ninja") is None:
+            _logger.warning("ninja is not installed, building from scratch")
+            return None
+
+        # ninja can't share the jobserver, so every concurrent build gets an equal part of the cores
+        ninja_jobs = max(1, (cpu_budget if cpu_budget is not None else get_cpu_count()) // self._jobs)
+        return BuildDirectories(
+            robenv.path / "cache/build-directories",
+            parse_size(self.option("incremental-size")),
+            ninja_jobs,
+        )
+
+    @property
+    def _deb_compression(self) -> DebCompression | None:
+        deb_compression = self.option("deb-compression")
+        if deb_compression is None:
+            return None
+
+        if deb_compression not in [choice.value for choice in DebCompression]:
+            raise InvalidDebCompressionError(deb_compression)
+
+        compression = DebCompression(deb_compression)
+        if compression is DebCompression.ZSTD and not self._dpkg_deb_supports_zstd():
+            _logger.warning("dpkg-deb does not support zstd compression, building the deb-files will fail")
+        return compression
+
+    @staticmethod
+    def _dpkg_deb_supports_zstd() -> bool:
+        try:
+            usage = run_command("dpkg-deb --help")
+        except CommandFailedError:
+            return False
+
+        allowed_types = next((line for line in usage.splitlines() if "Allowed types:" in line), "")
+        return "zstd" in allowed_types
+
+    @property
+    def _adaptive_jobs(self) -> bool:
+        return bool(self.option("jobs") == "auto")
+
     @property
     def _jobs(self) -> int:
         jobs = self.option("jobs")
@@ -127,11 +270,62 @@ class InstallCommand(Command):
         if jobs is None:
             return 1
 
-        if (job_count := int(jobs)) <= 0:
+        if self._adaptive_jobs or (job_count := int(jobs)) <= 0:
             return get_cpu_count(minimum=2)
 
         return job_count
 
+    @property
+    def _cpu_budget(self) -> int | None:
+        cpu_budget = self.option("cpu-budget")
+
+        if cpu_budget is None:
+            return None
+
+        if (budget := int(cpu_budget)) <= 0:
+            return get_cpu_count()
+
+        return budget
+
+    @property
+    def _memory_budget(self) -> int | None:
+        memory_budget = self.option("memory-budget")
+        return parse_size(memory_budget) if memory_budget is not None else None
+
+    @staticmethod
+    def _log_cache_statistics(build_result: BuildResult) -> None:
+        if any(build_result.cache_hits) or any(build_result.cache_misses):
+            _logger.info(
+                "Build cache: %s hits, %s misses",
+                len(build_result.cache_hits),
+                len(build_result.cache_misses),
+            )
+
+        if any(build_result.compiler_cache):
+            total = sum(build_result.compiler_cache.values(), CompilerCacheStatistics())
+            _logger.info("Compiler cache: %s hits, %s misses", total.hits, total.misses)
+            for package_name, statistics in build_result.compiler_cache.items():
+                _logger.info("\t%s: %s hits, %s misses", package_name, statistics.hits, statistics.misses)
+
+    @staticmethod
+    def _log_build_result(build_result: BuildResult) -> None:
+        if any(build_result.failed_packages):
+            _logger.error("Failed Packages:")
+            for package_name in build_result.failed_packages:
+                _logger.error("\t%s", package_name)
+
+        if any(build_result.skipped_packages):
+            _logger.error("Skipped Packages:")
+            for package_name, failed_dependency in build_result.skipped_packages.items():
+                _logger.error("\t%s (due to %s)", package_name, failed_dependency)
+
+        if any(build_result.missing_launch_files):
+            _logger.error("Missing launch files:")
+            for missing_launch_files in filter(bool, build_result.missing_launch_files):
+                _logger.error("\t%s:", str(missing_launch_files.package.name))
+                for file in missing_launch_files.missing_files:
+                    _logger.error("\t\t- %s", str(file.relative_to(missing_launch_files.package.path)))
+
     def handle(self) -> int:
         dist_folder = Path(self.option("dist-folder"))
         dist_folder.mkdir(exist_ok=True, parents=True)
@@ -141,6 +335,9 @@ class InstallCommand(Command):
         workspace_path = Path(self.argument("workspace")).resolve()
         workspace = get_workspace(workspace_path, robenv, self.option("catkin-folder"), self.option("catkin-profile"))
 
+        cpu_budget = self._cpu_budget
+        jobserver = Jobserver(cpu_budget) if cpu_budget is not None else None
+
         builder = Builder(
             robenv,
             dist_folder,
@@ -148,23 +345,31 @@ class InstallCommand(Command):
             max_workers=self._jobs,
             checker=Checker(check=self.check, check_will_fail=self._check_will_fail),
             can_fail=self._can_fail,
+            build_cache=self._build_cache(robenv),
+            debian_cache=self._debian_cache(robenv),
+            jobserver=jobserver,
+            memory_history=None if self.option("no-memory-admission") else BuildMemoryHistory(robenv.database),
+            memory_budget=self._memory_budget,
+            concurrency=AdaptiveConcurrency(self._jobs) if self._adaptive_jobs else None,
+            compiler_cache=self._compiler_cache(robenv),
+            build_directories=self._build_directories(robenv, cpu_budget),
+            deb_compression=self._deb_compression,
         )
 
-        if self._jobs != 1:
+        if self._adaptive_jobs:
+            _logger.info("Adapting the number of jobs to the system load, up to %s", self._jobs)
+        elif self._jobs != 1:
             _logger.info("Building with maximum of %s jobs", self._jobs)
+        if cpu_budget is not None:
+            _logger.info("Sharing %s compile jobs between all builds", cpu_budget)
 
-        build_result = builder.build_workspace(workspace)
-
-        if any(build_result.failed_packages):
-            _logger.error("Failed Packages:")
-            for package_name in build_result.failed_packages:
-                _logger.error("\t%s", package_name)
+        try:
+            build_result = builder.build_workspace(workspace)
+        finally:
+            if jobserver is not None:
+                jobserver.close()
 
-        if any(build_result.missing_launch_files):
-            _logger.error("Missing launch files:")
-            for missing_launch_files in filter(bool, build_result.missing_launch_files):
-                _logger.error("\t%s:", str(missing_launch_files.package.name))
-                for file in missing_launch_files.missing_files:
-                    _logger.error("\t\t- %s", str(file.relative_to(missing_launch_files.package.path)))
+        self._log_cache_statistics(build_result)
+        self._log_build_result(build_result)
 
         return 0
@@ -0,0 +1,80 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from logging import getLogger
+from pathlib import Path
+
+from cleo.commands.command import Command
+from cleo.helpers import argument
+
+from robenv.environment.env import RobEnv
+from robenv.util.paths import remove_slash_prefix
+
+
+_logger = getLogger(__name__)
+
+
+class OwnsCommand(Command):
+    name = "owns"
+    description = "Show which installed packages own a file in the robenv"
+    arguments = [
+        argument(
+            "paths",
+            description="Files inside the robenv, either as path on disk or as path within the package "
+            "(e.g. /opt/ros/noetic/lib/libadder.so)",
+            multiple=True,
+        ),
+    ]
+
+    @staticmethod
+    def _to_robenv_path(robenv: RobEnv, path: str) -> Path:
+        absolute_path = Path(path).absolute()
+        if robenv.path in absolute_path.parents:
+            return absolute_path
+
+        return robenv.path / remove_slash_prefix(path)
+
+    def handle(self) -> int:
+        robenv = RobEnv()
+
+        unowned = 0
+        for path in self.argument("paths"):
+            owners = robenv.get_owning_packages(self._to_robenv_path(robenv, path))
+            if len(owners) == 0:
+                _logger.warning("%s is not owned by any package", path)
+                unowned += 1
+                continue
+
+            _logger.info("%s: %s", path, ", ".join(owners))
+
+        return 1 if unowned else 0
@@ -44,6 +44,7 @@ from robenv.catkin_profile.profile import CatkinProfile
 from robenv.commands.util import NoRosInstallationDetectedError
 from robenv.commands.util import get_default_ros_path
 from robenv.environment.distro import parse_distro
+from robenv.ros_package.package_cache import PackageCache
 from robenv.ros_package.workspace import ROSWorkspace
 from robenv.rosdep.rosdep import Rosdep
 
@@ -88,6 +89,7 @@ class RosdepGenerateCommand(Command):
         workspace = ROSWorkspace.from_workspace(
             self._workspace_path,
             CatkinProfile.with_no_blacklist(),
+            PackageCache.default(),
         )
 
         dump = yaml.dump(
@@ -31,7 +31,6 @@
 #
 from __future__ import annotations
 
-from concurrent.futures import as_completed
 from logging import getLogger
 from pathlib import Path
 
@@ -43,9 +42,8 @@ from robenv.environment.env import RobEnv
 from robenv.ros_package.package import ExternalDependency
 from robenv.ros_package.package import PackageName
 from robenv.ros_package.package import ROSPackage
+from robenv.ros_package.package_cache import PackageCache
 from robenv.ros_package.workspace import ROSWorkspace
-from robenv.util.cancelable_executor import CancelableExecutor
-from robenv.util.cpu_count import get_cpu_count
 
 
 _logger = getLogger(__name__)
@@ -75,16 +73,14 @@ class RosdepVerifyCommand(Command):
         given_dependencies: list[ROSPackage] | list[ExternalDependency],
         robenv: RobEnv,
     ) -> list[tuple[PackageName, list[PackageName]]]:
-        with CancelableExecutor(max_workers=get_cpu_count(minimum=4)) as pool:
-            futures = {
-                pool.submit(robenv.rosdep.resolve, dependency.name): dependency for dependency in given_dependencies
-            }
+        result = robenv.rosdep.resolve_all(dependency.name for dependency in given_dependencies)
+        unresolvable = set(result.unresolvable)
 
-            return [
-                RosdepVerifyCommand._to_tuple(futures[future])
-                for future in as_completed(futures)
-                if future.exception() is not None
-            ]
+        return [
+            RosdepVerifyCommand._to_tuple(dependency)
+            for dependency in given_dependencies
+            if dependency.name in unresolvable
+        ]
 
     @staticmethod
     def _translate_required_by(required_by: list[PackageName]) -> str:
@@ -108,6 +104,7 @@ class RosdepVerifyCommand(Command):
         workspace = ROSWorkspace.from_workspace(
             Path(self.option("workspace")).resolve(),
             CatkinProfile.with_no_blacklist(),
+            PackageCache.default(),
         )
 
         internal_packages = workspace.sort_ros_packages_for_installation()
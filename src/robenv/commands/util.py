@@ -37,6 +37,7 @@ from robenv.catkin_profile.parse import get_profile
 from robenv.catkin_profile.profile import CatkinProfile
 from robenv.environment.distro import get_installed_distro_paths
 from robenv.environment.env import RobEnv
+from robenv.ros_package.package_cache import PackageCache
 from robenv.ros_package.workspace import ROSWorkspace
 
 
@@ -83,6 +84,7 @@ def get_workspace(
             ),
             profile_name,
         ),
+        PackageCache.default(),
     )
 
 
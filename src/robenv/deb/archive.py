@@ -0,0 +1,346 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import stat
+import subprocess
+import tarfile
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Thread
+from typing import IO
+from typing import Iterator
+from typing import Mapping
+from typing import cast
+
+from deb_pkg_tools.package import ArchiveEntry
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+_AR_MAGIC = b"!<arch>\n"
+_AR_HEADER_SIZE = 60
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class InvalidDebError(Exception):
+    def __init__(self, path: Path, reason: str) -> None:
+        super().__init__(f"Invalid deb-file {path!s}: {reason}")
+        self.path = path
+        self.reason = reason
+
+
+@dataclass
+class DebArchive:
+    """
+    Control fields and contents of a deb-file.
+
+    Control field names are lower case, contents are keyed like `dpkg-deb -c` lists them:
+    absolute paths with a trailing slash for directories.
+    """
+
+    path: Path
+    control: dict[str, str]
+    contents: dict[str, ArchiveEntry]
+
+
+class _MemberReader(io.RawIOBase):
+    """Read at most `size` bytes of the underlying file, which is one member of the ar container."""
+
+    def __init__(self, file: IO[bytes], size: int) -> None:
+        self._file = file
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._remaining == 0:
+            return 0
+        data = self._file.read(min(len(buffer), self._remaining))
+        self._remaining -= len(data)
+        buffer[: len(data)] = data
+        return len(data)
+
+    def skip(self) -> None:
+        while len(self.read(_COPY_BUFFER_SIZE) or b"") > 0:
+            pass
+
+
+def _iterate_ar(path: Path, file: IO[bytes]) -> Iterator[tuple[str, _MemberReader]]:
+    if file.read(len(_AR_MAGIC)) != _AR_MAGIC:
+        raise InvalidDebError(path, "not an ar archive")
+
+    while True:
+        header = file.read(_AR_HEADER_SIZE)
+        if len(header) == 0:
+            return
+        if len(header) != _AR_HEADER_SIZE or header[58:60] != b"`\n":
+            raise InvalidDebError(path, "truncated ar member header")
+
+        name = header[:16].decode().strip().rstrip("/")
+        size = int(header[48:58].decode())
+
+        member = _MemberReader(file, size)
+        yield name, member
+        member.skip()
+
+        if size % 2 == 1:
+            file.read(1)
+
+
+def _feed(source: IO[bytes], sink: IO[bytes]) -> None:
+    with sink:
+        shutil.copyfileobj(source, sink, _COPY_BUFFER_SIZE)
+
+
+@contextmanager
+def _zstd_process(path: Path, member: IO[bytes]) -> Iterator[IO[bytes]]:
+    with subprocess.Popen(
+        ["zstd", "--decompress", "--stdout"],  # noqa: S603, S607
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as process:
+        assert process.stdin is not None  # noqa: S101
+        assert process.stdout is not None  # noqa: S101
+        feeder = Thread(target=_feed, args=(member, process.stdin), daemon=True)
+        feeder.start()
+
+        try:
+            yield process.stdout
+            # drain, so the feeder is never blocked on a full pipe
+            shutil.copyfileobj(process.stdout, io.BytesIO(), _COPY_BUFFER_SIZE)
+        finally:
+            feeder.join()
+
+    if process.returncode != 0:
+        raise InvalidDebError(path, f"zstd exited with {process.returncode}")
+
+
+@contextmanager
+def _decompressed(path: Path, name: str, member: _MemberReader) -> Iterator[IO[bytes]]:
+    buffered = io.BufferedReader(member, _COPY_BUFFER_SIZE)
+    if name.endswith(".tar"):
+        yield buffered
+    elif name.endswith(".gz"):
+        with gzip.GzipFile(fileobj=buffered) as stream:
+            yield cast(IO[bytes], stream)
+    elif name.endswith(".xz"):
+        with lzma.LZMAFile(buffered) as stream:
+            yield stream
+    elif name.endswith(".bz2"):
+        with bz2.BZ2File(buffered) as stream:
+            yield stream
+    elif name.endswith(".zst"):
+        if zstandard is not None:
+            with zstandard.ZstdDecompressor().stream_reader(buffered) as stream:
+                yield stream
+        else:
+            with _zstd_process(path, buffered) as stream:
+                yield stream
+    else:
+        raise InvalidDebError(path, f"unsupported compression of {name}")
+
+
+def _parse_control(text: str) -> dict[str, str]:
+    control: dict[str, str] = {}
+    field = None
+    for line in text.splitlines():
+        if line.startswith((" ", "\t")) and field is not None:
+            control[field] += "\n" + line
+        elif ":" in line:
+            name, _, value = line.partition(":")
+            field = name.strip().lower()
+            control[field] = value.strip()
+    return control
+
+
+def _read_control(path: Path, name: str, member: _MemberReader) -> dict[str, str]:
+    with _decompressed(path, name, member) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+        for info in tar:
+            if info.isfile() and _to_relative(info.name) == "control":
+                control_file = tar.extractfile(info)
+                assert control_file is not None  # noqa: S101
+                return _parse_control(control_file.read().decode())
+
+    raise InvalidDebError(path, "control file is missing")
+
+
+def _to_relative(name: str) -> str:
+    # only the ./ prefix is stripped, names of hidden files and folders start with a dot themselves
+    return name[2:] if name.startswith("./") else name.lstrip("/")
+
+
+def _to_key(info: tarfile.TarInfo) -> str:
+    name = _to_relative(info.name)
+    if name in (".", ""):
+        return "/"
+    return f"/{name}/" if info.isdir() else f"/{name}"
+
+
+def _to_entry(info: tarfile.TarInfo) -> ArchiveEntry:
+    if info.issym():
+        file_type, target = stat.S_IFLNK, info.linkname
+    elif info.islnk():
+        file_type, target = stat.S_IFREG, "/" + _to_relative(info.linkname)
+    elif info.isdir():
+        file_type, target = stat.S_IFDIR, ""
+    elif info.ischr():
+        file_type, target = stat.S_IFCHR, ""
+    elif info.isblk():
+        file_type, target = stat.S_IFBLK, ""
+    elif info.isfifo():
+        file_type, target = stat.S_IFIFO, ""
+    else:
+        file_type, target = stat.S_IFREG, ""
+
+    permissions = stat.filemode(file_type | info.mode)
+    if info.islnk():
+        permissions = "h" + permissions[1:]
+
+    return ArchiveEntry(
+        permissions,
+        info.uname or str(info.uid),
+        info.gname or str(info.gid),
+        info.size,
+        time.strftime("%Y-%m-%d %H:%M", time.localtime(info.mtime)),
+        target,
+        (info.devmajor, info.devminor) if info.ischr() or info.isblk() else (0, 0),
+    )
+
+
+def _inside(target: Path, info: tarfile.TarInfo, path: Path) -> Path:
+    """Make sure a path stays inside of the extraction root, even through symlinks extracted before."""
+    root = target.resolve()
+    resolved = path.resolve()
+    if resolved != root and root not in resolved.parents:
+        raise InvalidDebError(target, f"{info.name} is outside of the archive root")
+    return path
+
+
+def _extract_member(tar: tarfile.TarFile, info: tarfile.TarInfo, target: Path, key: str) -> None:
+    relative = Path(key.lstrip("/"))
+    if ".." in relative.parts:
+        raise InvalidDebError(target, f"{info.name} is outside of the archive root")
+
+    destination = target / relative
+
+    if info.isdir():
+        _inside(target, info, destination).mkdir(parents=True, exist_ok=True)
+        return
+
+    # the member itself may be a symlink pointing anywhere, but nothing may be written through one
+    _inside(target, info, destination.parent)
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.is_symlink() or destination.exists():
+        destination.unlink()
+
+    if info.issym():
+        destination.symlink_to(info.linkname)
+    elif info.islnk():
+        os.link(_inside(target, info, target / _to_relative(info.linkname)), destination)
+    elif info.isfile():
+        source = tar.extractfile(info)
+        assert source is not None  # noqa: S101
+        with destination.open("wb") as file:
+            shutil.copyfileobj(source, file, _COPY_BUFFER_SIZE)
+        destination.chmod(info.mode)
+        os.utime(destination, (info.mtime, info.mtime))
+    # device files and fifos can't be created without root, dpkg-deb --extract skips them as well
+
+
+def _read_data(
+    path: Path,
+    name: str,
+    member: _MemberReader,
+    extract_to: Path | None,
+) -> dict[str, ArchiveEntry]:
+    contents: dict[str, ArchiveEntry] = {}
+    with _decompressed(path, name, member) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+        for info in tar:
+            key = _to_key(info)
+            contents[key] = _to_entry(info)
+            if extract_to is not None:
+                _extract_member(tar, info, extract_to, key)
+
+    return contents
+
+
+def read_deb(path: Path, extract_to: Path | None = None) -> DebArchive:
+    """
+    Read control fields and contents of a deb-file in one pass over the file.
+
+    If `extract_to` is given, the data of the package is extracted there on the way.
+    """
+    control: dict[str, str] | None = None
+    contents: dict[str, ArchiveEntry] | None = None
+
+    with path.open("rb") as file:
+        for name, member in _iterate_ar(path, file):
+            if name.startswith("control.tar"):
+                control = _read_control(path, name, member)
+            elif name.startswith("data.tar"):
+                contents = _read_data(path, name, member, extract_to)
+
+    if control is None or contents is None:
+        raise InvalidDebError(path, "control or data archive is missing")
+
+    return DebArchive(path=path, control=control, contents=contents)
+
+
+def merge_extracted(source: Path, contents: Mapping[str, ArchiveEntry], target: Path) -> None:
+    """Move the files of a package extracted by `read_deb` into `target`, in archive order."""
+    for key, entry in contents.items():
+        relative = key.strip("/")
+        if relative == "":
+            continue
+
+        extracted = source / relative
+        destination = target / relative
+        if entry.permissions.startswith("d"):
+            destination.mkdir(parents=True, exist_ok=True)
+        elif extracted.is_symlink() or extracted.exists():
+            extracted.replace(destination)
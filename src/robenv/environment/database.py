@@ -0,0 +1,144 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import sqlite3
+
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from threading import RLock
+from typing import Any
+from typing import Iterator
+from typing import Sequence
+
+
+_logger = getLogger(__name__)
+
+# Every entry upgrades the schema by one version, never change existing entries
+_MIGRATIONS: Sequence[str] = (
+    """
+    CREATE TABLE indexed_packages (
+        package TEXT PRIMARY KEY
+    );
+    CREATE TABLE installed_files (
+        path TEXT NOT NULL,
+        package TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (path, package)
+    );
+    CREATE INDEX installed_files_by_package ON installed_files (package, position);
+    """,
+    """
+    CREATE TABLE package_debs (
+        package TEXT PRIMARY KEY,
+        deb_name TEXT NOT NULL
+    );
+    CREATE TABLE package_dependencies (
+        package TEXT NOT NULL,
+        dependency TEXT NOT NULL,
+        PRIMARY KEY (package, dependency)
+    );
+    CREATE INDEX package_dependencies_by_dependency ON package_dependencies (dependency);
+    """,
+    """
+    CREATE TABLE settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE installed_packages (
+        package TEXT PRIMARY KEY,
+        location TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE build_memory (
+        package TEXT PRIMARY KEY,
+        peak_rss INTEGER NOT NULL
+    );
+    """,
+)
+
+
+class RobEnvDatabase:
+    """
+    SQLite store for the bookkeeping of a robenv.
+
+    All writes happen inside of `transaction()`, which can be nested to batch
+    several updates into one commit.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._lock = RLock()
+        self._depth = 0
+        self._migrate()
+
+    @staticmethod
+    def get_database_path(robenv_path: Path) -> Path:
+        return robenv_path / "robenv/robenv.db"
+
+    def _migrate(self) -> None:
+        with self._lock:
+            version: int = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            for new_version, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+                _logger.debug("Migrating robenv database to version %s", new_version)
+                self._connection.executescript(f"BEGIN; {script}; PRAGMA user_version = {new_version}; COMMIT;")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+
+            try:
+                yield self._connection
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute("COMMIT")
+
+    def query(self, sql: str, parameters: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,93 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import sqlite3
+
+from typing import Iterable
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.ros_package.package import PackageName
+
+
+class DependencyIndex:
+    """
+    Persistent Depends/Pre-Depends graph of the packages installed in a robenv.
+
+    Dependencies are stored by deb name, as they appear in the control fields, and are
+    matched to installed packages via the deb name each package was installed with.
+    """
+
+    def __init__(self, database: RobEnvDatabase) -> None:
+        self._database = database
+
+    def get_indexed_packages(self) -> set[PackageName]:
+        return {PackageName(row[0]) for row in self._database.query("SELECT package FROM package_debs")}
+
+    def add(self, package: PackageName, deb_name: str, dependencies: Iterable[str]) -> None:
+        with self._database.transaction() as connection:
+            self._delete(connection, package)
+            connection.execute("INSERT INTO package_debs (package, deb_name) VALUES (?, ?)", (package, deb_name))
+            connection.executemany(
+                "INSERT OR IGNORE INTO package_dependencies (package, dependency) VALUES (?, ?)",
+                ((package, dependency) for dependency in dependencies),
+            )
+
+    def remove(self, package: PackageName) -> None:
+        with self._database.transaction() as connection:
+            self._delete(connection, package)
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, package: PackageName) -> None:
+        connection.execute("DELETE FROM package_dependencies WHERE package = ?", (package,))
+        connection.execute("DELETE FROM package_debs WHERE package = ?", (package,))
+
+    def dependents(self, package: PackageName) -> list[PackageName]:
+        """Get all installed packages depending on the package, directly or through other installed packages."""
+        rows = self._database.query(
+            """
+            WITH RECURSIVE dependents (package) AS (
+                SELECT dependency.package
+                FROM package_dependencies AS dependency
+                JOIN package_debs AS deb ON dependency.dependency = deb.deb_name
+                WHERE deb.package = ?
+                UNION
+                SELECT dependency.package
+                FROM package_dependencies AS dependency
+                JOIN package_debs AS deb ON dependency.dependency = deb.deb_name
+                JOIN dependents ON dependents.package = deb.package
+            )
+            SELECT package FROM dependents WHERE package != ? ORDER BY package
+            """,
+            (package, package),
+        )
+        return [PackageName(row[0]) for row in rows]
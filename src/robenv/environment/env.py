@@ -35,14 +35,12 @@ import errno
 import os
 import shutil
 
-from collections import defaultdict
-from concurrent.futures import as_completed
 from dataclasses import dataclass
-from functools import lru_cache
 from itertools import chain
 from logging import getLogger
 from pathlib import Path
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import Mapping
 from typing import NewType
@@ -54,23 +52,26 @@ from deb_pkg_tools.deps import AbstractRelationship
 from deb_pkg_tools.deps import parse_depends
 from deb_pkg_tools.package import ArchiveEntry
 from deb_pkg_tools.package import PackageFile
-from deb_pkg_tools.package import collect_related_packages
-from deb_pkg_tools.package import inspect_package_contents
 from deb_pkg_tools.package import parse_filename
-from deb_pkg_tools.utils import find_installed_version
 
+from robenv.deb.archive import DebArchive
+from robenv.deb.archive import merge_extracted
+from robenv.deb.archive import read_deb
+from robenv.environment.database import RobEnvDatabase
+from robenv.environment.dependency_index import DependencyIndex
 from robenv.environment.distro import RosDistribution
 from robenv.environment.distro import parse_distro
+from robenv.environment.file_index import FileIndex
 from robenv.environment.locate import locate
-from robenv.environment.run_command import CommandAbortedError
-from robenv.environment.run_command import CommandFailedError
+from robenv.environment.package_index import PackageIndex
+from robenv.environment.package_index import get_system_package_index
 from robenv.environment.shell import RobEnvShell
 from robenv.ros_package.package import PackageName
-from robenv.rosdep.rosdep import ResolvedPackageName
 from robenv.rosdep.rosdep import Rosdep
 from robenv.util.cancelable_executor import CancelableExecutor
 from robenv.util.cpu_count import get_cpu_count
 from robenv.util.paths import remove_slash_prefix
+from robenv.util.paths import replace_symlink_with_directory
 
 
 _logger = getLogger(__name__)
@@ -87,6 +88,18 @@ class Installable:
     location: Path
 
 
+@dataclass
+class _PendingInstall:
+    installable: Installable
+    staging_path: Path
+    skip: bool
+    deb: DebArchive
+
+    @property
+    def name(self) -> PackageName:
+        return self.installable.name
+
+
 class UnmetDependencyError(Exception):
     def __init__(self, package: str, missing_dependencies: list[AbstractRelationship]) -> None:
         super().__init__(
@@ -94,12 +107,6 @@ class UnmetDependencyError(Exception):
         )
 
 
-@lru_cache
-def _get_installed_files(robenv_path: Path, deb_path: Path) -> list[Path]:
-    contents = inspect_package_contents(str(deb_path))
-    return [robenv_path / remove_slash_prefix(file) for file in contents]
-
-
 class PackageIsNotInstalledError(Exception):
     def __init__(self, package: str) -> None:
         super().__init__(f"Package {package} is not installed")
@@ -128,75 +135,137 @@ class SettingsFile(TypedDict):
 
 
 class RobEnvSettings:
+    """
+    Settings of a robenv and the packages installed into it, stored in the robenv database.
+
+    Every change is written at once, changes done within one `RobEnvDatabase.transaction()` are committed together.
+    """
+
     def __init__(
         self,
-        settings_file: Path,
+        database: RobEnvDatabase,
         installed_packages: InstalledPackages,
         ros_distro: RosDistribution,
     ) -> None:
-        self._settings_file = settings_file
+        self._database = database
         self.installed_packages = installed_packages
         self.ros_distro: RosDistribution = ros_distro
 
     @classmethod
-    def read(cls, robenv_path: Path) -> RobEnvSettings:
-        settings_file = cls.get_settings_path(robenv_path)
-        settings: SettingsFile = yaml.safe_load(settings_file.read_text())
-        installed_packages = {key: Path(value) for key, value in settings["installed_packages"].items()}
-        ros_distro = parse_distro(settings["ros_distro"])
+    def read(cls, robenv_path: Path, database: RobEnvDatabase) -> RobEnvSettings:
+        cls._migrate_settings_file(robenv_path, database)
+
+        settings = dict(database.query("SELECT key, value FROM settings"))
+        installed_packages = {
+            PackageName(package): Path(location)
+            for package, location in database.query("SELECT package, location FROM installed_packages")
+        }
         return cls(
-            settings_file=settings_file,
+            database=database,
             installed_packages=installed_packages,
-            ros_distro=ros_distro,
+            ros_distro=parse_distro(settings["ros_distro"]),
         )
 
+    @staticmethod
+    def _migrate_settings_file(robenv_path: Path, database: RobEnvDatabase) -> None:
+        settings_file = RobEnvSettings.get_settings_path(robenv_path)
+        if not settings_file.exists():
+            return
+
+        _logger.debug("Migrating %s into the robenv database", settings_file)
+        settings: SettingsFile = yaml.safe_load(settings_file.read_text())
+        with database.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('ros_distro', ?)",
+                (settings["ros_distro"],),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO installed_packages (package, location) VALUES (?, ?)",
+                settings["installed_packages"].items(),
+            )
+        settings_file.replace(settings_file.with_suffix(".yaml.bak"))
+
     @staticmethod
     def initialize(robenv_path: Path, ros_distro: RosDistribution) -> None:
-        RobEnvSettings(
-            settings_file=RobEnvSettings.get_settings_path(robenv_path),
-            installed_packages={},
-            ros_distro=ros_distro,
-        ).save()
+        database = RobEnvDatabase(RobEnvDatabase.get_database_path(robenv_path))
+        with database.transaction() as connection:
+            connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('ros_distro', ?)", (ros_distro,))
+        database.close()
 
     @staticmethod
     def get_settings_path(robenv_path: Path) -> Path:
+        # robenvs created before the robenv database kept their settings here, it is migrated on first read
         return robenv_path / "robenv/settings.yaml"
 
-    def save(self) -> None:
-        if not self._settings_file.exists():
-            self._settings_file.parent.mkdir(parents=True, exist_ok=True)
-
-        self._settings_file.write_text(yaml.safe_dump(self._as_dict()))
-
     def add_installed(self, name: PackageName, location: Path) -> None:
-        self.installed_packages[name] = location.absolute()
-        self.save()
-
-    def _as_dict(self) -> SettingsFile:
-        return {
-            "installed_packages": {key: str(value) for key, value in self.installed_packages.items()},
-            "ros_distro": self.ros_distro,
-        }
+        self.add_installed_packages({name: location})
+
+    def add_installed_packages(self, packages: Mapping[PackageName, Path]) -> None:
+        locations = {name: location.absolute() for name, location in packages.items()}
+        with self._database.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO installed_packages (package, location) VALUES (?, ?)",
+                ((name, str(location)) for name, location in locations.items()),
+            )
+        self.installed_packages.update(locations)
 
     def remove_installed(self, name: PackageName) -> None:
+        with self._database.transaction() as connection:
+            connection.execute("DELETE FROM installed_packages WHERE package = ?", (name,))
         self.installed_packages[name].unlink()
         del self.installed_packages[name]
-        self.save()
 
 
 class RobEnv:
     def __init__(self) -> None:
         self.path = locate(DEFAULT_ROBENV_NAME)
-        self._settings = RobEnvSettings.read(self.path)
+        self._database = RobEnvDatabase(RobEnvDatabase.get_database_path(self.path))
+        self._settings = RobEnvSettings.read(self.path, self._database)
         self.shell = RobEnvShell(self.path / "activate")
         self._rosdep: Rosdep | None = None
+        self._file_index: FileIndex | None = None
+        self._dependency_index: DependencyIndex | None = None
 
     @property
     def rosdep(self) -> Rosdep:
         if self._rosdep is None:
-            self._rosdep = Rosdep(self.path, self.shell)
+            self._rosdep = Rosdep(self.path, self.shell, self.ros_distro)
         return self._rosdep
 
+    @property
+    def database(self) -> RobEnvDatabase:
+        return self._database
+
+    @property
+    def file_index(self) -> FileIndex:
+        return self._get_indexes()[0]
+
+    @property
+    def dependency_index(self) -> DependencyIndex:
+        return self._get_indexes()[1]
+
+    def _get_indexes(self) -> tuple[FileIndex, DependencyIndex]:
+        if self._file_index is None or self._dependency_index is None:
+            self._file_index = FileIndex(self.database)
+            self._dependency_index = DependencyIndex(self.database)
+            self._index_unindexed_packages(self._file_index, self._dependency_index)
+
+        return self._file_index, self._dependency_index
+
+    def _index_unindexed_packages(self, file_index: FileIndex, dependency_index: DependencyIndex) -> None:
+        indexed_packages = file_index.get_indexed_packages() & dependency_index.get_indexed_packages()
+        unindexed_packages = set(self._settings.installed_packages) - indexed_packages
+        for package_name in sorted(unindexed_packages):
+            _logger.debug("Indexing installed files and dependencies of %s", package_name)
+            self._add_to_indexes(package_name, read_deb(self._settings.installed_packages[package_name]))
+
+    def _add_to_indexes(self, package_name: PackageName, deb: DebArchive) -> None:
+        dependency_names = chain.from_iterable(dependency.names for dependency in self._get_dependencies_of(deb))
+
+        with self.database.transaction():
+            self.file_index.add(package_name, deb.contents)
+            self.dependency_index.add(package_name, deb.control.get("package", package_name), dependency_names)
+
     @property
     def ros_distro(self) -> RosDistribution:
         return self._settings.ros_distro
@@ -209,6 +278,10 @@ class RobEnv:
     def _install_path(self) -> Path:
         return self.path
 
+    @property
+    def _staging_path(self) -> Path:
+        return self.path / "robenv/staging/"
+
     def _copy(self, installable: Installable) -> Path:
         self._packages_path.mkdir(parents=True, exist_ok=True)
 
@@ -225,53 +298,34 @@ class RobEnv:
     def get_installed_packages(self) -> list[PackageName]:
         return list(self._settings.installed_packages.keys())
 
-    @staticmethod
-    def _is_dependency(resolved_package_name: ResolvedPackageName, dependent: Path) -> bool:
-        return any(package.name == resolved_package_name for package in collect_related_packages(dependent))
-
-    def _get_dependent_packages(self, dependency_package: PackageName) -> list[PackageName]:
-        resolved_package_name = self.rosdep.resolve(package_name=dependency_package)
-
-        with CancelableExecutor(max_workers=get_cpu_count(minimum=4)) as pool:
-            futures = {
-                pool.submit(self._is_dependency, resolved_package_name, path_to_debian): package_name
-                for package_name, path_to_debian in self._settings.installed_packages.items()
-            }
-
-            return [futures[future] for future in as_completed(futures) if future.result()]
-
     @staticmethod
     def _re_init_symlinked_dir(folder: Path) -> None:
         source_path = Path(os.readlink(folder.absolute()))
-        folder.unlink()
-        folder.mkdir()
+        # builds running meanwhile resolve paths through the folder, so it is filled aside and swapped in at once
+        replacement = folder.with_name(f".{folder.name}.robenv-reinit")
+        shutil.rmtree(replacement, ignore_errors=True)
+        replacement.mkdir()
         _logger.debug("reinit symlinks one level below for folder: %s", folder)
         for source in source_path.iterdir():
-            target = folder / source.name
-            _logger.debug("creating symlink: %s -> %s", target, source)
+            target = replacement / source.name
+            _logger.debug("creating symlink: %s -> %s", folder / source.name, source)
             target.symlink_to(source, target_is_directory=source.is_dir())
 
+        replace_symlink_with_directory(folder, replacement)
+
     def _to_robenv_root_absolute(self, file: Path | str) -> Path:
         return self._install_path / remove_slash_prefix(file)
 
-    def _build_package_file_lookup(self) -> dict[Path, list[PackageName]]:
-        lookup = defaultdict(list)
-        inspection_items = (
-            (file_path, package)
-            for package, deb_path in self._settings.installed_packages.items()
-            for file_path in _get_installed_files(self._install_path, deb_path)
-        )
-        for path, package in inspection_items:
-            lookup[path].append(package)
-
-        return lookup
+    def get_owning_packages(self, file: Path) -> list[PackageName]:
+        return self.file_index.owners(file.relative_to(self._install_path))
 
-    def _find_installed_by_packages(self, file: Path) -> list[PackageName]:
-        files_installed_by_package = self._build_package_file_lookup()
-        return files_installed_by_package[file]
-
-    def _handle_package_contents(self, installable: Installable, *, overwrite: bool) -> None:
-        contents: dict[str, ArchiveEntry] = inspect_package_contents(str(installable.location))
+    def _handle_package_contents(
+        self,
+        contents: Mapping[str, ArchiveEntry],
+        *,
+        overwrite: bool,
+        batch_owners: dict[str, PackageName],
+    ) -> None:
         for package_path in contents:
             installed_file_path = self._to_robenv_root_absolute(package_path)
             _logger.debug(
@@ -280,8 +334,16 @@ class RobEnv:
                 package_path,
                 contents[package_path].target,
             )
+            installed_by: list[PackageName] | None = None
             if installed_file_path.is_file():
-                installed_by = self._find_installed_by_packages(installed_file_path)
+                installed_by = self.get_owning_packages(installed_file_path)
+            elif package_path in batch_owners:
+                installed_by = [batch_owners[package_path]]
+            elif installed_file_path.is_symlink() and contents[package_path].target == "":
+                _logger.debug("Symlinked dir exists in robenv: %s", str(installed_file_path))
+                self._re_init_symlinked_dir(installed_file_path)
+
+            if installed_by is not None:
                 if overwrite:
                     _logger.warning(
                         "File exists in robenv, will be overwritten: %s installed by %s",
@@ -290,22 +352,10 @@ class RobEnv:
                     )
                 else:
                     raise FileAlreadyInstalledError(installed_file_path, installed_by)
-            elif installed_file_path.is_symlink() and contents[package_path].target == "":
-                _logger.debug("Symlinked dir exists in robenv: %s", str(installed_file_path))
-                self._re_init_symlinked_dir(installed_file_path)
-
-    def _get_dependencies_of(
-        self,
-        installable: Installable,
-    ) -> Iterator[AbstractRelationship]:
-        return chain.from_iterable(
-            parse_depends(self.shell.run(f"dpkg-deb -f {installable.location} {field}"))
-            for field in ("depends", "pre-depends")
-        )
 
     @staticmethod
-    def _get_system_installed_version(dependency_name: str) -> str | None:
-        return find_installed_version(dependency_name)  # type: ignore[no-any-return]
+    def _get_dependencies_of(deb: DebArchive) -> Iterator[AbstractRelationship]:
+        return chain.from_iterable(parse_depends(deb.control.get(field, "")) for field in ("depends", "pre-depends"))
 
     def _get_robenv_installed_debs(self) -> Mapping[str, PackageFile]:
         if not self._packages_path.exists():
@@ -313,100 +363,181 @@ class RobEnv:
         file_names = (parse_filename(filename) for filename in self._packages_path.iterdir())
         return {package_file.name: package_file for package_file in file_names}
 
-    @staticmethod
-    def _is_met_via_robenv(
-        name: str,
-        dependency: AbstractRelationship,
-        robenv_installed_debs: Mapping[str, PackageFile],
-    ) -> bool:
-        return name in robenv_installed_debs and dependency.matches(
-            name,
-            robenv_installed_debs[name].version,
-        )
-
-    @staticmethod
-    def _is_met_via_system(
-        name: str,
-        dependency: AbstractRelationship,
-    ) -> bool:
-        system_version = RobEnv._get_system_installed_version(name)
-
-        # System dependencies MUST have a version. So if no version can be found, package is not installed
-        return system_version is not None and dependency.matches(name, system_version)
+    def _get_robenv_package_index(self, batch: list[_PendingInstall]) -> PackageIndex:
+        index = PackageIndex()
+        for pending in batch:
+            control = pending.deb.control
+            index.add(control.get("package", pending.name), control.get("version", ""), control.get("provides", ""))
+        for name, package_file in self._get_robenv_installed_debs().items():
+            index.add(name, package_file.version)
+        return index
 
     @staticmethod
     def _is_dependency_met(
         dependency: AbstractRelationship,
-        robenv_installed_debs: Mapping[str, PackageFile],
+        robenv_index: PackageIndex,
+        system_index: PackageIndex,
     ) -> bool:
         _logger.debug("Checking dependency: %s", dependency)
 
         return any(
-            RobEnv._is_met_via_robenv(alternative, dependency, robenv_installed_debs)
-            or RobEnv._is_met_via_system(
-                alternative,
-                dependency,
-            )
+            robenv_index.is_met(alternative, dependency) or system_index.is_met(alternative, dependency)
             for alternative in dependency.names
         )
 
-    def _check_for_dependencies(self, installable: Installable) -> None:
-        _logger.debug("Checking dependencies of %s", installable.name)
-        robenv_installed_debs = self._get_robenv_installed_debs()
+    def _check_for_dependencies(self, batch: list[_PendingInstall]) -> None:
+        robenv_index = self._get_robenv_package_index(batch)
+        system_index = get_system_package_index()
+
+        for pending in batch:
+            _logger.debug("Checking dependencies of %s", pending.name)
+            unmet_dependencies = [
+                dependency
+                for dependency in self._get_dependencies_of(pending.deb)
+                if not RobEnv._is_dependency_met(dependency, robenv_index, system_index)
+            ]
+
+            if len(unmet_dependencies) != 0:
+                raise UnmetDependencyError(pending.name, unmet_dependencies)
+
+    def _read(self, installable: Installable, *, overwrite: bool) -> _PendingInstall:
+        skip = self.is_installed(installable.name) and not overwrite
+        staging_path = self._staging_path / installable.name
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+        return _PendingInstall(
+            installable=installable,
+            staging_path=staging_path,
+            skip=skip,
+            deb=read_deb(installable.location, extract_to=None if skip else staging_path),
+        )
 
-        unmet_dependencies = [
-            dependency
-            for dependency in self._get_dependencies_of(installable)
-            if not RobEnv._is_dependency_met(dependency, robenv_installed_debs)
-        ]
+    def _read_all(self, installables: list[Installable], *, overwrite: bool) -> list[_PendingInstall]:
+        if len(installables) == 1:
+            return [self._read(installables[0], overwrite=overwrite)]
 
-        if len(unmet_dependencies) != 0:
-            raise UnmetDependencyError(installable.name, unmet_dependencies)
+        with CancelableExecutor(max_workers=get_cpu_count(minimum=4)) as pool:
+            futures = [pool.submit(self._read, installable, overwrite=overwrite) for installable in installables]
+            return [future.result() for future in futures]
+
+    def _sort_by_dependencies(self, batch: list[_PendingInstall]) -> list[_PendingInstall]:
+        by_deb_name = {pending.deb.control.get("package", pending.name): pending for pending in batch}
+        depends_on = {
+            pending.name: {
+                by_deb_name[name].name
+                for dependency in self._get_dependencies_of(pending.deb)
+                for name in dependency.names
+                if name in by_deb_name and by_deb_name[name] is not pending
+            }
+            for pending in batch
+        }
 
-    def install(self, installable: Installable, *, overwrite: bool, check_dependencies: bool) -> None:
-        package_name = installable.name
+        ordered: list[_PendingInstall] = []
+        remaining = list(batch)
+        while len(remaining) > 0:
+            done = {pending.name for pending in ordered}
+            ready = [pending for pending in remaining if depends_on[pending.name] <= done]
+            if len(ready) == 0:
+                # dependency cycle within the batch, the given order is as good as any
+                ready = remaining
+            ordered.extend(ready)
+            remaining = [pending for pending in remaining if pending not in ready]
 
-        if check_dependencies:
-            self._check_for_dependencies(installable)
+        return ordered
+
+    def install(self, installable: Installable, *, overwrite: bool, check_dependencies: bool) -> None:
+        self.install_many([installable], overwrite=overwrite, check_dependencies=check_dependencies)
 
-        if self.is_installed(package_name):
-            if overwrite:
-                _logger.info("Removing already installed package %s", package_name)
-                self.uninstall(package_name, force=True)
-            else:
-                _logger.info("Skipping already installed package %s", package_name)
-                return
+    def install_many(self, installables: Iterable[Installable], *, overwrite: bool, check_dependencies: bool) -> None:
+        """
+        Install several deb-files at once.
 
-        self._handle_package_contents(installable, overwrite=overwrite)
+        All deb-files are read and unpacked concurrently, dependencies and file conflicts are checked for the
+        whole set before anything is installed, then the packages are moved into place in dependency order.
+        """
+        installables = list(installables)
 
-        package_file = self._copy(installable)
+        try:
+            batch = self._read_all(installables, overwrite=overwrite)
+            batch = self._sort_by_dependencies(batch)
+
+            if check_dependencies:
+                self._check_for_dependencies(batch)
+
+            for pending in batch:
+                if pending.skip:
+                    _logger.info("Skipping already installed package %s", pending.name)
+                elif self.is_installed(pending.name):
+                    _logger.info("Removing already installed package %s", pending.name)
+                    self.uninstall(pending.name, force=True)
+
+            batch = [pending for pending in batch if not pending.skip]
+            batch_owners: dict[str, PackageName] = {}
+            for pending in batch:
+                self._handle_package_contents(pending.deb.contents, overwrite=overwrite, batch_owners=batch_owners)
+                batch_owners.update((path, pending.name) for path in pending.deb.contents if not path.endswith("/"))
+
+            installed: dict[PackageName, Path] = {}
+            started: list[_PendingInstall] = []
+            try:
+                with self.database.transaction():
+                    for pending in batch:
+                        started.append(pending)
+                        installed[pending.name] = self._install_pending(pending)
+                    self._settings.add_installed_packages(installed)
+            except BaseException:
+                self._revert_pending(started)
+                raise
+        finally:
+            for installable in installables:
+                shutil.rmtree(self._staging_path / installable.name, ignore_errors=True)
+
+    def _install_pending(self, pending: _PendingInstall) -> Path:
+        package_file = self._copy(pending.installable)
         _logger.debug("Installing package at %s", str(package_file))
 
         try:
-            self.shell.run(f"/usr/bin/dpkg-deb --extract {package_file!s} {self._install_path!s}", cwd=Path.cwd())
-        except (CommandAbortedError, CommandFailedError):
+            merge_extracted(pending.staging_path, pending.deb.contents, self._install_path)
+        except OSError:
             package_file.unlink()
             raise
 
-        self._settings.add_installed(package_name, package_file)
+        self._add_to_indexes(pending.name, pending.deb)
+        return package_file
+
+    def _revert_pending(self, reverted: list[_PendingInstall]) -> None:
+        """Remove the merged files and saved deb-files of packages whose records were rolled back."""
+        for pending in reversed(reverted):
+            _logger.debug("Reverting install of package: %s", pending.name)
+            self._remove_installed_files(
+                package_path
+                for package_path in pending.deb.contents
+                if self._to_robenv_root_absolute(package_path).exists() and not self.file_index.owners(package_path)
+            )
+            (self._packages_path / pending.installable.deb_name).unlink(missing_ok=True)
 
     def uninstall(self, package_name: PackageName, *, force: bool = False) -> None:
         if not self.is_installed(package_name):
             raise PackageIsNotInstalledError(package_name)
 
         if not force:
-            dependents = self._get_dependent_packages(package_name)
+            dependents = self.dependency_index.dependents(package_name)
             if len(dependents) > 0:
                 raise RemoveDependencyError(package_name, dependents)
 
         _logger.debug("Uninstalling package: %s", package_name)
 
-        contents: dict[str, ArchiveEntry] = inspect_package_contents(
-            str(self._settings.installed_packages[package_name]),
-        )
+        contents = self.file_index.files(package_name)
         _logger.debug("Package Content: %s", contents)
+        self._remove_installed_files(contents)
+
+        with self.database.transaction():
+            self.file_index.remove(package_name)
+            self.dependency_index.remove(package_name)
+            self._settings.remove_installed(package_name)
 
-        for package_path in reversed(contents):
+    def _remove_installed_files(self, contents: Iterable[Path | str]) -> None:
+        for package_path in reversed(list(contents)):
             # We need to go bottom-up here, as we maybe empty folders which we
             # can then delete; all packages that I've seen so far had the
             # top-down order so reversed should be bottom-up
@@ -437,4 +568,3 @@ class RobEnv:
 
             _logger.debug("Removing: %s", installed_file_path)
             installed_file_path.unlink()
-        self._settings.remove_installed(package_name)
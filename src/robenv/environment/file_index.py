@@ -0,0 +1,92 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import sqlite3
+
+from pathlib import Path
+from typing import Iterable
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.ros_package.package import PackageName
+from robenv.util.paths import remove_slash_prefix
+
+
+def _to_key(path: str | Path) -> str:
+    return remove_slash_prefix(path).as_posix()
+
+
+class FileIndex:
+    """
+    Persistent lookup of installed files to the packages they were installed by.
+
+    Paths are stored relative to the root of the robenv, as they appear in the
+    deb-file they were installed from.
+    """
+
+    def __init__(self, database: RobEnvDatabase) -> None:
+        self._database = database
+
+    def get_indexed_packages(self) -> set[PackageName]:
+        return {PackageName(row[0]) for row in self._database.query("SELECT package FROM indexed_packages")}
+
+    def add(self, package: PackageName, files: Iterable[str | Path]) -> None:
+        with self._database.transaction() as connection:
+            self._delete(connection, package)
+            connection.execute("INSERT INTO indexed_packages (package) VALUES (?)", (package,))
+            connection.executemany(
+                "INSERT OR IGNORE INTO installed_files (path, package, position) VALUES (?, ?, ?)",
+                ((_to_key(file), package, position) for position, file in enumerate(files)),
+            )
+
+    def remove(self, package: PackageName) -> None:
+        with self._database.transaction() as connection:
+            self._delete(connection, package)
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, package: PackageName) -> None:
+        connection.execute("DELETE FROM installed_files WHERE package = ?", (package,))
+        connection.execute("DELETE FROM indexed_packages WHERE package = ?", (package,))
+
+    def owners(self, file: str | Path) -> list[PackageName]:
+        rows = self._database.query(
+            "SELECT package FROM installed_files WHERE path = ? ORDER BY package",
+            (_to_key(file),),
+        )
+        return [PackageName(row[0]) for row in rows]
+
+    def files(self, package: PackageName) -> list[Path]:
+        rows = self._database.query(
+            "SELECT path FROM installed_files WHERE package = ? ORDER BY position",
+            (package,),
+        )
+        return [Path(row[0]) for row in rows]
@@ -0,0 +1,122 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import re
+
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+from deb_pkg_tools.deps import AbstractRelationship
+
+
+DPKG_STATUS_PATH = Path("/var/lib/dpkg/status")
+
+# package states in which dpkg has the files of a package on disk
+_INSTALLED_STATES = frozenset(("installed", "half-configured", "unpacked", "triggers-awaited", "triggers-pending"))
+
+_PROVIDES_PATTERN = re.compile(r"^\s*(?P<name>[^\s(:]+)(?::\S+)?\s*(?:\(\s*=\s*(?P<version>[^)\s]+)\s*\))?\s*$")
+
+
+@dataclass
+class PackageIndex:
+    """Installed versions of packages, and the packages virtually provided by them, for dependency checks."""
+
+    versions: dict[str, str] = field(default_factory=dict)
+    provides: dict[str, list[str | None]] = field(default_factory=dict)
+
+    def add(self, name: str, version: str, provides: str = "") -> None:
+        self.versions.setdefault(name, version)
+        for provided in provides.split(","):
+            match = _PROVIDES_PATTERN.match(provided)
+            if match is not None:
+                self.provides.setdefault(match["name"], []).append(match["version"])
+
+    def is_met(self, name: str, dependency: AbstractRelationship) -> bool:
+        version = self.versions.get(name)
+        if version is not None and dependency.matches(name, version):
+            return True
+
+        return any(dependency.matches(name, provided) for provided in self.provides.get(name, []))
+
+
+def _iterate_paragraphs(text: str) -> Iterator[dict[str, str]]:
+    paragraph: dict[str, str] = {}
+    for line in text.splitlines():
+        if line.strip() == "":
+            if len(paragraph) > 0:
+                yield paragraph
+            paragraph = {}
+        elif not line.startswith((" ", "\t")):
+            name, _, value = line.partition(":")
+            paragraph[name.lower()] = value.strip()
+
+    if len(paragraph) > 0:
+        yield paragraph
+
+
+def parse_dpkg_status(text: str) -> PackageIndex:
+    index = PackageIndex()
+    for paragraph in _iterate_paragraphs(text):
+        state = paragraph.get("status", "").rpartition(" ")[2]
+        if state in _INSTALLED_STATES and "package" in paragraph and "version" in paragraph:
+            index.add(paragraph["package"], paragraph["version"], paragraph.get("provides", ""))
+
+    return index
+
+
+_cache_lock = Lock()
+_cache: dict[Path, tuple[tuple[int, int], PackageIndex]] = {}
+
+
+def get_system_package_index(path: Path = DPKG_STATUS_PATH) -> PackageIndex:
+    """
+    Get the index of the packages installed on the system.
+
+    The dpkg status file is parsed once and only parsed again when it changed.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return PackageIndex()
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, parse_dpkg_status(path.read_text(errors="replace")))
+            _cache[path] = cached
+
+        return cached[1]
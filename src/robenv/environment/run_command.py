@@ -31,9 +31,18 @@
 #
 from __future__ import annotations
 
+import codecs
+import os
+import selectors
+import shlex
+import subprocess
+
+from dataclasses import dataclass
 from logging import getLogger
 from pathlib import Path
 from signal import SIGTERM
+from typing import Collection
+from typing import Mapping
 
 from pexpect.exceptions import EOF
 from pexpect.exceptions import TIMEOUT
@@ -41,14 +50,30 @@ from pexpect.pty_spawn import spawn
 
 from robenv.logging import LOGLEVEL_TRACE
 from robenv.util.cancelable_executor import CancelableExecutor
+from robenv.util.memory import ProcessTreeMemory
 
 
 _logger = getLogger(__name__)
 
+# same exit status a shell reports for an unknown command
+COMMAND_NOT_FOUND_EXIT_STATUS = 127
+
+_READ_SIZE = 64 * 1024
+_CANCEL_POLL_INTERVAL = 0.1
+
 ExitStatus = int
 CommandOutput = str
 
 
+@dataclass
+class ResourceUsage:
+    """Resources used by a command, filled in by `run_command` once the command finished."""
+
+    # in bytes, the largest sum of the resident sets of the whole process tree sampled while the command ran,
+    # or of the largest single process reported by the kernel when this is larger
+    peak_rss: int = 0
+
+
 class CommandFailedError(Exception):
     def __init__(self, command: str, exit_status: ExitStatus, output: str) -> None:
         super().__init__(f"Command `{command}` failed with exit code {exit_status}:\r\n{output}")
@@ -97,24 +122,131 @@ def _handle_timeout(child: spawn, len_output: int) -> int:
     return len_before
 
 
-def run_command(
+def _trace_lines(buffer: str) -> str:
+    """Log all complete lines of the buffer and return the incomplete rest."""
+    *lines, rest = buffer.split("\n")
+    for line in lines:
+        _logger.log(level=LOGLEVEL_TRACE, msg=line)
+    return rest
+
+
+def _abort_piped(command: str, process: subprocess.Popen[bytes], output: list[bytes]) -> CommandAbortedError:
+    _logger.debug("Command was interrupted")
+    if process.poll() is None:
+        _logger.debug("Child was still alive")
+        process.terminate()
+        process.wait()
+    return CommandAbortedError(command=command, output=b"".join(output).decode(errors="replace"))
+
+
+def _run_piped(
     command: str,
-    maxread: int = 2000,
-    events: dict[str, str] | None = None,
-    cwd: Path | None = None,
+    cwd: Path | None,
+    env: Mapping[str, str] | None,
+    pass_fds: Collection[int],
+    resource_usage: ResourceUsage | None,
+) -> CommandOutput:
+    """Run a non-interactive command with its output read from a pipe as it arrives."""
+    _logger.debug("Command: %s", command)
+    output: list[bytes] = []
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    trace_buffer = ""
+
+    try:
+        process = subprocess.Popen(
+            shlex.split(command),  # noqa: S603
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=str(cwd.resolve()) if cwd is not None else None,
+            env=env,
+            pass_fds=tuple(pass_fds),
+        )
+    except FileNotFoundError as e:
+        raise CommandFailedError(command=command, exit_status=COMMAND_NOT_FOUND_EXIT_STATUS, output=str(e)) from e
+
+    tree_memory = ProcessTreeMemory(process.pid) if resource_usage is not None else None
+
+    with process, selectors.DefaultSelector() as selector:
+        assert process.stdout is not None  # noqa: S101
+        fd = process.stdout.fileno()
+        selector.register(fd, selectors.EVENT_READ)
+
+        try:
+            while True:
+                if CancelableExecutor.cancel_event.is_set():
+                    raise _abort_piped(command, process, output)
+
+                if tree_memory is not None:
+                    tree_memory.sample()
+
+                if len(selector.select(timeout=_CANCEL_POLL_INTERVAL)) == 0:
+                    continue
+
+                chunk = os.read(fd, _READ_SIZE)
+                if len(chunk) == 0:
+                    break
+
+                output.append(chunk)
+                if _logger.isEnabledFor(LOGLEVEL_TRACE):
+                    trace_buffer = _trace_lines(trace_buffer + decoder.decode(chunk))
+
+            exit_status = _wait(process, resource_usage, tree_memory)
+        except KeyboardInterrupt as e:
+            raise _abort_piped(command, process, output) from e
+
+    if len(trace_buffer) > 0:
+        _logger.log(level=LOGLEVEL_TRACE, msg=trace_buffer)
+
+    return _get_piped_result(command, output, exit_status)
+
+
+def _get_piped_result(command: str, output: list[bytes], exit_status: ExitStatus) -> CommandOutput:
+    result = b"".join(output).decode(errors="replace")
+    _logger.debug("Command ended: cmd=%s | status=%s", command, exit_status)
+
+    if exit_status != 0:
+        raise CommandFailedError(command=command, exit_status=exit_status, output=result)
+
+    return result
+
+
+def _wait(
+    process: subprocess.Popen[bytes],
+    resource_usage: ResourceUsage | None,
+    tree_memory: ProcessTreeMemory | None,
+) -> int:
+    if resource_usage is None:
+        return process.wait()
+
+    # Popen.wait() drops the rusage of the child, so reap it ourselves
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    # ru_maxrss only covers the single largest process, parallel jobs of a build add up
+    resource_usage.peak_rss = max(rusage.ru_maxrss * 1024, tree_memory.peak if tree_memory is not None else 0)
+    return process.returncode
+
+
+def _run_pty(
+    command: str,
+    maxread: int,
+    events: dict[str, str],
+    cwd: Path | None,
+    env: Mapping[str, str] | None,
 ) -> CommandOutput:
     with spawn(
         command,
         timeout=1,
         maxread=maxread,
         cwd=str(cwd.resolve()) if cwd is not None else None,
+        env=env,
     ) as child:
         child_output_list: list[str] = []
         patterns: list[str] | None = None
         responses: list[str] | None = None
         _logger.debug("Command: %s", command)
         len_output = 0
-        if events is not None and len(events) > 0:
+        if len(events) > 0:
             patterns = list(events.keys())
             responses = list(events.values())
 
@@ -152,3 +284,28 @@ def run_command(
                 len_output = _handle_timeout(child, len_output)
             except KeyboardInterrupt as e:
                 _handle_interrupt(command, child, child_output_list, e)
+
+
+def run_command(  # noqa: PLR0913
+    command: str,
+    maxread: int = 2000,
+    events: dict[str, str] | None = None,
+    cwd: Path | None = None,
+    env: Mapping[str, str] | None = None,
+    pass_fds: Collection[int] = (),
+    resource_usage: ResourceUsage | None = None,
+) -> CommandOutput:
+    """
+    Run a command and return its output.
+
+    Commands answering prompts via `events` run within a pty, all others are read from a pipe.
+    Only the latter can inherit the file descriptors given in `pass_fds` and report their `resource_usage`.
+    """
+    if events is None or len(events) == 0:
+        return _run_piped(command, cwd, env, pass_fds, resource_usage)
+
+    if len(pass_fds) > 0 or resource_usage is not None:
+        msg = "Commands answering prompts can neither inherit file descriptors nor report their resource usage"
+        raise ValueError(msg)
+
+    return _run_pty(command, maxread, events, cwd, env)
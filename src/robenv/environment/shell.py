@@ -31,18 +31,28 @@
 #
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import shutil
 import signal
+import subprocess
 
 from pathlib import Path
+from threading import Lock
 from typing import Any
+from typing import Collection
 from typing import Literal
+from typing import Mapping
+from typing import TypedDict
 
 import pexpect
 
 from shellingham import detect_shell
 
+from robenv.environment.run_command import CommandFailedError
 from robenv.environment.run_command import CommandOutput
+from robenv.environment.run_command import ResourceUsage
 from robenv.environment.run_command import run_command
 
 
@@ -53,18 +63,147 @@ class UnsupportedShellError(Exception):
 
 SupportedShell = Literal["sh", "bash", "zsh"]
 
+# files sourced by `activate` and the directories holding per package environment hooks,
+# relative to the ROS folder of the robenv
+_SETUP_FILES = (
+    "setup.sh",
+    "local_setup.sh",
+    "_setup_util.py",
+    "_local_setup_util_sh.py",
+    "etc/catkin/profile.d",
+    "share/ament_index/resource_index/packages",
+    "share/colcon-core/packages",
+)
+
+# variables which differ between shells without changing what `activate` produces
+_VOLATILE_VARIABLES = frozenset(("_", "OLDPWD", "PWD", "SHLVL"))
+
+
+class EnvironmentSnapshot(TypedDict):
+    key: str
+    changed: dict[str, str]
+    removed: list[str]
+
+
+def get_environment_snapshot_path(robenv_path: Path) -> Path:
+    return robenv_path / "robenv/environment.json"
+
 
 class RobEnvShell:
     def __init__(self, activate_script: Path) -> None:
         self._activate_script = activate_script
+        self._snapshot_path = get_environment_snapshot_path(activate_script.parent)
+        self._snapshot_lock = Lock()
+        self._snapshot: EnvironmentSnapshot | None = None
 
-    def run(
+    def run(  # noqa: PLR0913
         self,
         command: str,
         cwd: Path | None = None,
         events: dict[str, str] | None = None,
+        *,
+        env: Mapping[str, str] | None = None,
+        pass_fds: Collection[int] = (),
+        resource_usage: ResourceUsage | None = None,
     ) -> CommandOutput:
-        return run_command(self.command_in_env(command), events=events, cwd=cwd)
+        environment = self.get_environment()
+        if env is not None:
+            environment.update(env)
+        return run_command(
+            command,
+            events=events,
+            cwd=cwd,
+            env=environment,
+            pass_fds=pass_fds,
+            resource_usage=resource_usage,
+        )
+
+    def get_environment(self) -> dict[str, str]:
+        """
+        Get the environment of an activated robenv.
+
+        Sourcing `activate` is done once and its result stored next to the robenv, it is redone only
+        when `activate`, the ROS setup files or the environment robenv is called from changes.
+        """
+        base_environment = dict(os.environ)
+        key = self._snapshot_key(base_environment)
+
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot["key"] != key:
+                self._snapshot = self._read_snapshot(key)
+
+            if self._snapshot is None:
+                self._snapshot = self._capture_snapshot(key, base_environment)
+                self._write_snapshot(self._snapshot)
+
+            snapshot = self._snapshot
+
+        environment = {name: value for name, value in base_environment.items() if name not in snapshot["removed"]}
+        environment.update(snapshot["changed"])
+        return environment
+
+    def _snapshot_key(self, base_environment: Mapping[str, str]) -> str:
+        digest = hashlib.sha256()
+
+        setup_files = [self._activate_script]
+        for ros_folder in sorted((self._activate_script.parent / "opt/ros").glob("*")):
+            setup_files.extend(ros_folder / name for name in _SETUP_FILES)
+
+        for file in setup_files:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            digest.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}\0".encode())
+
+        for name, value in sorted(base_environment.items()):
+            if name not in _VOLATILE_VARIABLES:
+                digest.update(f"{name}={value}\0".encode())
+
+        return digest.hexdigest()
+
+    def _read_snapshot(self, key: str) -> EnvironmentSnapshot | None:
+        try:
+            snapshot: EnvironmentSnapshot = json.loads(self._snapshot_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+        return snapshot if snapshot.get("key") == key else None
+
+    def _write_snapshot(self, snapshot: EnvironmentSnapshot) -> None:
+        self._snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        tmp_path.replace(self._snapshot_path)
+
+    def _capture_snapshot(self, key: str, base_environment: Mapping[str, str]) -> EnvironmentSnapshot:
+        command = f"source {self._activate_script} && env -0"
+        result = subprocess.run(
+            ["bash", "-c", command],  # noqa: S603, S607
+            env=base_environment,
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise CommandFailedError(command, result.returncode, result.stderr.decode(errors="replace"))
+
+        activated: dict[str, str] = {}
+        for entry in result.stdout.decode().split("\0"):
+            name, separator, value = entry.partition("=")
+            if separator:
+                activated[name] = value
+
+        return EnvironmentSnapshot(
+            key=key,
+            changed={
+                name: value
+                for name, value in activated.items()
+                if name not in _VOLATILE_VARIABLES and base_environment.get(name) != value
+            },
+            removed=sorted(
+                name for name in base_environment if name not in activated and name not in _VOLATILE_VARIABLES
+            ),
+        )
 
     def command_in_env(self, command: str) -> str:
         return f"bash -c 'source {self._activate_script} && {command}'"
@@ -32,8 +32,6 @@
 
 from __future__ import annotations
 
-import os
-
 from logging import getLogger
 from pathlib import Path
 from shutil import copy
@@ -43,6 +41,7 @@ import requests
 
 from robenv.environment.distro import parse_distro
 from robenv.environment.run_command import run_command
+from robenv.util.paths import get_user_cache_path
 
 
 _logger = getLogger(__name__)
@@ -50,15 +49,11 @@ _logger = getLogger(__name__)
 
 class ROS:
     def __init__(self, path_or_url: str) -> None:
-        cache_path = Path.home() / ".cache/robenv"
-        xdg_home = os.environ.get("XDG_CACHE_HOME")
+        cache_path = get_user_cache_path()
 
         self._archive_path = Path()
         self._distro_path = Path()
 
-        if xdg_home is not None:
-            cache_path = Path(xdg_home) / "robenv"
-
         path_or_url_parsed = urlparse(path_or_url)
 
         if path_or_url_parsed.scheme in ("http", "https") or path_or_url_parsed.path.endswith("tar.bz2"):
@@ -0,0 +1,174 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+
+from functools import lru_cache
+from importlib import metadata
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+from typing import NewType
+
+from robenv.ros_package.package import ROSPackage
+
+
+_logger = getLogger(__name__)
+
+Fingerprint = NewType("Fingerprint", str)
+
+_IGNORED_DIRECTORIES = ("debian", ".git", "__pycache__")
+_IGNORED_DIRECTORY_PREFIXES = (".obj-",)
+_TOOLCHAIN = ("cc", "c++", "cmake", "make", "dpkg-deb", "fakeroot", "dh")
+
+
+def _is_ignored_directory(name: str) -> bool:
+    return name in _IGNORED_DIRECTORIES or name.startswith(_IGNORED_DIRECTORY_PREFIXES)
+
+
+def _hash_file(file: Path) -> str:
+    digest = hashlib.sha256()
+    with file.open("rb") as stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_source_tree(root: Path) -> str:
+    digest = hashlib.sha256()
+
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(name for name in directories if not _is_ignored_directory(name))
+        for name in sorted(files):
+            file = Path(directory) / name
+            digest.update(str(file.relative_to(root)).encode())
+            if file.is_symlink():
+                digest.update(f"-> {os.readlink(file)}".encode())
+            else:
+                digest.update(_hash_file(file).encode())
+
+    return digest.hexdigest()
+
+
+@lru_cache
+def get_toolchain_fingerprint() -> str:
+    """Identify the installed build tools by their resolved location, size and modification time."""
+    digest = hashlib.sha256(metadata.version("robenv").encode())
+
+    for tool in _TOOLCHAIN:
+        location = shutil.which(tool)
+        if location is None:
+            digest.update(f"{tool}:missing".encode())
+            continue
+
+        resolved = Path(location).resolve()
+        stat = resolved.stat()
+        digest.update(f"{tool}:{resolved}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    return digest.hexdigest()
+
+
+def compute_fingerprint(
+    package: ROSPackage,
+    dependency_fingerprints: Iterable[Fingerprint],
+    *salts: str,
+) -> Fingerprint:
+    digest = hashlib.sha256()
+    digest.update(_hash_file(package.path / "package.xml").encode())
+    digest.update(_hash_source_tree(package.path).encode())
+
+    for dependency_fingerprint in sorted(dependency_fingerprints):
+        digest.update(dependency_fingerprint.encode())
+
+    for salt in (*salts, get_toolchain_fingerprint()):
+        digest.update(salt.encode())
+
+    return Fingerprint(digest.hexdigest())
+
+
+class BuildCache:
+    """
+    Content addressed store of built deb-files.
+
+    Entries are keyed by the fingerprint of the package they were built from.
+    Once the cache outgrows `max_size` the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._lock = Lock()
+
+    def _entry(self, fingerprint: Fingerprint) -> Path:
+        return self._path / f"{fingerprint}.deb"
+
+    def contains(self, fingerprint: Fingerprint) -> bool:
+        return self._entry(fingerprint).exists()
+
+    def restore(self, fingerprint: Fingerprint, target: Path) -> bool:
+        entry = self._entry(fingerprint)
+
+        with self._lock:
+            if not entry.exists():
+                return False
+
+            entry.touch()
+            shutil.copy(entry, target)
+
+        return True
+
+    def store(self, fingerprint: Fingerprint, deb_file: Path) -> None:
+        self._path.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(fingerprint)
+        temporary_entry = entry.with_suffix(".tmp")
+
+        shutil.copy(deb_file, temporary_entry)
+        with self._lock:
+            temporary_entry.replace(entry)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._path.glob("*.deb"), key=lambda entry: entry.stat().st_mtime)
+        total_size = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if total_size <= self._max_size:
+                break
+
+            _logger.debug("Evicting %s from build cache", entry.name)
+            total_size -= entry.stat().st_size
+            entry.unlink()
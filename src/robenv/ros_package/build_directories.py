@@ -0,0 +1,129 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+
+from logging import getLogger
+from pathlib import Path
+
+from robenv.ros_package.package import ROSPackage
+from robenv.util.size import get_directory_size
+
+
+_logger = getLogger(__name__)
+
+
+_BUILD_DIRECTORY_VARIABLE = "ROBENV_BUILD_DIRECTORY"
+_JOBS_VARIABLE = "ROBENV_NINJA_JOBS"
+_BUILD_DIRECTORY_PATTERN = re.compile(r"--builddirectory=(\S+)")
+# records the package a build directory belongs to, so that directories of removed packages can be pruned
+_SOURCE_FILE = "robenv-source"
+
+
+class BuildDirectories:
+    """
+    CMake build directories of the packages of a robenv, kept outside the source tree between builds.
+
+    Ninja then only recompiles what changed since the last build of a package.
+    Directories of removed packages are pruned, and once all directories outgrow
+    `max_size` the least recently used ones are removed. Ninja does not take part
+    in the make jobserver, so each build is limited to `jobs` compile jobs instead.
+    """
+
+    def __init__(self, path: Path, max_size: int, jobs: int) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.jobs = jobs
+
+    def get(self, package: ROSPackage) -> Path:
+        # packages of different workspaces may share a name, but must not share a CMakeCache.txt
+        digest = hashlib.sha256(str(package.path.resolve()).encode()).hexdigest()[:12]
+        return self.path / f"{package.name}-{digest}"
+
+    def get_environment(self, package: ROSPackage) -> dict[str, str]:
+        build_directory = self.get(package)
+        build_directory.mkdir(parents=True, exist_ok=True)
+        (build_directory / _SOURCE_FILE).write_text(str(package.path.resolve()))
+        os.utime(build_directory)
+        return {_BUILD_DIRECTORY_VARIABLE: str(build_directory), _JOBS_VARIABLE: str(self.jobs)}
+
+    def prune(self) -> None:
+        if not self.path.is_dir():
+            return
+
+        entries = []
+        for build_directory in self.path.iterdir():
+            source = build_directory / _SOURCE_FILE
+            if source.is_file() and (Path(source.read_text()) / "package.xml").is_file():
+                entries.append(build_directory)
+            else:
+                _logger.debug("Removing build directory of removed package: %s", build_directory.name)
+                shutil.rmtree(build_directory, ignore_errors=True)
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        sizes = {entry: get_directory_size(entry) for entry in entries}
+        total_size = sum(sizes.values())
+
+        for entry in entries:
+            if total_size <= self.max_size:
+                break
+
+            _logger.debug("Evicting build directory %s", entry.name)
+            total_size -= sizes[entry]
+            shutil.rmtree(entry, ignore_errors=True)
+
+    @staticmethod
+    def use_in_rules(rules: str) -> str:
+        """Build cmake packages with Ninja in the directory given by the environment, if there is one."""
+        build_directory = _BUILD_DIRECTORY_PATTERN.search(rules)
+        if "--buildsystem=cmake " not in rules or build_directory is None:
+            return rules
+
+        # the path stays out of the rules, so that cached debian folders do not depend on the package location
+        directory = f"$(or $({_BUILD_DIRECTORY_VARIABLE}),{build_directory.group(1)})"
+        rules = rules.replace("--buildsystem=cmake ", "--buildsystem=cmake+ninja ")
+        rules = rules.replace(build_directory.group(0), f"--builddirectory={directory}")
+
+        lines = []
+        for line in rules.splitlines(keepends=True):
+            if line.strip() == "dh_auto_build":
+                # dh_auto_build would restrict ninja to a single job unless DEB_BUILD_OPTIONS asks for more
+                jobs = f"$(if $({_JOBS_VARIABLE}),-j $({_JOBS_VARIABLE}))"
+                lines.append(line.replace("dh_auto_build", f"ninja -C {directory} {jobs}"))
+            else:
+                lines.append(line)
+
+        return "".join(lines)
@@ -0,0 +1,175 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+from typing import Mapping
+
+from robenv.ros_package.package import PackageName
+from robenv.ros_package.package import ROSPackage
+
+
+class DependencyCycleError(Exception):
+    def __init__(self, packages: Iterable[PackageName]) -> None:
+        self.packages = sorted(packages)
+        super().__init__(f"Build dependencies contain a cycle between: {self.packages}")
+
+
+class BuildGraph:
+    """
+    Build dependency graph of the packages inside a workspace.
+
+    Packages become ready as soon as all of their in-workspace build
+    dependencies are completed. Ready packages are handed out ordered by the
+    length of their remaining critical path, so that long dependency chains are
+    started as early as possible.
+    """
+
+    def __init__(
+        self,
+        packages: Iterable[ROSPackage],
+        dependencies: Mapping[PackageName, Iterable[str]],
+    ) -> None:
+        self._packages = {package.name: package for package in packages}
+        self._positions = {name: position for position, name in enumerate(self._packages)}
+        self._dependencies = {
+            name: {PackageName(dependency) for dependency in dependencies.get(name, ()) if dependency in self._packages}
+            for name in self._packages
+        }
+        self._dependents: dict[PackageName, set[PackageName]] = {name: set() for name in self._packages}
+        for name, package_dependencies in self._dependencies.items():
+            for dependency in package_dependencies:
+                self._dependents[dependency].add(name)
+
+        self._priorities = self._compute_priorities()
+        self._pending = {name: len(package_dependencies) for name, package_dependencies in self._dependencies.items()}
+        self._ready = {name for name, count in self._pending.items() if count == 0}
+        self._running: set[PackageName] = set()
+        self._completed: set[PackageName] = set()
+
+    def levels(self) -> list[list[ROSPackage]]:
+        """Group the packages into stages whose build dependencies are all part of earlier stages."""
+        in_degree = {name: len(package_dependencies) for name, package_dependencies in self._dependencies.items()}
+        level = [name for name, degree in in_degree.items() if degree == 0]
+        levels: list[list[PackageName]] = []
+
+        while level:
+            levels.append(level)
+            next_level: list[PackageName] = []
+            for name in level:
+                for dependent in self._dependents[name]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_level.append(dependent)
+            # keep the workspace order inside of a stage
+            level = sorted(next_level, key=self._positions.__getitem__)
+
+        if sum(len(level) for level in levels) != len(self._packages):
+            raise DependencyCycleError(self._cycle_members({name for name, degree in in_degree.items() if degree > 0}))
+
+        return [[self._packages[name] for name in level] for level in levels]
+
+    def _cycle_members(self, unsorted: set[PackageName]) -> set[PackageName]:
+        # strip the packages which only depend on a cycle, but are not part of one themselves
+        remaining = set(unsorted)
+        out_degree = {name: len(self._dependents[name] & remaining) for name in remaining}
+        queue = deque(name for name, degree in out_degree.items() if degree == 0)
+
+        while queue:
+            name = queue.popleft()
+            remaining.remove(name)
+            for dependency in self._dependencies[name] & remaining:
+                out_degree[dependency] -= 1
+                if out_degree[dependency] == 0:
+                    queue.append(dependency)
+
+        return remaining
+
+    def _compute_priorities(self) -> dict[PackageName, int]:
+        priorities: dict[PackageName, int] = {}
+        for name in reversed([package.name for level in self.levels() for package in level]):
+            priorities[name] = 1 + max((priorities[dependent] for dependent in self._dependents[name]), default=0)
+        return priorities
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    def dependencies(self, name: PackageName) -> set[PackageName]:
+        return self._dependencies[name]
+
+    def priority(self, name: PackageName) -> int:
+        return self._priorities[name]
+
+    def is_finished(self) -> bool:
+        return len(self._completed) == len(self._packages)
+
+    def has_running(self) -> bool:
+        return len(self._running) > 0
+
+    def ready(self) -> list[ROSPackage]:
+        return [self._packages[name] for name in sorted(self._ready, key=lambda name: (-self._priorities[name], name))]
+
+    def start(self, name: PackageName) -> None:
+        self._ready.remove(name)
+        self._running.add(name)
+
+    def complete(self, name: PackageName) -> list[ROSPackage]:
+        self._running.discard(name)
+        self._ready.discard(name)
+        self._completed.add(name)
+
+        newly_ready = []
+        for dependent in self._dependents[name]:
+            self._pending[dependent] -= 1
+            if self._pending[dependent] == 0 and dependent not in self._completed:
+                self._ready.add(dependent)
+                newly_ready.append(self._packages[dependent])
+
+        return newly_ready
+
+    def fail(self, name: PackageName) -> list[PackageName]:
+        """Complete a failed package and skip all of its transitive dependents, returning the skipped ones."""
+        self.complete(name)
+
+        skipped: list[PackageName] = []
+        queue = deque(sorted(self._dependents[name]))
+        while queue:
+            dependent = queue.popleft()
+            if dependent in self._completed:
+                continue
+            self._completed.add(dependent)
+            self._ready.discard(dependent)
+            skipped.append(dependent)
+            queue.extend(sorted(self._dependents[dependent]))
+
+        return skipped
@@ -31,7 +31,12 @@
 #
 from __future__ import annotations
 
-from concurrent.futures import as_completed
+import re
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import wait
+from contextlib import nullcontext
 from dataclasses import dataclass
 from dataclasses import field
 from functools import lru_cache
@@ -39,35 +44,71 @@ from logging import DEBUG
 from logging import getLogger
 from pathlib import Path
 from shutil import rmtree
+from typing import Any
+from typing import Collection
+from typing import Iterable
 
+from robenv.deb.archive import InvalidDebError
 from robenv.environment.distro import get_distro_config
 from robenv.environment.env import DebName
 from robenv.environment.env import Installable
 from robenv.environment.env import RobEnv
 from robenv.environment.run_command import CommandAbortedError
 from robenv.environment.run_command import CommandFailedError
+from robenv.environment.run_command import ResourceUsage
+from robenv.ros_package.build_cache import BuildCache
+from robenv.ros_package.build_cache import Fingerprint
+from robenv.ros_package.build_cache import compute_fingerprint
+from robenv.ros_package.build_directories import BuildDirectories
+from robenv.ros_package.build_graph import BuildGraph
 from robenv.ros_package.checker import Checker
 from robenv.ros_package.checker import LaunchFilesCheckResult
+from robenv.ros_package.compiler_cache import CompilerCache
+from robenv.ros_package.compiler_cache import CompilerCacheStatistics
+from robenv.ros_package.deb_compression import DebCompression
+from robenv.ros_package.debian_cache import DebianCache
+from robenv.ros_package.debian_cache import compute_debian_fingerprint
+from robenv.ros_package.memory_history import BuildMemoryHistory
 from robenv.ros_package.package import PackageName
 from robenv.ros_package.package import ROSPackage
 from robenv.ros_package.workspace import ROSWorkspace
+from robenv.rosdep.rosdep import get_sources_cache
 from robenv.util.cancelable_executor import CancelableExecutor
 from robenv.util.file_logger import write_log
+from robenv.util.jobserver import Jobserver
+from robenv.util.memory import get_available_memory
+from robenv.util.pressure import AdaptiveConcurrency
 
 
 _logger = getLogger(__name__)
 
+_BUILD_DIRECTORY_PATTERN = re.compile(r"--builddirectory=(\S+)")
+# bump whenever the rewriting of debian/rules changes, so that cached debian folders are regenerated
+_RULES_REVISION = "3"
+
 
 @dataclass()
 class BuildResult:
     installables: list[Installable] = field(default_factory=list)
     failed_packages: list[str] = field(default_factory=list)
+    # skipped package -> failed dependency it was skipped for
+    skipped_packages: dict[str, str] = field(default_factory=dict)
     missing_launch_files: list[LaunchFilesCheckResult] = field(default_factory=list)
+    cache_hits: list[str] = field(default_factory=list)
+    cache_misses: list[str] = field(default_factory=list)
+    # package -> peak memory usage of its build in bytes
+    peak_rss: dict[str, int] = field(default_factory=dict)
+    compiler_cache: dict[str, CompilerCacheStatistics] = field(default_factory=dict)
 
     def __add__(self, other: BuildResult) -> BuildResult:
         self.installables += other.installables
         self.failed_packages += other.failed_packages
+        self.skipped_packages.update(other.skipped_packages)
         self.missing_launch_files += other.missing_launch_files
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.peak_rss.update(other.peak_rss)
+        self.compiler_cache.update(other.compiler_cache)
         return self
 
 
@@ -81,6 +122,15 @@ class Builder:
         max_workers: int,
         checker: Checker,
         can_fail: bool,
+        build_cache: BuildCache | None = None,
+        debian_cache: DebianCache | None = None,
+        jobserver: Jobserver | None = None,
+        memory_history: BuildMemoryHistory | None = None,
+        memory_budget: int | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        compiler_cache: CompilerCache | None = None,
+        build_directories: BuildDirectories | None = None,
+        deb_compression: DebCompression | None = None,
     ) -> None:
         self._robenv = robenv
         self._dist_folder = dist_folder
@@ -88,6 +138,18 @@ class Builder:
         self._max_workers = max_workers
         self._checker = checker
         self._can_fail = can_fail
+        self._build_cache = build_cache
+        self._debian_cache = debian_cache
+        self._jobserver = jobserver
+        self._memory_history = memory_history
+        self._memory_budget = memory_budget
+        self._concurrency = concurrency
+        self._compiler_cache = compiler_cache
+        self._build_directories = build_directories
+        self._deb_compression = deb_compression
+        self._fingerprints: dict[PackageName, Fingerprint] = {}
+        # packages whose debian folder was already generated ahead of their build
+        self._prepared: set[PackageName] = set()
 
     @staticmethod
     def clear_package_cache(package: ROSPackage) -> None:
@@ -101,50 +163,188 @@ class Builder:
         self,
         workspace: ROSWorkspace,
     ) -> BuildResult:
-        install_tree = workspace.get_install_tree()
-        _logger.info("Building in %s stages", len(install_tree))
+        graph = workspace.get_build_graph()
+        _logger.info("Building %s packages", len(graph))
+
+        if self._build_directories is not None:
+            self._build_directories.prune()
 
         result = BuildResult()
-        with CancelableExecutor(max_workers=self._max_workers) as pool:
-            for level, stage in enumerate(install_tree):
-                if _logger.isEnabledFor(DEBUG):
-                    _logger.debug("Build Order (level=%s): %s", level, [p.name for p in stage])
-
-                futures = {pool.submit(self.build_package, package): package for package in stage}
-                built_stage: list[tuple[ROSPackage, Installable]] = []
-                for future in as_completed(futures):
-                    package = futures[future]
-                    build_result = future.result()
-                    result += build_result
-                    if len(build_result.installables):
-                        built_stage.append((package, build_result.installables[0]))
-
-                failed = self._install_stage(built_stage)
-                result.failed_packages += failed
-
-                _logger.debug("Done with current level: %s", level)
+        for package in self._generate_debian_folders(self._get_packages_to_build(graph)):
+            result.failed_packages.append(package.name)
+            self._skip_dependents(graph, package, result)
+
+        memory_limit = self._get_memory_limit()
+
+        # installs change the robenv, so they run one after another on a dedicated worker while builds go on
+        with CancelableExecutor(max_workers=self._max_workers) as pool, CancelableExecutor(max_workers=1) as installer:
+            building: dict[Future[BuildResult], ROSPackage] = {}
+            installing: dict[Future[bool], ROSPackage] = {}
+
+            while not graph.is_finished():
+                self._schedule_ready(graph, pool, building, memory_limit)
+
+                pending: list[Future[Any]] = [*building, *installing]
+                # with an adaptive limit, further builds may be started while all running builds take long
+                timeout = self._concurrency.interval if self._concurrency is not None else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in building:
+                        package = building.pop(future)
+                        build_result = future.result()
+                        result += build_result
+                        self._record_memory(build_result)
+
+                        if package.name in build_result.failed_packages:
+                            self._skip_dependents(graph, package, result)
+                            continue
+
+                        if len(build_result.installables) > 0:
+                            installable = build_result.installables[0]
+                            installing[installer.submit(self._install, package, installable)] = package
+                            continue
+                    else:
+                        package = installing.pop(future)
+                        if not future.result():
+                            result.failed_packages.append(package.name)
+                            self._skip_dependents(graph, package, result)
+                            continue
+
+                    # dependents may only start once the package is installed
+                    newly_ready = graph.complete(package.name)
+                    if _logger.isEnabledFor(DEBUG) and newly_ready:
+                        _logger.debug("Unblocked by %s: %s", package.name, [p.name for p in newly_ready])
+
         return result
 
-    def build_package(self, package: ROSPackage) -> BuildResult:
+    def _schedule_ready(
+        self,
+        graph: BuildGraph,
+        pool: CancelableExecutor,
+        building: dict[Future[BuildResult], ROSPackage],
+        memory_limit: int | None,
+    ) -> None:
+        limit = self._concurrency.update() if self._concurrency is not None else self._max_workers
+        # running builds are never stopped, a lowered limit only holds back new ones
+        for package in graph.ready()[: max(limit - len(building), 0)]:
+            if not self._fits_into_memory(package, building.values(), memory_limit):
+                _logger.debug("Delaying %s, its build would exceed the memory limit", package.name)
+                return
+
+            _logger.debug("Scheduling %s (critical path: %s)", package.name, graph.priority(package.name))
+            graph.start(package.name)
+            building[pool.submit(self.build_package, package, graph.dependencies(package.name))] = package
+
+    def _get_memory_limit(self) -> int | None:
+        if self._memory_history is None:
+            return None
+
+        memory_limit = self._memory_budget if self._memory_budget is not None else get_available_memory()
+        if memory_limit is not None:
+            _logger.debug("Admitting builds up to a predicted memory usage of %s bytes", memory_limit)
+        return memory_limit
+
+    def _fits_into_memory(
+        self,
+        package: ROSPackage,
+        running: Collection[ROSPackage],
+        memory_limit: int | None,
+    ) -> bool:
+        # a single build is always admitted, even if it is predicted to exceed the limit on its own
+        if self._memory_history is None or memory_limit is None or len(running) == 0:
+            return True
+
+        predicted = sum(self._memory_history.predict(p.name) for p in (*running, package))
+        return predicted <= memory_limit
+
+    def _record_memory(self, build_result: BuildResult) -> None:
+        if self._memory_history is None:
+            return
+
+        for package_name, peak_rss in build_result.peak_rss.items():
+            self._memory_history.record(PackageName(package_name), peak_rss)
+
+    def _get_packages_to_build(self, graph: BuildGraph) -> list[ROSPackage]:
+        """Fingerprint all packages in build order, returns those that have neither a deb-file nor a cached build."""
+        packages: list[ROSPackage] = []
+        with CancelableExecutor(max_workers=self._max_workers) as pool:
+            # fingerprints include the ones of the dependencies, so each stage waits for the one before
+            for level in graph.levels():
+                checks = {
+                    package: pool.submit(self._needs_build, package, graph.dependencies(package.name))
+                    for package in level
+                }
+                packages.extend(package for package, check in checks.items() if check.result())
+
+        return packages
+
+    def _needs_build(self, package: ROSPackage, dependencies: Iterable[PackageName]) -> bool:
+        fingerprint = self._fingerprint(package, self._make_target(package), dependencies)
+
+        if not self._overwrite and self._get_build_target(package).exists():
+            return False
+
+        return fingerprint is None or self._build_cache is None or not self._build_cache.contains(fingerprint)
+
+    def _generate_debian_folders(self, packages: list[ROSPackage]) -> list[ROSPackage]:
+        """Run bloom for all packages to build at once, it needs no built dependencies. Returns the failed packages."""
+        if len(packages) == 0:
+            return []
+
+        _logger.info("Generating debian folders for %s packages", len(packages))
+        with CancelableExecutor(max_workers=self._max_workers) as pool:
+            generating = {pool.submit(self._prepare, package): package for package in packages}
+
+        return [package for future, package in generating.items() if not future.result()]
+
+    def _prepare(self, package: ROSPackage) -> bool:
+        try:
+            self.clear_package_cache(package)
+            self._make_makefile(package)
+        except (CommandAbortedError, CommandFailedError) as e:
+            _logger.error("Generating debian folder for %s failed", package.name)  # noqa: TRY400
+            write_log(self._robenv.path, package.name, e.output)
+            if not self._can_fail:
+                raise
+            return False
+
+        self._prepared.add(package.name)
+        return True
+
+    @staticmethod
+    def _skip_dependents(graph: BuildGraph, package: ROSPackage, result: BuildResult) -> None:
+        # dependents of a failed package would fail as well, so they are not even started
+        for dependent in graph.fail(package.name):
+            _logger.warning("Skipping %s due to failed dependency %s", dependent, package.name)
+            result.skipped_packages[dependent] = package.name
+
+    def build_package(self, package: ROSPackage, dependencies: Iterable[PackageName] = ()) -> BuildResult:
         _logger.info("Building: %s", package.name)
         make_target = self._make_target(package)
-        build_target = self._dist_folder / make_target.name
+        build_target = self._get_build_target(package)
 
         if self._overwrite:
             _logger.debug("Removing potentially existing deb-file: %s", str(build_target))
             build_target.unlink(missing_ok=True)
 
+        fingerprint = self._fingerprints.get(package.name) or self._fingerprint(package, make_target, dependencies)
+
         result = BuildResult()
-        if not build_target.exists():
-            try:
-                self.clear_package_cache(package)
-                self._make_makefile(package)
-                self._run_build(package)
-                make_target.rename(build_target)
+        if build_target.exists():
+            _logger.info("Build %s skipped. Deb file exist.", package.name)
+        elif self._restore_from_cache(fingerprint, build_target):
+            _logger.info("Build %s skipped. Restored from build cache.", package.name)
+            result.cache_hits.append(package.name)
+            self._add_installable(result, package, build_target)
+            if package.name in self._prepared:
                 self.clear_package_cache(package)
-                installable = Installable(package.name, self._resolve_deb_name(package), build_target)
-                result.installables.append(installable)
-                result.missing_launch_files.append(self._checker.get_missing_launch_files(package, installable))
+        else:
+            try:
+                self._build(package, make_target, build_target, result)
+                if fingerprint is not None and self._build_cache is not None:
+                    self._build_cache.store(fingerprint, build_target)
+                    result.cache_misses.append(package.name)
+                self._add_installable(result, package, build_target)
                 _logger.info("Building done: %s", package.name)
             except (CommandAbortedError, CommandFailedError) as e:
                 _logger.error("Building %s failed", package.name)  # noqa: TRY400
@@ -152,39 +352,106 @@ class Builder:
                 write_log(self._robenv.path, package.name, e.output)
                 if not self._can_fail:
                     raise
-        else:
-            _logger.info("Build %s skipped. Deb file exist.", package.name)
 
         return result
 
-    def _install_stage(
+    def _fingerprint(
         self,
-        built_stage: list[tuple[ROSPackage, Installable]],
-    ) -> list[PackageName]:
-        failed_packages = []
-
-        for package, installable in built_stage:
-            try:
-                _logger.info("installing: %s", installable.deb_name)
-                self._robenv.install(installable, overwrite=self._overwrite, check_dependencies=False)
-                _logger.info("install %s was successful", installable.deb_name)
-            except (CommandAbortedError, CommandFailedError) as e:  # noqa: PERF203
-                _logger.exception("install %s failed", package.name)
-                failed_packages.append(package.name)
-                write_log(self._robenv.path, package.name, e.output)
-                if not self._can_fail:
-                    raise
-
-        return failed_packages
+        package: ROSPackage,
+        make_target: Path,
+        dependencies: Iterable[PackageName],
+    ) -> Fingerprint | None:
+        if self._build_cache is None:
+            return None
+
+        try:
+            dependency_fingerprints = [self._fingerprints[dependency] for dependency in dependencies]
+        except KeyError:
+            _logger.debug("Not all dependencies of %s are fingerprinted, skipping build cache", package.name)
+            return None
+
+        fingerprint = compute_fingerprint(
+            package,
+            dependency_fingerprints,
+            self._robenv.ros_distro,
+            str(self._robenv.path),
+            make_target.name,
+        )
+        self._fingerprints[package.name] = fingerprint
+        return fingerprint
+
+    def _restore_from_cache(self, fingerprint: Fingerprint | None, build_target: Path) -> bool:
+        if fingerprint is None or self._build_cache is None:
+            return False
+
+        return self._build_cache.restore(fingerprint, build_target)
+
+    def _build(self, package: ROSPackage, make_target: Path, build_target: Path, result: BuildResult) -> None:
+        if package.name not in self._prepared:
+            self.clear_package_cache(package)
+            self._make_makefile(package)
+        self._run_build(package, result)
+        make_target.rename(build_target)
+        self.clear_package_cache(package)
+
+    def _add_installable(self, result: BuildResult, package: ROSPackage, build_target: Path) -> None:
+        installable = Installable(package.name, self._resolve_deb_name(package), build_target)
+        result.installables.append(installable)
+        result.missing_launch_files.append(self._checker.get_missing_launch_files(package, installable))
+
+    def _install(self, package: ROSPackage, installable: Installable) -> bool:
+        try:
+            _logger.info("installing: %s", installable.deb_name)
+            self._robenv.install(installable, overwrite=self._overwrite, check_dependencies=False)
+            _logger.info("install %s was successful", installable.deb_name)
+        except (CommandAbortedError, CommandFailedError, InvalidDebError, OSError) as e:
+            _logger.exception("install %s failed", package.name)
+            # deb-files are read natively, broken ones fail without the output of a command
+            output = e.output if isinstance(e, (CommandAbortedError, CommandFailedError)) else str(e)
+            write_log(self._robenv.path, package.name, output)
+            if not self._can_fail:
+                raise
+            return False
+
+        return True
 
     def _make_target(self, package: ROSPackage) -> Path:
         return (package.path / ".." / self._resolve_deb_name(package)).resolve()
 
-    def _run_build(self, package: ROSPackage) -> None:
-        self._robenv.shell.run(
-            "fakeroot debian/rules binary",
-            cwd=package.path,
-        )
+    def _get_build_target(self, package: ROSPackage) -> Path:
+        return self._dist_folder / self._make_target(package).name
+
+    def _run_build(self, package: ROSPackage, result: BuildResult) -> None:
+        """Build the deb-file of a package and record the statistics of the build."""
+        usage = ResourceUsage()
+        env: dict[str, str] = {}
+        pass_fds: tuple[int, ...] = ()
+        statistics_log = package.path / "debian" / "ccache.log"
+
+        if self._compiler_cache is not None:
+            statistics_log.unlink(missing_ok=True)
+            env.update(self._compiler_cache.get_environment(statistics_log))
+        if self._build_directories is not None:
+            env.update(self._build_directories.get_environment(package))
+        if self._deb_compression is not None:
+            env.update(self._deb_compression.get_environment())
+        if self._jobserver is not None:
+            env.update(self._jobserver.get_environment())
+            pass_fds = self._jobserver.file_descriptors
+
+        # the token taken here is the one of the top-level make, all others come from the jobserver
+        with self._jobserver.token() if self._jobserver is not None else nullcontext():
+            self._robenv.shell.run(
+                "fakeroot debian/rules binary",
+                cwd=package.path,
+                env=env,
+                pass_fds=pass_fds,
+                resource_usage=usage,
+            )
+
+        result.peak_rss[package.name] = usage.peak_rss
+        if self._compiler_cache is not None:
+            result.compiler_cache[package.name] = self._compiler_cache.read_statistics(statistics_log)
 
         make_target = self._make_target(package)
         if package.is_metapackage():
@@ -197,14 +464,56 @@ class Builder:
             for file in distro_config.meta_package_prevent_overwrite:
                 (ros_root / file).unlink(missing_ok=True)
 
-            self._robenv.shell.run(
-                f"dpkg-deb --build --root-owner-group {root_path}",
-                cwd=package.path,
-            )
+            self._build_metapackage(package, root_path)
             make_target.unlink()
             deb_path.rename(make_target)
 
+    def _build_metapackage(self, package: ROSPackage, root_path: Path) -> None:
+        if self._deb_compression is None:
+            self._robenv.shell.run(f"dpkg-deb --build --root-owner-group {root_path}", cwd=package.path)
+            return
+
+        self._robenv.shell.run(
+            f"dpkg-deb --build --root-owner-group {self._deb_compression.dpkg_deb_arguments} {root_path}",
+            cwd=package.path,
+            env=self._deb_compression.get_environment(),
+        )
+
     def _make_makefile(self, package: ROSPackage) -> None:
+        debian_folder = package.path / "debian"
+        fingerprint = self._debian_fingerprint(package)
+
+        if (
+            fingerprint is not None
+            and self._debian_cache is not None
+            and self._debian_cache.restore(fingerprint, debian_folder)
+        ):
+            _logger.info("bloom-generate %s skipped. Restored debian folder from cache.", package.name)
+            return
+
+        self._generate_makefile(package)
+
+        if fingerprint is not None and self._debian_cache is not None:
+            self._debian_cache.store(fingerprint, debian_folder)
+
+    def _debian_fingerprint(self, package: ROSPackage) -> Fingerprint | None:
+        if self._debian_cache is None:
+            return None
+
+        return compute_debian_fingerprint(
+            package,
+            self._robenv.rosdep.get_rosdep_yml_file_path(),
+            get_sources_cache(self._robenv.path) / "index",
+            self._robenv.ros_distro,
+            str(self._robenv.path),
+            _RULES_REVISION,
+            "ccache" if self._compiler_cache is not None else "",
+            "ninja" if self._build_directories is not None else "",
+            "jobserver" if self._jobserver is not None else "",
+            self._deb_compression.value if self._deb_compression is not None else "",
+        )
+
+    def _generate_makefile(self, package: ROSPackage) -> None:
         distro = self._robenv.ros_distro
 
         self._robenv.shell.run(
@@ -217,7 +526,7 @@ class Builder:
 
         makefile = package.path / "debian" / "rules"
 
-        makefile.write_text(
+        rules = (
             makefile.read_text()
             .replace(
                 f"PKG_CONFIG_PATH=/opt/ros/{distro}/lib/pkgconfig",
@@ -230,8 +539,36 @@ class Builder:
             .replace(
                 f"/opt/ros/{distro}/setup.sh",
                 f"{self._robenv.path!s}/activate",
-            ),
+            )
         )
+        if self._build_directories is not None:
+            rules = self._build_directories.use_in_rules(rules)
+        elif self._jobserver is not None:
+            rules = self._share_jobserver(rules)
+        if self._compiler_cache is not None:
+            rules = self._compiler_cache.use_in_rules(rules)
+        if self._deb_compression is not None:
+            rules = self._deb_compression.use_in_rules(rules)
+        makefile.write_text(rules)
+
+    @staticmethod
+    def _share_jobserver(rules: str) -> str:
+        """Let the compiling make inherit the jobserver of debian/rules, dh_auto_build would hide it behind -j."""
+        build_directory = _BUILD_DIRECTORY_PATTERN.search(rules)
+        if "--buildsystem=cmake" not in rules or build_directory is None:
+            return rules
+
+        lines = []
+        for line in rules.splitlines(keepends=True):
+            if line.startswith("\tdh $@"):
+                # recipes starting with + get the jobserver passed on by make
+                lines.append(f"\t+{line[1:]}")
+            elif line.strip() == "dh_auto_build":
+                lines.append(line.replace("dh_auto_build", f"$(MAKE) -C {build_directory.group(1)}"))
+            else:
+                lines.append(line)
+
+        return "".join(lines)
 
     @staticmethod
     @lru_cache
@@ -35,9 +35,7 @@ from dataclasses import dataclass
 from logging import getLogger
 from pathlib import Path
 
-from deb_pkg_tools.package import ArchiveEntry
-from deb_pkg_tools.package import inspect_package_contents
-
+from robenv.deb.archive import read_deb
 from robenv.environment.env import Installable
 from robenv.ros_package.package import ROSPackage
 from robenv.util.paths import remove_slash_prefix
@@ -79,7 +77,7 @@ class Checker:
     def get_missing_launch_files(self, package: ROSPackage, installable: Installable) -> LaunchFilesCheckResult:
         if not self.check:
             return LaunchFilesCheckResult(package=package, missing_files=[])
-        contents: dict[str, ArchiveEntry] = inspect_package_contents(str(installable.location))
+        contents = read_deb(installable.location).contents
         launch_files_in_deb = [Path(remove_slash_prefix(p)) for p in contents if p.endswith(".launch")]
         _logger.debug("Found launch files in deb-file: %s", launch_files_in_deb)
 
@@ -0,0 +1,88 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+_CONFIGURE_LINE = "\tdh_auto_configure -- \\\n"
+_COMPILER_LAUNCHERS = "\t\t-DCMAKE_C_COMPILER_LAUNCHER=ccache \\\n\t\t-DCMAKE_CXX_COMPILER_LAUNCHER=ccache \\\n"
+
+
+@dataclass(frozen=True)
+class CompilerCacheStatistics:
+    hits: int = 0
+    misses: int = 0
+
+    def __add__(self, other: CompilerCacheStatistics) -> CompilerCacheStatistics:
+        return CompilerCacheStatistics(self.hits + other.hits, self.misses + other.misses)
+
+
+class CompilerCache:
+    """
+    ccache directory shared by all package builds of a robenv.
+
+    The build directories are removed after every build, so only ccache can reuse compiled objects.
+    """
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        self.path = path
+        self.max_size = max_size
+
+    def get_environment(self, statistics_log: Path) -> dict[str, str]:
+        return {
+            "CCACHE_DIR": str(self.path),
+            "CCACHE_MAXSIZE": f"{self.max_size // 1024}Ki",
+            # concurrent builds share the cache, so the statistics of a single build are taken from its own log
+            "CCACHE_STATSLOG": str(statistics_log),
+        }
+
+    @staticmethod
+    def read_statistics(statistics_log: Path) -> CompilerCacheStatistics:
+        """Count the results logged by ccache, older versions without CCACHE_STATSLOG support write no log."""
+        try:
+            lines = statistics_log.read_text().splitlines()
+        except FileNotFoundError:
+            return CompilerCacheStatistics()
+
+        hits = sum(1 for line in lines if line.endswith("_cache_hit"))
+        misses = sum(1 for line in lines if line == "cache_miss")
+        return CompilerCacheStatistics(hits, misses)
+
+    @staticmethod
+    def use_in_rules(rules: str) -> str:
+        """Configure cmake to run all compilers through ccache."""
+        if "--buildsystem=cmake" not in rules or _CONFIGURE_LINE not in rules:
+            return rules
+
+        return rules.replace(_CONFIGURE_LINE, _CONFIGURE_LINE + _COMPILER_LAUNCHERS)
@@ -0,0 +1,63 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from enum import Enum
+
+from robenv.util.cpu_count import get_cpu_count
+
+
+class DebCompression(Enum):
+    """
+    Compression of the deb-files built for a robenv.
+
+    They are extracted into the robenv right after building, so compressing them well rarely pays off.
+    """
+
+    NONE = "none"
+    ZSTD = "zstd"
+    XZ = "xz"
+
+    @property
+    def dpkg_deb_arguments(self) -> str:
+        return f"-Z{self.value}"
+
+    @staticmethod
+    def get_environment() -> dict[str, str]:
+        # only read by dpkg-deb 1.21.9 and newer, older versions compress with a single thread
+        return {"DPKG_DEB_THREADS_MAX": str(get_cpu_count())}
+
+    def use_in_rules(self, rules: str) -> str:
+        if "override_dh_builddeb:" in rules:
+            return rules
+
+        return f"{rules.rstrip()}\n\noverride_dh_builddeb:\n\tdh_builddeb -- {self.dpkg_deb_arguments}\n"
@@ -0,0 +1,152 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+
+from functools import lru_cache
+from importlib import metadata
+from logging import getLogger
+from pathlib import Path
+from tempfile import mkdtemp
+from threading import Lock
+
+from robenv.ros_package.build_cache import Fingerprint
+from robenv.ros_package.package import ROSPackage
+from robenv.util.size import get_directory_size
+
+
+_logger = getLogger(__name__)
+
+# bloom reads the changelog next to the package.xml to fill debian/changelog
+_BLOOM_INPUTS = ("package.xml", "CHANGELOG.rst")
+
+
+@lru_cache
+def _get_bloom_version() -> str:
+    try:
+        return metadata.version("bloom")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _describe_file(file: Path) -> str:
+    try:
+        stat = file.stat()
+    except FileNotFoundError:
+        return f"{file}:missing"
+    return f"{file}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def compute_debian_fingerprint(package: ROSPackage, rosdep_file: Path, sources_index: Path, *salts: str) -> Fingerprint:
+    digest = hashlib.sha256(_get_bloom_version().encode())
+
+    for name in _BLOOM_INPUTS:
+        file = package.path / name
+        if file.exists():
+            digest.update(name.encode())
+            digest.update(file.read_bytes())
+
+    # the rosdep database decides which debian packages the dependencies resolve to
+    digest.update(rosdep_file.read_bytes() if rosdep_file.exists() else b"")
+    digest.update(_describe_file(sources_index).encode())
+
+    for salt in salts:
+        digest.update(salt.encode())
+
+    return Fingerprint(digest.hexdigest())
+
+
+class DebianCache:
+    """
+    Store of the debian/ directories generated by bloom.
+
+    Entries are keyed by the fingerprint of everything bloom-generate reads,
+    restoring one replaces running bloom for an unchanged package.
+    Once the cache outgrows `max_size` the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._lock = Lock()
+
+    def restore(self, fingerprint: Fingerprint, target: Path) -> bool:
+        entry = self._path / fingerprint
+
+        with self._lock:
+            if not entry.is_dir():
+                return False
+
+            os.utime(entry)
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(entry, target, symlinks=True)
+
+        return True
+
+    def store(self, fingerprint: Fingerprint, debian_folder: Path) -> None:
+        entry = self._path / fingerprint
+        if entry.exists():
+            return
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        temporary_folder = Path(mkdtemp(prefix=f"{fingerprint}.", dir=self._path))
+        try:
+            shutil.copytree(debian_folder, temporary_folder / "debian", symlinks=True)
+            with self._lock:
+                (temporary_folder / "debian").rename(entry)
+                self._evict()
+        except OSError:
+            # another build stored the same entry in the meantime
+            _logger.debug("Could not store debian cache entry %s", fingerprint, exc_info=True)
+        finally:
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+
+    def _evict(self) -> None:
+        # temporary folders of entries being stored carry a suffix after the fingerprint
+        entries = sorted(
+            (entry for entry in self._path.iterdir() if "." not in entry.name),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        sizes = {entry: get_directory_size(entry) for entry in entries}
+        total_size = sum(sizes.values())
+
+        for entry in entries:
+            if total_size <= self._max_size:
+                break
+
+            _logger.debug("Evicting %s from debian cache", entry.name)
+            total_size -= sizes[entry]
+            shutil.rmtree(entry, ignore_errors=True)
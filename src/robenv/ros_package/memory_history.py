@@ -0,0 +1,67 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.ros_package.package import PackageName
+
+
+class BuildMemoryHistory:
+    """
+    Peak memory usage of the previous build of every package, stored in the robenv database.
+
+    Packages built for the first time are predicted to need the average of all known packages.
+    """
+
+    def __init__(self, database: RobEnvDatabase) -> None:
+        self._database = database
+        self._peak_rss: dict[PackageName, int] = {
+            PackageName(package): peak_rss
+            for package, peak_rss in database.query("SELECT package, peak_rss FROM build_memory")
+        }
+
+    def record(self, package: PackageName, peak_rss: int) -> None:
+        with self._database.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO build_memory (package, peak_rss) VALUES (?, ?)",
+                (package, peak_rss),
+            )
+        self._peak_rss[package] = peak_rss
+
+    def predict(self, package: PackageName) -> int:
+        if package in self._peak_rss:
+            return self._peak_rss[package]
+
+        if len(self._peak_rss) == 0:
+            return 0
+
+        return sum(self._peak_rss.values()) // len(self._peak_rss)
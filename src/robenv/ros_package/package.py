@@ -32,7 +32,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from dataclasses import field
 from pathlib import Path
 from typing import NewType
 
@@ -60,17 +59,29 @@ class ExternalDependency:
     required_by: list[ROSPackage]
 
 
-@dataclass
+@dataclass(frozen=True, repr=False)
 class ROSPackage:
+    # workspaces can contain thousands of packages, slots keep every one of them small
+    __slots__ = ("name", "path", "version", "build_dependencies", "exec_dependencies", "metapackage")
+
     name: PackageName
     path: Path
     version: str
 
-    _package_xml: ElementTree = field(repr=False)
+    build_dependencies: frozenset[str]
+    exec_dependencies: frozenset[str]
+    metapackage: bool
+
+    def __repr__(self) -> str:
+        return f"ROSPackage(name={self.name!r}, path={self.path!r}, version={self.version!r})"
+
+    @staticmethod
+    def get_package_file(project: Path) -> Path:
+        return project.absolute() / "package.xml"
 
     @classmethod
     def from_project(cls, project: Path) -> ROSPackage:
-        package_file = project.absolute() / "package.xml"
+        package_file = cls.get_package_file(project)
 
         if not package_file.exists():
             raise PackageXMLNotExistsError(package_file)
@@ -95,18 +106,21 @@ class ROSPackage:
         if name is None or version is None:
             raise UnrecognizedPackageFormatError(package_file, "not name", "not version")
 
+        depends = {tag.text for tag in package_root.findall("depend")}
         return ROSPackage(
             name=name,
             path=project.absolute(),
             version=version,
-            _package_xml=package_root,
+            build_dependencies=frozenset({tag.text for tag in package_root.findall("build_depend")} | depends),
+            exec_dependencies=frozenset({tag.text for tag in package_root.findall("exec_depend")} | depends),
+            metapackage=package_root.find(".//metapackage") is not None,
         )
 
-    def get_build_dependencies(self) -> list[str]:
-        return [tag.text for tag in self._package_xml.findall("build_depend") + self._package_xml.findall("depend")]
+    def get_build_dependencies(self) -> frozenset[str]:
+        return self.build_dependencies
 
-    def get_exec_dependencies(self) -> list[str]:
-        return [tag.text for tag in self._package_xml.findall("exec_depend") + self._package_xml.findall("depend")]
+    def get_exec_dependencies(self) -> frozenset[str]:
+        return self.exec_dependencies
 
     def is_metapackage(self) -> bool:
-        return self._package_xml.find(".//metapackage") is not None
+        return self.metapackage
@@ -0,0 +1,141 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import os
+
+from logging import getLogger
+from pathlib import Path
+from typing import TypedDict
+
+from robenv.ros_package.package import PackageName
+from robenv.ros_package.package import ROSPackage
+from robenv.util.paths import get_user_cache_path
+
+
+_logger = getLogger(__name__)
+
+_CACHE_VERSION = 1
+
+
+class _CachedPackage(TypedDict):
+    mtime_ns: int
+    size: int
+    name: str
+    version: str
+    build_dependencies: list[str]
+    exec_dependencies: list[str]
+    metapackage: bool
+
+
+def get_package_cache_path() -> Path:
+    return get_user_cache_path() / "packages.json"
+
+
+class PackageCache:
+    """
+    Parsed package.xml files of all workspaces, stored across robenv calls.
+
+    Entries are keyed by the path of the package.xml and only reused while its
+    mtime and size are unchanged, everything else is parsed again.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._packages = self._read()
+        self._changed = False
+
+    @classmethod
+    def default(cls) -> PackageCache:
+        return cls(get_package_cache_path())
+
+    def _read(self) -> dict[str, _CachedPackage]:
+        try:
+            content = json.loads(self._path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(content, dict) or content.get("version") != _CACHE_VERSION:
+            return {}
+
+        packages: dict[str, _CachedPackage] = content["packages"]
+        return packages
+
+    def get(self, project: Path) -> ROSPackage:
+        package_file = ROSPackage.get_package_file(project)
+        try:
+            stat = package_file.stat()
+        except FileNotFoundError:
+            return ROSPackage.from_project(project)
+
+        cached = self._packages.get(str(package_file))
+        if cached is not None and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return ROSPackage(
+                name=PackageName(cached["name"]),
+                path=package_file.parent,
+                version=cached["version"],
+                build_dependencies=frozenset(cached["build_dependencies"]),
+                exec_dependencies=frozenset(cached["exec_dependencies"]),
+                metapackage=cached["metapackage"],
+            )
+
+        package = ROSPackage.from_project(project)
+        self._packages[str(package_file)] = _CachedPackage(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            name=package.name,
+            version=package.version,
+            build_dependencies=sorted(package.build_dependencies),
+            exec_dependencies=sorted(package.exec_dependencies),
+            metapackage=package.metapackage,
+        )
+        self._changed = True
+        return package
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+
+        # entries of deleted packages would otherwise pile up forever
+        self._packages = {path: package for path, package in self._packages.items() if Path(path).exists()}
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"version": _CACHE_VERSION, "packages": self._packages}))
+            tmp_path.replace(self._path)
+        except OSError:
+            _logger.debug("Could not write the package cache to %s", self._path, exc_info=True)
+            return
+
+        self._changed = False
@@ -31,6 +31,8 @@
 #
 from __future__ import annotations
 
+import os
+
 from dataclasses import dataclass
 from logging import DEBUG
 from logging import getLogger
@@ -38,9 +40,11 @@ from pathlib import Path
 from typing import ClassVar
 
 from robenv.catkin_profile import CatkinProfile
+from robenv.ros_package.build_graph import BuildGraph
 from robenv.ros_package.package import ExternalDependency
 from robenv.ros_package.package import PackageName
 from robenv.ros_package.package import ROSPackage
+from robenv.ros_package.package_cache import PackageCache
 
 
 _logger = getLogger(__name__)
@@ -59,12 +63,20 @@ class ROSWorkspace:
         "debian",
     ]
 
-    robenv_marker_file: ClassVar[str] = "robenv/settings.yaml"
+    ignore_markers: ClassVar[tuple[str, ...]] = ("CATKIN_IGNORE", "COLCON_IGNORE", "AMENT_IGNORE")
+
+    # robenvs created before the robenv database only have the settings file
+    robenv_marker_files: ClassVar[tuple[str, ...]] = ("robenv/robenv.db", "robenv/settings.yaml")
 
     @classmethod
-    def from_workspace(cls, workspace_path: Path, profile: CatkinProfile) -> ROSWorkspace:
+    def from_workspace(
+        cls,
+        workspace_path: Path,
+        profile: CatkinProfile,
+        package_cache: PackageCache | None = None,
+    ) -> ROSWorkspace:
         absolute_workspace_path = workspace_path.absolute()
-        ros_packages = ROSWorkspace._get_ros_packages(absolute_workspace_path, profile)
+        ros_packages = ROSWorkspace._get_ros_packages(absolute_workspace_path, profile, package_cache)
         external_dependencies = ROSWorkspace._get_external_dependencies(ros_packages)
         return cls(
             absolute_workspace_path,
@@ -73,9 +85,17 @@ class ROSWorkspace:
         )
 
     @staticmethod
-    def _get_ros_packages(workspace_path: Path, profile: CatkinProfile) -> list[ROSPackage]:
+    def _get_ros_packages(
+        workspace_path: Path,
+        profile: CatkinProfile,
+        package_cache: PackageCache | None,
+    ) -> list[ROSPackage]:
         packages = ROSWorkspace._get_project_packages_paths(workspace_path)
-        ros_packages = [ROSPackage.from_project(workspace_path / package) for package in packages]
+        if package_cache is None:
+            ros_packages = [ROSPackage.from_project(workspace_path / package) for package in packages]
+        else:
+            ros_packages = [package_cache.get(workspace_path / package) for package in packages]
+            package_cache.save()
 
         if _logger.isEnabledFor(DEBUG):
             _logger.debug("Found unfiltered packages: %s", [p.path for p in ros_packages])
@@ -89,86 +109,78 @@ class ROSWorkspace:
         return filtered_packages
 
     @staticmethod
-    def _is_filtered_path(path: Path) -> bool:
-        return path.name in ROSWorkspace.exclude_locations or (path / ROSWorkspace.robenv_marker_file).exists()
-
-    @staticmethod
-    def _is_valid_package(package_dir: Path) -> bool:
-        return not any(ROSWorkspace._is_filtered_path(path) for path in package_dir.parents)
+    def _is_filtered_directory(directory: Path, entries: dict[str, os.DirEntry[str]]) -> bool:
+        if any(marker in entries for marker in ROSWorkspace.ignore_markers):
+            return True
+
+        # only look for the robenv markers if the directory has the matching child at all
+        return any(
+            marker.split("/")[0] in entries and (directory / marker).exists()
+            for marker in ROSWorkspace.robenv_marker_files
+        )
 
     @staticmethod
     def _get_project_packages_paths(directory: Path = Path("src")) -> list[Path]:
-        paths = [f.parent for f in directory.rglob("package.xml") if ROSWorkspace._is_valid_package(f)]
+        paths: list[Path] = []
+        pending = [directory]
+        visited: set[tuple[int, int]] = set()
+
+        while pending:
+            current = pending.pop()
+            try:
+                # symlinked directories may lead back up the tree or to a directory that is reached another way
+                status = current.stat()
+                if (status.st_dev, status.st_ino) in visited:
+                    continue
+                visited.add((status.st_dev, status.st_ino))
+
+                with os.scandir(current) as iterator:
+                    entries = {entry.name: entry for entry in iterator}
+            except OSError:
+                _logger.debug("Skipping unreadable directory: %s", current)
+                continue
+
+            if ROSWorkspace._is_filtered_directory(current, entries):
+                continue
+
+            package_file = entries.get("package.xml")
+            if package_file is not None and package_file.is_file():
+                # packages never contain further packages, so there is no need to descend any further
+                paths.append(current)
+                continue
+
+            # symlinks are only resolved when they are scanned, where broken ones and loops are skipped
+            pending.extend(
+                current / name
+                for name, entry in entries.items()
+                if not name.startswith(".")
+                and name not in ROSWorkspace.exclude_locations
+                and (entry.is_symlink() or entry.is_dir(follow_symlinks=False))
+            )
+
         paths.sort()
         return paths
 
     @staticmethod
     def _get_external_dependencies(ros_packages: list[ROSPackage]) -> list[ExternalDependency]:
         deps: dict[PackageName, list[ROSPackage]] = {}
-        ros_packages_name_list = [ep.name for ep in ros_packages]
+        ros_package_names = {package.name for package in ros_packages}
 
         for package in ros_packages:
-            dependency_names = set(package.get_build_dependencies() + package.get_exec_dependencies())
-            for name in dependency_names:
-                if name not in ros_packages_name_list:
-                    pkg_name = PackageName(name)
-
-                    if pkg_name in deps:
-                        deps[pkg_name].append(package)
-                    else:
-                        deps[pkg_name] = [package]
+            for name in package.get_build_dependencies() | package.get_exec_dependencies():
+                if name not in ros_package_names:
+                    deps.setdefault(PackageName(name), []).append(package)
 
         return [ExternalDependency(dep, required_by=deps[dep]) for dep in deps]
 
     def sort_ros_packages_for_installation(self) -> list[ROSPackage]:
-        sorted_packages: list[ROSPackage] = []
-        external_dependencies = {ep.name for ep in self.external_dependencies}
-
-        iteration = 0
-        max_iterations = 3
-        while len(self.ros_packages) > len(sorted_packages) and iteration < max_iterations:
-            for package in self.ros_packages:
-                if package in sorted_packages:
-                    continue
-
-                ros_package_dependencies = set(package.get_build_dependencies())
-                ros_package_dependencies -= external_dependencies
-
-                if len(ros_package_dependencies) == 0:
-                    sorted_packages.append(package)
-                    continue
-
-                already_queued_packages = [p.name for p in sorted_packages]
-                unresolved_dependencies = [
-                    name for name in ros_package_dependencies if name not in already_queued_packages
-                ]
-
-                if len(unresolved_dependencies) == 0:
-                    sorted_packages.append(package)
-            iteration += 1
+        return [package for stage in self.get_install_tree() for package in stage]
 
-        return sorted_packages
+    def get_build_graph(self) -> BuildGraph:
+        return BuildGraph(
+            self.ros_packages,
+            {package.name: package.get_build_dependencies() for package in self.ros_packages},
+        )
 
     def get_install_tree(self) -> list[list[ROSPackage]]:
-        external_dependencies_set = {ep.name for ep in self.external_dependencies}
-
-        queues: list[list[ROSPackage]] = []
-        queue: list[ROSPackage] = []
-        for package in self.sort_ros_packages_for_installation():
-            queued_dependencies = {dep.name for q in queues for dep in q}
-            package_depencencies = (
-                set(package.get_build_dependencies()) - external_dependencies_set - queued_dependencies
-            )
-
-            if len(package_depencencies) == 0:
-                queue.append(package)
-                continue
-
-            current_queue_deps = {deb.name for deb in queue}
-            if len(package_depencencies - current_queue_deps) == 0:
-                queues.append(list(queue))
-                queue = [package]
-
-        queues.append(list(queue))
-
-        return queues
+        return self.get_build_graph().levels()
@@ -37,6 +37,7 @@ import yaml
 
 from robenv.catkin_profile.profile import CatkinProfile
 from robenv.environment.distro import RosDistribution
+from robenv.ros_package.package_cache import PackageCache
 from robenv.ros_package.workspace import ROSWorkspace
 from robenv.rosdep.rosdep import Rosdep
 from robenv.rosdep.rosdep import get_sources_list
@@ -51,6 +52,7 @@ def _create_rosdep_file(
     ros_workspace = ROSWorkspace.from_workspace(
         workspace_path,
         CatkinProfile.with_no_blacklist(),
+        PackageCache.default(),
     )
 
     rosdep_content = Rosdep.generate_rosdep_from_workspace(ros_workspace, distro)
@@ -33,17 +33,30 @@ from __future__ import annotations
 
 from pathlib import Path
 from sys import stdout
+from threading import Lock
+from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import NamedTuple
 from typing import NewType
 from typing import Union
 
 import yaml
 
+from rosdep2 import InvalidData
+from rosdep2 import ResolutionError
+from rosdep2 import RosdepLookup
+from rosdep2 import create_default_installer_context
+from rosdep2 import get_default_installer
+from rosdep2.rospkg_loader import DEFAULT_VIEW_KEY
+from rosdep2.sources_list import DataSourceMatcher
+from rosdep2.sources_list import SourcesListLoader
+from rospkg.os_detect import OsDetect
+
 from robenv.environment.distro import RosDistribution
 from robenv.environment.distro import get_distro_config
 from robenv.environment.distro import is_eol_distro
-from robenv.environment.run_command import CommandFailedError
 from robenv.environment.shell import RobEnvShell
 from robenv.ros_package.package import PackageName
 from robenv.ros_package.workspace import ROSWorkspace
@@ -94,13 +107,37 @@ def get_sources_list(robenv_path: Path) -> Path:
     return (robenv_path / "etc/ros/rosdep/sources.list.d/50-robenv.list").absolute()
 
 
+def get_sources_cache(robenv_path: Path) -> Path:
+    # matches ROS_HOME set by the activate script, this is where `rosdep update` puts its cache
+    return (robenv_path / "cache/ros/rosdep/sources.cache").absolute()
+
+
+class ResolveResult(NamedTuple):
+    resolved: dict[PackageName, ResolvedPackageName]
+    unresolvable: list[PackageName]
+
+
+class _RosdepView(NamedTuple):
+    view: Any
+    installer_context: Any
+    installer_keys: list[str]
+    default_key: str
+    os_name: str
+    os_version: str
+
+
 class Rosdep:
-    def __init__(self, robenv_path: Path, shell: RobEnvShell) -> None:
+    def __init__(self, robenv_path: Path, shell: RobEnvShell, ros_distro: RosDistribution) -> None:
         with get_sources_list(robenv_path).open() as sources_list:
             self._path = Path(sources_list.readline()[len("yaml file://") :])
         with self._path.open() as file:
             self._rosdep_yml: RosDepDict = yaml.safe_load(file)
         self._shell = shell
+        self._ros_distro = ros_distro
+        self._sources_cache = get_sources_cache(robenv_path)
+        self._view_lock = Lock()
+        self._view: _RosdepView | None = None
+        self._resolved: dict[PackageName, ResolvedPackageName] = {}
 
     @staticmethod
     def get_rosdep_system() -> SystemName:
@@ -134,13 +171,72 @@ class Rosdep:
     def remove(self, package_name: PackageName) -> None:
         del self._rosdep_yml[package_name]
 
-    def resolve(self, package_name: PackageName) -> ResolvedPackageName:
-        cmd_package = f"rosdep resolve {package_name}"
+    def _get_view(self) -> _RosdepView:
+        """
+        Load the rosdep sources cache of the robenv, same as `rosdep resolve` would do in the activated robenv.
+
+        Only sources matching the ROS distribution and OS of the robenv are used.
+        """
+        if self._view is None:
+            _, _, os_codename = OsDetect().detect_os()
+            installer_context = create_default_installer_context()
+            _, installer_keys, default_key, os_name, os_version = get_default_installer(
+                installer_context=installer_context,
+            )
+            sources_loader = SourcesListLoader.create_default(
+                matcher=DataSourceMatcher([tag for tag in (self._ros_distro, os_name, os_codename) if tag]),
+                sources_cache_dir=str(self._sources_cache),
+            )
+            lookup = RosdepLookup.create_from_rospkg(sources_loader=sources_loader)
+            self._view = _RosdepView(
+                view=lookup.get_rosdep_view(DEFAULT_VIEW_KEY),
+                installer_context=installer_context,
+                installer_keys=installer_keys,
+                default_key=default_key,
+                os_name=os_name,
+                os_version=os_version,
+            )
+
+        return self._view
+
+    def _resolve_key(self, view: _RosdepView, package_name: PackageName) -> ResolvedPackageName:
         try:
-            command_output = self._shell.run(cmd_package, Path.cwd())
-            return ResolvedPackageName(command_output.splitlines()[1])
-        except CommandFailedError as cf_err:
-            raise NotResolvablePackageError(package_name) from cf_err
+            definition = view.view.lookup(package_name)
+            installer_key, rule = definition.get_rule_for_platform(
+                view.os_name,
+                view.os_version,
+                view.installer_keys,
+                view.default_key,
+            )
+            resolved = view.installer_context.get_installer(installer_key).resolve(rule)
+        except (KeyError, ResolutionError, InvalidData) as e:
+            raise NotResolvablePackageError(package_name) from e
+
+        return ResolvedPackageName(" ".join(str(name) for name in resolved))
+
+    def resolve_all(self, package_names: Iterable[PackageName]) -> ResolveResult:
+        result = ResolveResult(resolved={}, unresolvable=[])
+
+        with self._view_lock:
+            view = self._get_view()
+            for package_name in package_names:
+                if package_name not in self._resolved:
+                    try:
+                        self._resolved[package_name] = self._resolve_key(view, package_name)
+                    except NotResolvablePackageError:
+                        result.unresolvable.append(package_name)
+                        continue
+
+                result.resolved[package_name] = self._resolved[package_name]
+
+        return result
+
+    def resolve(self, package_name: PackageName) -> ResolvedPackageName:
+        result = self.resolve_all([package_name])
+        if len(result.unresolvable) != 0:
+            raise NotResolvablePackageError(package_name)
+
+        return result.resolved[package_name]
 
     def save(self) -> None:
         with self._path.open("w") as file:
@@ -156,5 +252,9 @@ class Rosdep:
 
         self._shell.run(cmd, Path.cwd())
 
+        with self._view_lock:
+            self._view = None
+            self._resolved.clear()
+
     def init(self) -> None:
         self._shell.run("rosdep init", Path.cwd())
@@ -0,0 +1,108 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import select
+
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
+from types import TracebackType
+from typing import Iterator
+
+from typing_extensions import Self
+
+from robenv.util.cancelable_executor import CancelableExecutor
+
+
+_TOKEN = b"+"
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+class Jobserver:
+    """
+    GNU make jobserver shared between concurrently running builds.
+
+    The pipe is filled with one token per slot. Every build takes a token for
+    its top-level make before starting, the makes within take the tokens for
+    all further parallel jobs from the pipe, so the total number of jobs never
+    exceeds `slots`.
+    """
+
+    def __init__(self, slots: int) -> None:
+        if slots < 1:
+            msg = f"A jobserver needs at least one slot, got {slots}"
+            raise ValueError(msg)
+
+        self.slots = slots
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, _TOKEN * slots)
+
+    @property
+    def file_descriptors(self) -> tuple[int, int]:
+        return self._read_fd, self._write_fd
+
+    def get_environment(self) -> dict[str, str]:
+        # make before 4.2 only knows --jobserver-fds, newer versions prefer --jobserver-auth
+        fds = f"{self._read_fd},{self._write_fd}"
+        return {"MAKEFLAGS": f"-j{self.slots} --jobserver-fds={fds} --jobserver-auth={fds}"}
+
+    @contextmanager
+    def token(self) -> Iterator[None]:
+        self._acquire()
+        try:
+            yield
+        finally:
+            os.write(self._write_fd, _TOKEN)
+
+    def _acquire(self) -> None:
+        while not CancelableExecutor.cancel_event.is_set():
+            readable, _, _ = select.select([self._read_fd], [], [], _CANCEL_POLL_INTERVAL)
+            if readable and len(os.read(self._read_fd, 1)) == 1:
+                return
+
+        raise CancelledError
+
+    def close(self) -> None:
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exctype: type[BaseException] | None,
+        value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
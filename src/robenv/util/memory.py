@@ -0,0 +1,112 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+
+from pathlib import Path
+from time import monotonic
+
+
+MEMINFO_PATH = Path("/proc/meminfo")
+PROC_PATH = Path("/proc")
+
+
+def get_available_memory(meminfo: Path = MEMINFO_PATH) -> int | None:
+    """Get the memory in bytes that can be used without swapping, if the kernel reports it."""
+    try:
+        lines = meminfo.read_text().splitlines()
+    except OSError:
+        return None
+
+    for line in lines:
+        if line.startswith("MemAvailable:"):
+            # the value is given in kB
+            return int(line.split()[1]) * 1024
+
+    return None
+
+
+def _read_parent_and_rss(stat_file: Path) -> tuple[int, int] | None:
+    try:
+        stat = stat_file.read_text()
+    except OSError:
+        return None
+
+    # the command name in parentheses may contain spaces, the fields after it are ppid at index 1 and rss at 21
+    fields = stat[stat.rfind(")") + 2 :].split()
+    return int(fields[1]), int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_process_tree_rss(pid: int, proc: Path = PROC_PATH) -> int:
+    """Sum up the resident memory in bytes of a process and all of its descendants."""
+    children: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+
+        parent_and_rss = _read_parent_and_rss(entry / "stat")
+        if parent_and_rss is not None:
+            children.setdefault(parent_and_rss[0], []).append(int(entry.name))
+            rss[int(entry.name)] = parent_and_rss[1]
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss.get(current, 0)
+        pending.extend(children.get(current, ()))
+
+    return total
+
+
+class ProcessTreeMemory:
+    """
+    Peak of the memory used by a process tree at once, sampled while it runs.
+
+    Pages shared between processes are counted for each of them, so the peak rather over- than underestimates.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._next_sample = 0.0
+
+    def sample(self) -> None:
+        now = monotonic()
+        if now < self._next_sample:
+            return
+
+        self._next_sample = now + self.interval
+        self.peak = max(self.peak, get_process_tree_rss(self.pid))
@@ -31,9 +31,48 @@
 #
 from __future__ import annotations
 
+import ctypes
+import errno
+import os
+
 from pathlib import Path
 
 
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
 def remove_slash_prefix(path: str | Path) -> Path:
     p = Path(path)
     return p.relative_to(p.root)
+
+
+def replace_symlink_with_directory(symlink: Path, directory: Path) -> None:
+    """Put `directory` in place of `symlink` in a single step, so that the path never goes missing."""
+    try:
+        _exchange(directory, symlink)
+    except OSError:
+        # the file system can't exchange paths, so there is a short moment without either
+        symlink.unlink()
+        directory.replace(symlink)
+    else:
+        directory.unlink()
+
+
+def _exchange(first: Path, second: Path) -> None:
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), "renameat2", None)
+    if renameat2 is None:
+        raise OSError(errno.ENOSYS, os.strerror(errno.ENOSYS), str(first))
+
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    if renameat2(_AT_FDCWD, os.fsencode(first), _AT_FDCWD, os.fsencode(second), _RENAME_EXCHANGE) != 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error), str(first), None, str(second))
+
+
+def get_user_cache_path() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home is not None:
+        return Path(xdg_cache_home) / "robenv"
+
+    return Path.home() / ".cache/robenv"
@@ -0,0 +1,146 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+
+from enum import Enum
+from logging import getLogger
+from pathlib import Path
+from time import monotonic
+from typing import Callable
+
+from robenv.util.cpu_count import get_cpu_count
+
+
+_logger = getLogger(__name__)
+
+PRESSURE_PATH = Path("/proc/pressure")
+
+# thresholds for the share of time in percent during the last 10 seconds that tasks were stalled
+_CPU_PRESSURE_HIGH = 40.0
+_CPU_PRESSURE_LOW = 10.0
+_MEMORY_PRESSURE_HIGH = 5.0
+_MEMORY_PRESSURE_LOW = 1.0
+
+# thresholds for the 1 minute load average per core, if pressure stall information is not available
+_LOAD_HIGH = 1.5
+_LOAD_LOW = 0.8
+
+
+class SystemLoad(Enum):
+    LOW = "low"
+    NORMAL = "normal"
+    HIGH = "high"
+
+
+def read_pressure(resource: str, kind: str = "some", pressure_path: Path = PRESSURE_PATH) -> float | None:
+    """Get the avg10 value of the pressure stall information of a resource, if the kernel provides it."""
+    try:
+        lines = (pressure_path / resource).read_text().splitlines()
+    except OSError:
+        return None
+
+    for line in lines:
+        values = line.split()
+        if len(values) > 0 and values[0] == kind:
+            averages = dict(value.split("=") for value in values[1:])
+            return float(averages["avg10"])
+
+    return None
+
+
+def sample_system_load(pressure_path: Path = PRESSURE_PATH) -> SystemLoad:
+    cpu_pressure = read_pressure("cpu", pressure_path=pressure_path)
+    memory_pressure = read_pressure("memory", pressure_path=pressure_path)
+
+    if cpu_pressure is not None and memory_pressure is not None:
+        if cpu_pressure > _CPU_PRESSURE_HIGH or memory_pressure > _MEMORY_PRESSURE_HIGH:
+            return SystemLoad.HIGH
+        if cpu_pressure < _CPU_PRESSURE_LOW and memory_pressure < _MEMORY_PRESSURE_LOW:
+            return SystemLoad.LOW
+        return SystemLoad.NORMAL
+
+    load = os.getloadavg()[0] / get_cpu_count()
+    if load > _LOAD_HIGH:
+        return SystemLoad.HIGH
+    if load < _LOAD_LOW:
+        return SystemLoad.LOW
+    return SystemLoad.NORMAL
+
+
+class AdaptiveConcurrency:
+    """
+    Limit of concurrent builds that follows the load of the system.
+
+    The limit grows by one while the system has capacity left and is halved once it is overloaded.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        *,
+        interval: float = 10.0,
+        sample: Callable[[], SystemLoad] = sample_system_load,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.maximum = maximum
+        # the pressure is averaged over 10 seconds, adapting more often would react to our own changes too late
+        self.interval = interval
+        self._sample = sample
+        self._clock = clock
+        self._limit = max(maximum // 2, 1)
+        self._last_update = clock()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def update(self) -> int:
+        now = self._clock()
+        if now - self._last_update < self.interval:
+            return self._limit
+        self._last_update = now
+
+        load = self._sample()
+        if load is SystemLoad.HIGH:
+            limit = max(self._limit // 2, 1)
+        elif load is SystemLoad.LOW:
+            limit = min(self._limit + 1, self.maximum)
+        else:
+            limit = self._limit
+
+        if limit != self._limit:
+            _logger.info("System load is %s, building up to %s packages concurrently", load.value, limit)
+            self._limit = limit
+
+        return self._limit
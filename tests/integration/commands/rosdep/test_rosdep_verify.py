@@ -31,17 +31,14 @@
 #
 from __future__ import annotations
 
-from pathlib import Path
-from unittest.mock import MagicMock
-
 import pytest
 
 from cleo.application import Application
 from cleo.testers.command_tester import CommandTester
+from pytest_mock import MockerFixture
 
-from robenv.environment.run_command import CommandFailedError
-from robenv.environment.run_command import CommandOutput
-from robenv.environment.shell import RobEnvShell
+from robenv.rosdep.rosdep import NotResolvablePackageError
+from robenv.rosdep.rosdep import Rosdep
 
 
 @pytest.mark.usefixtures("_copy_full_example_project")
@@ -50,21 +47,8 @@ def test_rosdep_verify_should_verify_successfully(init_app: Application) -> None
 
 
 @pytest.mark.usefixtures("_copy_full_example_project")
-def test_rosdep_verify_should_exit_with_non_zero_code(init_app: Application, run_mock: MagicMock) -> None:
-    orig_side_effect = run_mock.side_effect
-
-    def additional_effect(
-        self: RobEnvShell,
-        command: str,
-        cwd: Path,
-        events: dict[str, str] | None = None,
-    ) -> CommandOutput:
-        if "rosdep resolve" in command:
-            raise CommandFailedError(command, 1, "Unresolvable")
-
-        return orig_side_effect(self, command, cwd, events)  # type: ignore[no-any-return]
-
-    run_mock.side_effect = additional_effect
+def test_rosdep_verify_should_exit_with_non_zero_code(init_app: Application, mocker: MockerFixture) -> None:
+    mocker.patch.object(Rosdep, "_resolve_key", side_effect=NotResolvablePackageError("unresolvable"))
 
     exit_code = CommandTester(init_app.find("rosdep verify")).execute()
 
@@ -31,6 +31,7 @@
 #
 from __future__ import annotations
 
+from concurrent.futures import CancelledError
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -42,11 +43,10 @@ from pytest_mock import MockerFixture
 
 from robenv.commands.add import AddCommand
 from robenv.commands.add import NoDownloadUrlError
+from robenv.deb.archive import InvalidDebError
 from robenv.environment.distro import RosDistribution
 from robenv.environment.env import FileAlreadyInstalledError
 from robenv.environment.env import UnmetDependencyError
-from robenv.environment.run_command import CommandAbortedError
-from robenv.environment.run_command import CommandFailedError
 from tests.integration.commands import MockResponse
 from tests.integration.commands import assert_is_installed
 from tests.integration.commands import assert_is_not_installed
@@ -241,7 +241,7 @@ def test_add_via_package_name_not_found(
 
 
 def test_add_deb_file_install_failed(
-    run_mock: MagicMock,
+    mocker: MockerFixture,
     nodeps: Path,
     init_app: Application,
     robenv_target_path: Path,
@@ -250,7 +250,7 @@ def test_add_deb_file_install_failed(
     assert not (robenv_target_path / "logs").exists()
     assert_is_not_installed(robenv_target_path, nodeps.name, ros_distro)
 
-    run_mock.side_effect = CommandFailedError(command="command", exit_status=1, output="cool output")
+    mocker.patch("robenv.environment.env.read_deb", side_effect=InvalidDebError(nodeps, "cool output"))
     expected_return_code = 1
 
     assert CommandTester(init_app.find("add")).execute(f"{nodeps!s}") == expected_return_code
@@ -261,7 +261,7 @@ def test_add_deb_file_install_failed(
 
 
 def test_add_deb_file_install_aborted(
-    run_mock: MagicMock,
+    mocker: MockerFixture,
     init_app: Application,
     robenv_target_path: Path,
     ros_distro: RosDistribution,
@@ -269,7 +269,7 @@ def test_add_deb_file_install_aborted(
 ) -> None:
     assert_is_not_installed(robenv_target_path, nodeps.name, ros_distro)
 
-    run_mock.side_effect = CommandAbortedError(command="command", output="cool output")
+    mocker.patch("robenv.environment.env.read_deb", side_effect=CancelledError())
     expected_return_code = 2
 
     assert CommandTester(init_app.find("add")).execute(f"{nodeps!s}") == expected_return_code
@@ -331,6 +331,19 @@ def test_add_multiple_packages(
     assert_is_installed(robenv_target_path, nodeps2.name, ros_distro)
 
 
+def test_add_multiple_packages_in_dependency_order(
+    init_app: Application,
+    nodeps: Path,
+    dep_on_nodeps: Path,
+    robenv_target_path: Path,
+    ros_distro: RosDistribution,
+) -> None:
+    assert CommandTester(init_app.find("add")).execute(f"{dep_on_nodeps!s} {nodeps!s}") == 0
+
+    assert_is_installed(robenv_target_path, nodeps.name, ros_distro)
+    assert_is_installed(robenv_target_path, dep_on_nodeps.name, ros_distro)
+
+
 def test_add_multiple_packages_source_packages_on_file_conflict(
     init_app: Application,
     nodeps: Path,
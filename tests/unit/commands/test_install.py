@@ -0,0 +1,62 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import pytest
+
+from robenv.commands.install import InstallCommand
+from robenv.commands.install import InvalidDebCompressionError
+from robenv.ros_package.deb_compression import DebCompression
+
+
+def _with_deb_compression(monkeypatch: pytest.MonkeyPatch, deb_compression: str | None) -> InstallCommand:
+    monkeypatch.setattr(InstallCommand, "option", lambda _self, _name: deb_compression)
+    return InstallCommand()
+
+
+def test_install_should_parse_deb_compression(monkeypatch: pytest.MonkeyPatch) -> None:
+    command = _with_deb_compression(monkeypatch, "xz")
+
+    assert command._deb_compression is DebCompression.XZ  # noqa: SLF001
+
+
+def test_install_should_let_dpkg_deb_choose_without_deb_compression(monkeypatch: pytest.MonkeyPatch) -> None:
+    command = _with_deb_compression(monkeypatch, None)
+
+    assert command._deb_compression is None  # noqa: SLF001
+
+
+def test_install_should_list_choices_for_invalid_deb_compression(monkeypatch: pytest.MonkeyPatch) -> None:
+    command = _with_deb_compression(monkeypatch, "gzip")
+
+    with pytest.raises(InvalidDebCompressionError, match="choose one of: none, zstd, xz"):
+        _ = command._deb_compression  # noqa: SLF001
@@ -0,0 +1,190 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import gzip
+import io
+import lzma
+import os
+import tarfile
+
+from pathlib import Path
+
+import pytest
+
+from deb_pkg_tools.package import inspect_package_contents
+
+from robenv.deb.archive import InvalidDebError
+from robenv.deb.archive import merge_extracted
+from robenv.deb.archive import read_deb
+
+
+CONTROL = b"""\
+Package: example
+Version: 1.0.0
+Depends: libfoo (>= 1.0),
+ libbar
+Description: example package
+"""
+
+
+def _add(tar: tarfile.TarFile, name: str, data: bytes = b"", **kwargs: object) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = 1700000000
+    info.uname = info.gname = "root"
+    for key, value in kwargs.items():
+        setattr(info, key, value)
+    tar.addfile(info, io.BytesIO(data) if info.isfile() else None)
+
+
+def _tar(build: bool) -> bytes:  # noqa: FBT001
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.GNU_FORMAT) as tar:
+        if build:
+            _add(tar, "./", type=tarfile.DIRTYPE, mode=0o755)
+            _add(tar, "./usr/", type=tarfile.DIRTYPE, mode=0o755)
+            _add(tar, "./usr/bin/", type=tarfile.DIRTYPE, mode=0o755)
+            _add(tar, "./usr/bin/tool", b"#!/bin/sh\n", mode=0o755)
+            _add(tar, "./usr/bin/tool-link", type=tarfile.SYMTYPE, linkname="tool", mode=0o777)
+            _add(tar, "./usr/bin/tool-hard", type=tarfile.LNKTYPE, linkname="./usr/bin/tool", mode=0o755)
+        else:
+            _add(tar, "./control", CONTROL, mode=0o644)
+    return buffer.getvalue()
+
+
+def _ar_member(name: str, data: bytes) -> bytes:
+    header = f"{name:<16}{0:<12}{0:<6}{0:<6}{100644:<8}{len(data):<10}`\n".encode()
+    return header + data + (b"\n" if len(data) % 2 == 1 else b"")
+
+
+def create_deb(path: Path, compression: str, data: bytes | None = None) -> Path:
+    compress = {"": lambda data: data, ".gz": gzip.compress, ".xz": lzma.compress}[compression]
+    path.write_bytes(
+        b"!<arch>\n"
+        + _ar_member("debian-binary", b"2.0\n")
+        + _ar_member(f"control.tar{compression}", compress(_tar(build=False)))
+        + _ar_member(f"data.tar{compression}", compress(data if data is not None else _tar(build=True))),
+    )
+    return path
+
+
+@pytest.mark.parametrize("compression", ["", ".gz", ".xz"])
+def test_read_deb_should_read_control_and_contents(tmp_path: Path, compression: str) -> None:
+    deb = read_deb(create_deb(tmp_path / "example.deb", compression))
+
+    assert deb.control["package"] == "example"
+    assert deb.control["depends"] == "libfoo (>= 1.0),\n libbar"
+    assert list(deb.contents) == [
+        "/",
+        "/usr/",
+        "/usr/bin/",
+        "/usr/bin/tool",
+        "/usr/bin/tool-link",
+        "/usr/bin/tool-hard",
+    ]
+    assert deb.contents["/usr/bin/tool"].permissions == "-rwxr-xr-x"
+    assert deb.contents["/usr/bin/tool-link"].target == "tool"
+    assert deb.contents["/usr/bin/tool-hard"].target == "/usr/bin/tool"
+
+
+def test_read_deb_should_match_dpkg_deb(test_debs: Path) -> None:
+    deb_file = test_debs / "ros-noetic-adder_0.0.0-0focal_amd64.deb"
+
+    expected = inspect_package_contents(str(deb_file))
+
+    assert read_deb(deb_file).contents == expected
+
+
+def test_read_deb_should_extract_and_merge(tmp_path: Path) -> None:
+    staging = tmp_path / "staging"
+    target = tmp_path / "target"
+    (target / "usr/bin").mkdir(parents=True)
+    (target / "usr/bin/tool").write_text("old")
+
+    deb = read_deb(create_deb(tmp_path / "example.deb", ".gz"), extract_to=staging)
+    merge_extracted(staging, deb.contents, target)
+
+    assert (target / "usr/bin/tool").read_text() == "#!/bin/sh\n"
+    assert os.readlink(target / "usr/bin/tool-link") == "tool"
+    assert (target / "usr/bin/tool-hard").samefile(target / "usr/bin/tool")
+
+
+def test_read_deb_should_link_into_hidden_folders(tmp_path: Path) -> None:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.GNU_FORMAT) as tar:
+        _add(tar, "./.hidden/", type=tarfile.DIRTYPE, mode=0o755)
+        _add(tar, "./.hidden/file", b"hidden", mode=0o644)
+        _add(tar, "./hard", type=tarfile.LNKTYPE, linkname="./.hidden/file", mode=0o644)
+    staging = tmp_path / "staging"
+
+    deb = read_deb(create_deb(tmp_path / "hidden.deb", ".gz", buffer.getvalue()), extract_to=staging)
+
+    assert deb.contents["/hard"].target == "/.hidden/file"
+    assert (staging / "hard").samefile(staging / ".hidden" / "file")
+
+
+def test_read_deb_should_raise_on_invalid_file(tmp_path: Path) -> None:
+    invalid = tmp_path / "invalid.deb"
+    invalid.write_text("not a deb")
+
+    with pytest.raises(InvalidDebError):
+        read_deb(invalid)
+
+
+@pytest.mark.parametrize(
+    "escaping_member",
+    [
+        {"name": "./opt/escape/etc/foo", "data": b"outside"},
+        {"name": "./opt/escape/etc/", "type": tarfile.DIRTYPE, "mode": 0o755},
+        {"name": "./opt/passwd", "type": tarfile.LNKTYPE, "linkname": "./opt/escape/etc/passwd", "mode": 0o644},
+    ],
+)
+def test_read_deb_should_not_extract_through_symlinks(tmp_path: Path, escaping_member: dict[str, object]) -> None:
+    outside = tmp_path / "outside"
+    (outside / "etc").mkdir(parents=True)
+    (outside / "etc" / "passwd").write_text("secret")
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.GNU_FORMAT) as tar:
+        _add(tar, "./opt/", type=tarfile.DIRTYPE, mode=0o755)
+        _add(tar, "./opt/escape", type=tarfile.SYMTYPE, linkname=str(outside), mode=0o777)
+        name = str(escaping_member.pop("name"))
+        data = escaping_member.pop("data", b"")
+        assert isinstance(data, bytes)
+        _add(tar, name, data, **escaping_member)
+    deb_file = create_deb(tmp_path / "escape.deb", ".gz", buffer.getvalue())
+
+    with pytest.raises(InvalidDebError):
+        read_deb(deb_file, extract_to=tmp_path / "staging")
+
+    assert sorted(path.name for path in outside.rglob("*")) == ["etc", "passwd"]
+    assert not (tmp_path / "staging" / "opt" / "passwd").exists()
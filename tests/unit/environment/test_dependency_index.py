@@ -0,0 +1,71 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.environment.dependency_index import DependencyIndex
+from robenv.ros_package.package import PackageName
+from tests.conftest import YieldFixture
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> YieldFixture[RobEnvDatabase]:
+    database = RobEnvDatabase(RobEnvDatabase.get_database_path(tmp_path))
+    yield database
+    database.close()
+
+
+@pytest.fixture()
+def dependency_index(database: RobEnvDatabase) -> DependencyIndex:
+    index = DependencyIndex(database)
+    index.add(PackageName("adder_srvs"), "ros-noetic-adder-srvs", ["libc6"])
+    index.add(PackageName("adder"), "ros-noetic-adder", ["ros-noetic-adder-srvs", "libc6"])
+    index.add(PackageName("client"), "ros-noetic-client", ["ros-noetic-adder"])
+    index.add(PackageName("server"), "ros-noetic-server", ["ros-noetic-adder-srvs"])
+    return index
+
+
+def test_dependency_index_should_find_transitive_dependents(dependency_index: DependencyIndex) -> None:
+    assert dependency_index.dependents(PackageName("adder_srvs")) == ["adder", "client", "server"]
+    assert dependency_index.dependents(PackageName("adder")) == ["client"]
+    assert dependency_index.dependents(PackageName("client")) == []
+
+
+def test_dependency_index_should_forget_removed_packages(dependency_index: DependencyIndex) -> None:
+    dependency_index.remove(PackageName("adder"))
+
+    assert dependency_index.dependents(PackageName("adder_srvs")) == ["server"]
+    assert "adder" not in dependency_index.get_indexed_packages()
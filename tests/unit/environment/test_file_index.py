@@ -0,0 +1,103 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.environment.file_index import FileIndex
+from robenv.ros_package.package import PackageName
+from tests.conftest import YieldFixture
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> YieldFixture[RobEnvDatabase]:
+    database = RobEnvDatabase(RobEnvDatabase.get_database_path(tmp_path))
+    yield database
+    database.close()
+
+
+@pytest.fixture()
+def file_index(database: RobEnvDatabase) -> FileIndex:
+    return FileIndex(database)
+
+
+def test_file_index_should_find_owners(file_index: FileIndex) -> None:
+    file_index.add(PackageName("adder"), ["/", "/opt/", "/opt/ros/noetic/lib/libadder.so"])
+    file_index.add(PackageName("client"), ["/", "/opt/", "/opt/ros/noetic/bin/client"])
+
+    assert file_index.owners("/opt/ros/noetic/lib/libadder.so") == ["adder"]
+    assert file_index.owners(Path("opt/ros/noetic/lib/libadder.so")) == ["adder"]
+    assert file_index.owners("/opt/") == ["adder", "client"]
+    assert file_index.owners("/opt/ros/noetic/lib/unknown.so") == []
+
+
+def test_file_index_should_keep_archive_order(file_index: FileIndex) -> None:
+    files = ["/", "/opt/", "/opt/ros/", "/opt/ros/noetic/lib/libadder.so"]
+    file_index.add(PackageName("adder"), files)
+
+    assert file_index.files(PackageName("adder")) == [Path(), Path("opt"), Path("opt/ros"), Path(files[-1][1:])]
+
+
+def test_file_index_should_forget_removed_packages(file_index: FileIndex) -> None:
+    file_index.add(PackageName("adder"), ["/opt/ros/noetic/lib/libadder.so"])
+
+    file_index.remove(PackageName("adder"))
+
+    assert file_index.owners("/opt/ros/noetic/lib/libadder.so") == []
+    assert file_index.get_indexed_packages() == set()
+
+
+def test_file_index_should_persist(tmp_path: Path, file_index: FileIndex) -> None:
+    file_index.add(PackageName("adder"), ["/opt/ros/noetic/lib/libadder.so"])
+
+    reopened = RobEnvDatabase(RobEnvDatabase.get_database_path(tmp_path))
+    try:
+        assert FileIndex(reopened).owners("/opt/ros/noetic/lib/libadder.so") == ["adder"]
+    finally:
+        reopened.close()
+
+
+def test_file_index_should_not_commit_failed_transactions(database: RobEnvDatabase, file_index: FileIndex) -> None:
+    file_index.add(PackageName("adder"), ["/opt/ros/noetic/lib/libadder.so"])
+
+    def remove_and_fail() -> None:
+        with database.transaction():
+            file_index.remove(PackageName("adder"))
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        remove_and_fail()
+
+    assert file_index.owners("/opt/ros/noetic/lib/libadder.so") == ["adder"]
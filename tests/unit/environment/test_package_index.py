@@ -0,0 +1,95 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+from deb_pkg_tools.deps import parse_depends
+
+from robenv.environment.package_index import get_system_package_index
+from robenv.environment.package_index import parse_dpkg_status
+
+
+STATUS = """\
+Package: libfoo
+Status: install ok installed
+Version: 1.2.0
+Provides: libfoo-abi (= 3), foo-virtual
+Description: foo
+ with a long description
+
+Package: libremoved
+Status: deinstall ok config-files
+Version: 0.1
+
+Package: libbar
+Status: install ok unpacked
+Version: 2.0
+"""
+
+
+def _is_met(depends: str, status: str = STATUS) -> bool:
+    index = parse_dpkg_status(status)
+    dependency = parse_depends(depends).relationships[0]
+    return any(index.is_met(name, dependency) for name in dependency.names)
+
+
+def test_should_match_installed_versions() -> None:
+    assert _is_met("libfoo (>= 1.0)")
+    assert not _is_met("libfoo (>= 2.0)")
+    assert _is_met("libbar")
+
+
+def test_should_not_match_removed_packages() -> None:
+    assert not _is_met("libremoved")
+
+
+def test_should_match_provided_packages() -> None:
+    assert _is_met("foo-virtual")
+    assert _is_met("libfoo-abi (= 3)")
+    assert not _is_met("foo-virtual (>= 1)")
+
+
+def test_should_match_alternatives() -> None:
+    assert _is_met("missing | libbar")
+
+
+def test_system_index_should_be_reparsed_on_change(tmp_path: Path) -> None:
+    status = tmp_path / "status"
+    status.write_text(STATUS)
+    first = get_system_package_index(status)
+
+    assert get_system_package_index(status) is first
+
+    status.write_text(STATUS + "\nPackage: libnew\nStatus: install ok installed\nVersion: 1.0\n")
+
+    assert "libnew" in get_system_package_index(status).versions
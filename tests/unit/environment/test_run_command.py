@@ -33,13 +33,19 @@ from __future__ import annotations
 
 import pytest
 
+from robenv.environment.run_command import COMMAND_NOT_FOUND_EXIT_STATUS
 from robenv.environment.run_command import CommandAbortedError
 from robenv.environment.run_command import CommandFailedError
+from robenv.environment.run_command import ResourceUsage
 from robenv.environment.run_command import run_command
 
 
 def test_returns_result() -> None:
-    assert run_command("echo foo") == "foo\r\n"
+    assert run_command("echo foo") == "foo\n"
+
+
+def test_returns_result_of_interactive_command() -> None:
+    assert run_command("echo foo", events={"bar": "baz\n"}) == "foo\r\n"
 
 
 def test_raises_command_failed_error() -> None:
@@ -48,7 +54,43 @@ def test_raises_command_failed_error() -> None:
         run_command(test_command)
     assert e.value.command == test_command
     assert e.value.exit_status == 1
-    assert e.value.output == "foo\r\n"
+    assert e.value.output == "foo\n"
+
+
+def test_reports_peak_memory_usage_of_children() -> None:
+    allocated = 64 * 1024 * 1024
+    usage = ResourceUsage()
+
+    # the allocation happens in a grandchild, which the python child waits for
+    run_command(
+        f'python -c \'import subprocess; subprocess.run(["python", "-c", "bytearray({allocated})"], check=True)\'',
+        resource_usage=usage,
+    )
+
+    assert usage.peak_rss >= allocated
+
+
+def test_reports_peak_memory_usage_of_parallel_children() -> None:
+    allocated = 64 * 1024 * 1024
+    usage = ResourceUsage()
+
+    # like the jobs of a parallel build, two children hold their memory at the same time
+    child = f'python -c "data = bytearray({allocated}); import time; time.sleep(1.5)"'
+    run_command(f"sh -c '{child} & {child} & wait'", resource_usage=usage)
+
+    assert usage.peak_rss >= 2 * allocated
+
+
+def test_reports_exit_status_with_resource_usage() -> None:
+    with pytest.raises(CommandFailedError) as e:
+        run_command("python -c 'import sys; sys.exit(3)'", resource_usage=ResourceUsage())
+    assert e.value.exit_status == 3  # noqa: PLR2004
+
+
+def test_raises_command_failed_error_on_unknown_command() -> None:
+    with pytest.raises(CommandFailedError) as e:
+        run_command("robenv-command-that-does-not-exist")
+    assert e.value.exit_status == COMMAND_NOT_FOUND_EXIT_STATUS
 
 
 def test_raises_on_interrupt() -> None:
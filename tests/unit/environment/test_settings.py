@@ -0,0 +1,76 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.environment.env import RobEnvSettings
+from robenv.ros_package.package import PackageName
+from tests.conftest import YieldFixture
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> YieldFixture[RobEnvDatabase]:
+    database = RobEnvDatabase(RobEnvDatabase.get_database_path(tmp_path))
+    yield database
+    database.close()
+
+
+def test_read_should_migrate_settings_file(tmp_path: Path, database: RobEnvDatabase) -> None:
+    settings_file = RobEnvSettings.get_settings_path(tmp_path)
+    settings_file.write_text("installed_packages:\n  adder: /robenv/packages/adder.deb\nros_distro: noetic\n")
+
+    settings = RobEnvSettings.read(tmp_path, database)
+
+    assert settings.ros_distro == "noetic"
+    assert settings.installed_packages == {"adder": Path("/robenv/packages/adder.deb")}
+    assert not settings_file.exists()
+    assert RobEnvSettings.read(tmp_path, database).installed_packages == settings.installed_packages
+
+
+def test_installed_packages_should_be_persisted(tmp_path: Path, database: RobEnvDatabase) -> None:
+    RobEnvSettings.initialize(tmp_path, "noetic")
+    deb = tmp_path / "adder.deb"
+    deb.touch()
+
+    settings = RobEnvSettings.read(tmp_path, database)
+    settings.add_installed(PackageName("adder"), deb)
+
+    assert RobEnvSettings.read(tmp_path, database).installed_packages == {"adder": deb}
+
+    settings.remove_installed(PackageName("adder"))
+
+    assert RobEnvSettings.read(tmp_path, database).installed_packages == {}
+    assert not deb.exists()
@@ -33,6 +33,7 @@ from __future__ import annotations
 
 from pathlib import Path
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import pytest
 
@@ -40,6 +41,7 @@ from pytest_mock import MockerFixture
 
 from robenv.environment.shell import RobEnvShell
 from robenv.environment.shell import UnsupportedShellError
+from robenv.environment.shell import get_environment_snapshot_path
 
 
 @pytest.fixture()
@@ -79,20 +81,34 @@ def activate_script(tmp_path: Path) -> Path:
 
 def test_run_command__calls_command_within_env(run_command_mock: MagicMock, activate_script: Path) -> None:
     test_command = "test_command"
-
-    expected_command = f"bash -c 'source {activate_script} && {test_command}'"
-
-    # run_command_mock.run.return_value = (b"test_output", expected_exit_status)
+    activate_script.write_text("export ROBENV_TEST=activated\n")
 
     sut = RobEnvShell(activate_script)
     sut.run(command=test_command, cwd=Path.cwd())
 
     assert run_command_mock.called
     run_command_mock.assert_called_once_with(
-        expected_command,
+        test_command,
         events=None,
         cwd=Path.cwd(),
+        env=sut.get_environment(),
+        pass_fds=(),
+        resource_usage=None,
     )
+    assert run_command_mock.call_args.kwargs["env"]["ROBENV_TEST"] == "activated"
+
+
+def test_get_environment__reuses_snapshot_until_activate_changes(activate_script: Path) -> None:
+    activate_script.write_text("export ROBENV_TEST=first\n")
+    assert RobEnvShell(activate_script).get_environment()["ROBENV_TEST"] == "first"
+    assert get_environment_snapshot_path(activate_script.parent).exists()
+
+    with patch("robenv.environment.shell.subprocess") as subprocess_mock:
+        assert RobEnvShell(activate_script).get_environment()["ROBENV_TEST"] == "first"
+    assert not subprocess_mock.run.called
+
+    activate_script.write_text("export ROBENV_TEST=second\n")
+    assert RobEnvShell(activate_script).get_environment()["ROBENV_TEST"] == "second"
 
 
 def test_get_shell__raises_on_unsupported_shell(
@@ -0,0 +1,112 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+
+from pathlib import Path
+
+import pytest
+
+from robenv.ros_package.build_cache import BuildCache
+from robenv.ros_package.build_cache import Fingerprint
+from robenv.ros_package.build_cache import compute_fingerprint
+from robenv.ros_package.package import ROSPackage
+
+
+@pytest.fixture()
+def package(tmp_path: Path) -> ROSPackage:
+    package_path = tmp_path / "src" / "adder"
+    (package_path / "src").mkdir(parents=True)
+    (package_path / "package.xml").write_text(
+        '<package format="2"><name>adder</name><version>0.0.0</version></package>',
+    )
+    (package_path / "src" / "adder.cpp").write_text("int add(int a, int b) { return a + b; }")
+    return ROSPackage.from_project(package_path)
+
+
+def test_fingerprint_should_be_stable(package: ROSPackage) -> None:
+    assert compute_fingerprint(package, [], "noetic") == compute_fingerprint(package, [], "noetic")
+
+
+def test_fingerprint_should_change_with_sources(package: ROSPackage) -> None:
+    before = compute_fingerprint(package, [], "noetic")
+    (package.path / "src" / "adder.cpp").write_text("int add(int a, int b) { return b + a; }")
+
+    assert compute_fingerprint(package, [], "noetic") != before
+
+
+def test_fingerprint_should_ignore_build_artifacts(package: ROSPackage) -> None:
+    before = compute_fingerprint(package, [], "noetic")
+    (package.path / "debian").mkdir()
+    (package.path / "debian" / "rules").write_text("rules")
+    (package.path / ".obj-x86_64-linux-gnu").mkdir()
+    (package.path / ".obj-x86_64-linux-gnu" / "Makefile").write_text("all:")
+
+    assert compute_fingerprint(package, [], "noetic") == before
+
+
+def test_fingerprint_should_change_with_dependencies_and_salts(package: ROSPackage) -> None:
+    fingerprint = compute_fingerprint(package, [], "noetic")
+
+    assert compute_fingerprint(package, [Fingerprint("dependency")], "noetic") != fingerprint
+    assert compute_fingerprint(package, [], "melodic") != fingerprint
+
+
+def test_build_cache_should_restore_stored_debs(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path / "cache", max_size=1024)
+    deb_file = tmp_path / "package.deb"
+    deb_file.write_bytes(b"deb")
+    target = tmp_path / "restored.deb"
+
+    assert not cache.restore(Fingerprint("abc"), target)
+
+    cache.store(Fingerprint("abc"), deb_file)
+
+    assert cache.restore(Fingerprint("abc"), target)
+    assert target.read_bytes() == b"deb"
+
+
+def test_build_cache_should_evict_least_recently_used(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path / "cache", max_size=20)
+    deb_file = tmp_path / "package.deb"
+    deb_file.write_bytes(b"0123456789")
+
+    cache.store(Fingerprint("old"), deb_file)
+    os.utime(tmp_path / "cache" / "old.deb", (0, 0))
+    cache.store(Fingerprint("used"), deb_file)
+    os.utime(tmp_path / "cache" / "used.deb", (1, 1))
+    assert cache.restore(Fingerprint("used"), tmp_path / "restored.deb")
+
+    cache.store(Fingerprint("new"), deb_file)
+
+    assert sorted(entry.name for entry in (tmp_path / "cache").iterdir()) == ["new.deb", "used.deb"]
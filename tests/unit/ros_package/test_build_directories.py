@@ -0,0 +1,130 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from robenv.environment.run_command import run_command
+from robenv.ros_package.build_directories import BuildDirectories
+from tests.unit.ros_package import create_package
+
+
+_RULES = (
+    "%:\n"
+    "\tdh $@ -v --buildsystem=cmake --builddirectory=.obj-$(DEB_HOST_GNU_TYPE)\n"
+    "\n"
+    "override_dh_auto_build:\n"
+    '\tif [ -f "/robenv/activate" ]; then . "/robenv/activate"; fi && \\\n'
+    "\tdh_auto_build\n"
+)
+
+
+def test_use_in_rules_should_build_with_ninja_in_the_given_directory() -> None:
+    rules = BuildDirectories.use_in_rules(_RULES)
+
+    directory = "$(or $(ROBENV_BUILD_DIRECTORY),.obj-$(DEB_HOST_GNU_TYPE))"
+    assert f"\tdh $@ -v --buildsystem=cmake+ninja --builddirectory={directory}\n" in rules
+    jobs = "$(if $(ROBENV_NINJA_JOBS),-j $(ROBENV_NINJA_JOBS))"
+    assert rules.endswith(f"fi && \\\n\tninja -C {directory} {jobs}\n")
+
+
+def test_use_in_rules_should_keep_other_build_systems() -> None:
+    rules = "%:\n\tdh $@ -v --buildsystem=pybuild\n\noverride_dh_auto_build:\n\tdh_auto_build\n"
+
+    assert BuildDirectories.use_in_rules(rules) == rules
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="needs GNU make")
+def test_use_in_rules_should_fall_back_to_the_source_tree(tmp_path: Path) -> None:
+    rules = BuildDirectories.use_in_rules(_RULES).replace("if [", "@if [").replace("ninja -C", "echo")
+    (tmp_path / "rules").write_text(f"DEB_HOST_GNU_TYPE = x86_64-linux-gnu\n{rules}")
+    env = {key: value for key, value in os.environ.items() if not key.startswith("ROBENV_")}
+
+    def build(**build_env: str) -> str:
+        return run_command("make -s -f rules override_dh_auto_build", cwd=tmp_path, env={**env, **build_env}).strip()
+
+    assert build() == ".obj-x86_64-linux-gnu"
+    assert build(ROBENV_BUILD_DIRECTORY="/robenv/build", ROBENV_NINJA_JOBS="3") == "/robenv/build -j 3"
+
+
+def test_get_should_separate_packages_of_the_same_name(tmp_path: Path) -> None:
+    build_directories = BuildDirectories(tmp_path / "build-directories", max_size=1024, jobs=2)
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    package = create_package(tmp_path / "first", "a", [])
+    same_name = create_package(tmp_path / "second", "a", [])
+
+    assert build_directories.get(package) == build_directories.get(package)
+    assert build_directories.get(package) != build_directories.get(same_name)
+    assert build_directories.get(package).name.startswith("a-")
+
+
+def test_get_environment_should_create_the_build_directory(tmp_path: Path) -> None:
+    build_directories = BuildDirectories(tmp_path / "build-directories", max_size=1024, jobs=2)
+    package = create_package(tmp_path, "a", [])
+
+    environment = build_directories.get_environment(package)
+
+    assert Path(environment["ROBENV_BUILD_DIRECTORY"]).is_dir()
+    assert environment["ROBENV_NINJA_JOBS"] == "2"
+
+
+def test_prune_should_remove_directories_of_removed_packages(tmp_path: Path) -> None:
+    build_directories = BuildDirectories(tmp_path / "build-directories", max_size=1024, jobs=2)
+    kept = create_package(tmp_path, "kept", [])
+    removed = create_package(tmp_path, "removed", [])
+    build_directories.get_environment(kept)
+    build_directories.get_environment(removed)
+    (build_directories.path / "unknown").mkdir()
+    shutil.rmtree(removed.path)
+
+    build_directories.prune()
+
+    assert list(build_directories.path.iterdir()) == [build_directories.get(kept)]
+
+
+def test_prune_should_evict_least_recently_used(tmp_path: Path) -> None:
+    packages = [create_package(tmp_path, name, []) for name in ("old", "used", "new")]
+    build_directories = BuildDirectories(tmp_path / "build-directories", max_size=2500, jobs=2)
+    for time, package in enumerate(packages):
+        build_directories.get_environment(package)
+        (build_directories.get(package) / "build.ninja").write_bytes(b"0" * 1000)
+        os.utime(build_directories.get(package), (time, time))
+
+    build_directories.prune()
+
+    assert sorted(entry.name.split("-")[0] for entry in build_directories.path.iterdir()) == ["new", "used"]
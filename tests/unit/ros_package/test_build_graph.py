@@ -0,0 +1,128 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from robenv.ros_package.build_graph import BuildGraph
+from robenv.ros_package.build_graph import DependencyCycleError
+from robenv.ros_package.package import PackageName
+from tests.unit.ros_package import create_package
+
+
+def create_graph(path: Path, dependencies: dict[str, list[str]]) -> BuildGraph:
+    packages = [create_package(path, name, build_depends) for name, build_depends in dependencies.items()]
+    return BuildGraph(packages, {package.name: package.get_build_dependencies() for package in packages})
+
+
+def test_build_graph_should_only_offer_packages_without_internal_dependencies(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"a": ["roscpp"], "b": ["a"], "c": []})
+
+    assert [p.name for p in graph.ready()] == ["a", "c"]
+
+
+def test_build_graph_should_prioritise_longest_critical_path(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"a": [], "b": ["z"], "c": ["b"], "z": []})
+
+    assert [p.name for p in graph.ready()] == ["z", "a"]
+    assert graph.priority(PackageName("z")) == 3  # noqa: PLR2004
+    assert graph.priority(PackageName("a")) == 1
+
+
+def test_build_graph_should_release_dependents_once_all_dependencies_completed(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"a": [], "b": [], "c": ["a", "b"]})
+
+    graph.start(PackageName("a"))
+    graph.start(PackageName("b"))
+
+    assert graph.complete(PackageName("a")) == []
+    assert [p.name for p in graph.complete(PackageName("b"))] == ["c"]
+    assert not graph.is_finished()
+
+    graph.start(PackageName("c"))
+    graph.complete(PackageName("c"))
+    assert graph.is_finished()
+
+
+def test_build_graph_should_not_wait_for_unrelated_packages(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"slow": [], "fast": [], "after_fast": ["fast"]})
+
+    graph.start(PackageName("slow"))
+    graph.start(PackageName("fast"))
+
+    assert [p.name for p in graph.complete(PackageName("fast"))] == ["after_fast"]
+    assert graph.has_running()
+
+
+def test_build_graph_should_raise_on_cycles(tmp_path: Path) -> None:
+    with pytest.raises(DependencyCycleError) as error:
+        create_graph(tmp_path, {"a": ["c"], "b": ["a"], "c": ["b"], "d": []})
+
+    assert error.value.packages == ["a", "b", "c"]
+
+
+def test_build_graph_should_only_report_packages_on_the_cycle(tmp_path: Path) -> None:
+    with pytest.raises(DependencyCycleError) as error:
+        create_graph(tmp_path, {"a": ["b"], "b": ["a"], "c": ["a"], "d": ["c"]})
+
+    assert error.value.packages == ["a", "b"]
+
+
+def test_build_graph_should_group_packages_by_longest_dependency_chain(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"e": ["d"], "d": ["c"], "c": ["b"], "b": ["a"], "a": [], "f": ["a", "e"]})
+
+    assert [[p.name for p in level] for level in graph.levels()] == [["a"], ["b"], ["c"], ["d"], ["e"], ["f"]]
+
+
+def test_build_graph_should_skip_transitive_dependents_of_failed_package(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"a": [], "b": ["a"], "c": ["b"], "d": []})
+
+    graph.start(PackageName("a"))
+
+    assert graph.fail(PackageName("a")) == ["b", "c"]
+    assert [p.name for p in graph.ready()] == ["d"]
+    graph.start(PackageName("d"))
+    graph.complete(PackageName("d"))
+    assert graph.is_finished()
+
+
+def test_build_graph_should_not_offer_skipped_packages_once_other_dependencies_complete(tmp_path: Path) -> None:
+    graph = create_graph(tmp_path, {"a": [], "b": [], "c": ["a", "b"]})
+
+    graph.start(PackageName("a"))
+    graph.start(PackageName("b"))
+
+    assert graph.fail(PackageName("a")) == ["c"]
+    assert graph.complete(PackageName("b")) == []
+    assert graph.is_finished()
@@ -0,0 +1,294 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import threading
+import time
+
+from pathlib import Path
+from typing import Iterable
+from unittest.mock import MagicMock
+
+import pytest
+
+from pytest_mock import MockerFixture
+
+from robenv.deb.archive import InvalidDebError
+from robenv.environment.database import RobEnvDatabase
+from robenv.environment.env import DebName
+from robenv.environment.env import Installable
+from robenv.environment.run_command import CommandFailedError
+from robenv.ros_package.build_cache import BuildCache
+from robenv.ros_package.builder import Builder
+from robenv.ros_package.builder import BuildResult
+from robenv.ros_package.memory_history import BuildMemoryHistory
+from robenv.ros_package.package import PackageName
+from robenv.ros_package.package import ROSPackage
+from robenv.ros_package.workspace import ROSWorkspace
+from robenv.util.jobserver import Jobserver
+from robenv.util.pressure import AdaptiveConcurrency
+from robenv.util.pressure import SystemLoad
+from tests.unit.ros_package import create_package
+
+
+class RecordingBuilder(Builder):
+    def __init__(
+        self,
+        memory_history: BuildMemoryHistory | None = None,
+        memory_budget: int | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        build_cache: BuildCache | None = None,
+    ) -> None:
+        super().__init__(
+            MagicMock(ros_distro="noetic"),
+            Path("dist"),
+            overwrite=False,
+            max_workers=2,
+            checker=MagicMock(),
+            can_fail=True,
+            memory_history=memory_history,
+            memory_budget=memory_budget,
+            concurrency=concurrency,
+            build_cache=build_cache,
+        )
+        self.events: list[str] = []
+        self.release_install = threading.Event()
+        self.running: set[str] = set()
+        self.max_running = 0
+
+    def build_package(self, package: ROSPackage, dependencies: Iterable[PackageName] = ()) -> BuildResult:  # noqa: ARG002
+        self.events.append(f"build {package.name}")
+        self.running.add(package.name)
+        self.max_running = max(self.max_running, len(self.running))
+        try:
+            return self._fake_build(package)
+        finally:
+            self.running.discard(package.name)
+
+    def _fake_build(self, package: ROSPackage) -> BuildResult:
+        if package.name.startswith("big"):
+            time.sleep(0.05)
+        if package.name == "broken":
+            return BuildResult(failed_packages=[package.name])
+        if package.name == "slow":
+            # finishes only after the install of "a" started, proving builds and installs overlap
+            self.release_install.wait(timeout=5)
+        return BuildResult(installables=[Installable(package.name, DebName(f"{package.name}.deb"), Path())])
+
+    def _make_makefile(self, package: ROSPackage) -> None:
+        self.events.append(f"generate {package.name}")
+        if package.name == "unresolvable":
+            command = "bloom-generate"
+            raise CommandFailedError(command, 1, "")
+
+    def _install(self, package: ROSPackage, installable: Installable) -> bool:  # noqa: ARG002
+        self.events.append(f"install {package.name}")
+        self.release_install.set()
+        return package.name != "b"
+
+
+def test_build_workspace_should_install_while_other_builds_run(tmp_path: Path) -> None:
+    packages = [
+        create_package(tmp_path, "a", []),
+        create_package(tmp_path, "slow", []),
+        create_package(tmp_path, "b", ["a"]),
+    ]
+    builder = RecordingBuilder()
+
+    result = builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert builder.events.index("install a") < builder.events.index("build b")
+    assert set(builder.events) == {
+        *("generate a", "generate slow", "generate b"),
+        *("build a", "build slow", "build b"),
+        *("install a", "install slow", "install b"),
+    }
+    assert result.failed_packages == ["b"]
+
+
+def test_build_workspace_should_skip_dependents_of_failed_packages(tmp_path: Path) -> None:
+    packages = [
+        create_package(tmp_path, "a", []),
+        create_package(tmp_path, "b", ["a"]),
+        create_package(tmp_path, "c", ["b"]),
+        create_package(tmp_path, "broken", []),
+        create_package(tmp_path, "d", ["broken", "a"]),
+    ]
+    builder = RecordingBuilder()
+    builder.release_install.set()
+
+    result = builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert sorted(result.failed_packages) == ["b", "broken"]
+    assert result.skipped_packages == {"c": "b", "d": "broken"}
+    assert "build c" not in builder.events
+    assert "build d" not in builder.events
+
+
+def test_build_workspace_should_generate_debian_folders_up_front(
+    tmp_path: Path,
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch("robenv.ros_package.builder.write_log")
+    packages = [
+        create_package(tmp_path, "a", []),
+        create_package(tmp_path, "b", ["a"]),
+        create_package(tmp_path, "unresolvable", []),
+        create_package(tmp_path, "c", ["unresolvable"]),
+    ]
+    builder = RecordingBuilder()
+    builder.release_install.set()
+
+    result = builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert sorted(builder.events[:4]) == ["generate a", "generate b", "generate c", "generate unresolvable"]
+    assert "build unresolvable" not in builder.events
+    assert sorted(result.failed_packages) == ["b", "unresolvable"]
+    assert result.skipped_packages == {"c": "unresolvable"}
+
+
+def test_build_workspace_should_only_generate_debian_folders_for_cache_misses(tmp_path: Path) -> None:
+    packages = [create_package(tmp_path, "a", []), create_package(tmp_path, "b", ["a"])]
+    build_cache = MagicMock(spec=BuildCache)
+    build_cache.contains.side_effect = [True, False]
+    builder = RecordingBuilder(build_cache=build_cache)
+    builder.release_install.set()
+
+    builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert "generate a" not in builder.events
+    assert "generate b" in builder.events
+    assert build_cache.contains.call_count == len(packages)
+
+
+_CMAKE_RULES = (
+    "DEB_HOST_GNU_TYPE ?= $(shell dpkg-architecture -qDEB_HOST_GNU_TYPE)\n"
+    "\n"
+    "%:\n"
+    "\tdh $@ -v --buildsystem=cmake --builddirectory=.obj-$(DEB_HOST_GNU_TYPE)\n"
+    "\n"
+    "override_dh_auto_build:\n"
+    '\tif [ -f "/robenv/activate" ]; then . "/robenv/activate"; fi && \\\n'
+    "\tdh_auto_build\n"
+)
+
+
+def test_share_jobserver_should_let_cmake_make_inherit_the_jobserver() -> None:
+    shared = Builder._share_jobserver(_CMAKE_RULES)  # noqa: SLF001
+
+    assert "\t+dh $@ -v --buildsystem=cmake" in shared
+    assert shared.endswith("fi && \\\n\t$(MAKE) -C .obj-$(DEB_HOST_GNU_TYPE)\n")
+    assert "dh_auto_build\n" not in shared
+
+
+def test_share_jobserver_should_keep_other_build_systems() -> None:
+    rules = "%:\n\tdh $@ -v --buildsystem=pybuild\n\noverride_dh_auto_build:\n\tdh_auto_build\n"
+
+    assert Builder._share_jobserver(rules) == rules  # noqa: SLF001
+
+
+@pytest.mark.parametrize(("cpu_budget", "shared"), [(None, False), (2, True)])
+def test_generate_makefile_should_only_share_an_existing_jobserver(
+    tmp_path: Path,
+    cpu_budget: int | None,
+    shared: bool,  # noqa: FBT001
+) -> None:
+    package = create_package(tmp_path, "a", [])
+    (package.path / "debian").mkdir()
+    (package.path / "debian" / "rules").write_text(_CMAKE_RULES)
+    jobserver = Jobserver(cpu_budget) if cpu_budget is not None else None
+    builder = Builder(
+        MagicMock(ros_distro="noetic"),
+        tmp_path / "dist",
+        overwrite=False,
+        max_workers=1,
+        checker=MagicMock(),
+        can_fail=True,
+        jobserver=jobserver,
+    )
+
+    builder._generate_makefile(package)  # noqa: SLF001
+
+    rules = (package.path / "debian" / "rules").read_text()
+    assert ("\t+dh $@" in rules) is shared
+    assert ("\tdh_auto_build\n" in rules) is not shared
+    if jobserver is not None:
+        jobserver.close()
+
+
+@pytest.mark.parametrize(("memory_budget", "expected_concurrency"), [(1000, 1), (2000, 2)])
+def test_build_workspace_should_only_admit_builds_fitting_into_memory(
+    tmp_path: Path,
+    memory_budget: int,
+    expected_concurrency: int,
+) -> None:
+    packages = [create_package(tmp_path, name, []) for name in ("big_a", "big_b", "big_c")]
+    history = BuildMemoryHistory(RobEnvDatabase(tmp_path / "robenv.db"))
+    for package in packages:
+        history.record(package.name, 600)
+    builder = RecordingBuilder(history, memory_budget)
+    builder.release_install.set()
+
+    builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert builder.max_running == expected_concurrency
+
+
+@pytest.mark.parametrize(("load", "expected_concurrency"), [(SystemLoad.HIGH, 1), (SystemLoad.LOW, 2)])
+def test_build_workspace_should_adapt_concurrency_to_system_load(
+    tmp_path: Path,
+    load: SystemLoad,
+    expected_concurrency: int,
+) -> None:
+    packages = [create_package(tmp_path, name, []) for name in ("big_a", "big_b", "big_c")]
+    builder = RecordingBuilder(concurrency=AdaptiveConcurrency(2, interval=0, sample=lambda: load))
+    builder.release_install.set()
+
+    builder.build_workspace(ROSWorkspace(tmp_path, packages, []))
+
+    assert builder.max_running == expected_concurrency
+
+
+@pytest.mark.parametrize("error", [InvalidDebError(Path("a.deb"), "truncated ar member header"), OSError("disk full")])
+def test_install_should_count_unreadable_debs_as_failed(
+    tmp_path: Path,
+    mocker: MockerFixture,
+    error: Exception,
+) -> None:
+    write_log = mocker.patch("robenv.ros_package.builder.write_log")
+    robenv = MagicMock()
+    robenv.install.side_effect = error
+    builder = Builder(robenv, Path("dist"), overwrite=False, max_workers=1, checker=MagicMock(), can_fail=True)
+    package = create_package(tmp_path, "a", [])
+
+    assert not builder._install(package, Installable(package.name, DebName("a.deb"), Path("a.deb")))  # noqa: SLF001
+    write_log.assert_called_once_with(robenv.path, "a", str(error))
@@ -0,0 +1,90 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+from robenv.ros_package.compiler_cache import CompilerCache
+from robenv.ros_package.compiler_cache import CompilerCacheStatistics
+
+
+def test_use_in_rules_should_add_compiler_launchers() -> None:
+    rules = (
+        "%:\n"
+        "\tdh $@ -v --buildsystem=cmake --builddirectory=.obj-$(DEB_HOST_GNU_TYPE)\n"
+        "\n"
+        "override_dh_auto_configure:\n"
+        '\tif [ -f "/robenv/activate" ]; then . "/robenv/activate"; fi && \\\n'
+        "\tdh_auto_configure -- \\\n"
+        '\t\t-DCMAKE_INSTALL_PREFIX="/opt/ros/noetic" \\\n'
+        "\t\t$(BUILD_TESTING_ARG)\n"
+    )
+
+    assert CompilerCache.use_in_rules(rules).endswith(
+        "\tdh_auto_configure -- \\\n"
+        "\t\t-DCMAKE_C_COMPILER_LAUNCHER=ccache \\\n"
+        "\t\t-DCMAKE_CXX_COMPILER_LAUNCHER=ccache \\\n"
+        '\t\t-DCMAKE_INSTALL_PREFIX="/opt/ros/noetic" \\\n'
+        "\t\t$(BUILD_TESTING_ARG)\n",
+    )
+
+
+def test_use_in_rules_should_keep_other_build_systems() -> None:
+    rules = "%:\n\tdh $@ -v --buildsystem=pybuild\n\noverride_dh_auto_configure:\n\tdh_auto_configure -- \\\n"
+
+    assert CompilerCache.use_in_rules(rules) == rules
+
+
+def test_read_statistics_should_count_logged_results(tmp_path: Path) -> None:
+    statistics_log = tmp_path / "ccache.log"
+    statistics_log.write_text(
+        "# /ws/a/src/a.cpp\ndirect_cache_hit\n"
+        "# /ws/a/src/b.cpp\ncache_miss\n"
+        "# /ws/a/src/c.cpp\npreprocessed_cache_hit\n"
+        "# /ws/a/src/d.cpp\ncalled_for_link\n",
+    )
+
+    assert CompilerCache.read_statistics(statistics_log) == CompilerCacheStatistics(hits=2, misses=1)
+
+
+def test_read_statistics_should_handle_missing_log(tmp_path: Path) -> None:
+    assert CompilerCache.read_statistics(tmp_path / "ccache.log") == CompilerCacheStatistics()
+
+
+def test_get_environment_should_point_ccache_to_the_robenv(tmp_path: Path) -> None:
+    compiler_cache = CompilerCache(tmp_path / "ccache", 5 * 1024 * 1024 * 1024)
+
+    environment = compiler_cache.get_environment(tmp_path / "ccache.log")
+
+    assert environment["CCACHE_DIR"] == str(tmp_path / "ccache")
+    assert environment["CCACHE_MAXSIZE"] == "5242880Ki"
+    assert environment["CCACHE_STATSLOG"] == str(tmp_path / "ccache.log")
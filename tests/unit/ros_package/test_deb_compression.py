@@ -0,0 +1,78 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from robenv.deb.archive import read_deb
+from robenv.environment.run_command import run_command
+from robenv.ros_package.deb_compression import DebCompression
+
+
+def test_use_in_rules_should_pass_compression_to_dpkg_deb() -> None:
+    rules = "%:\n\tdh $@ -v --buildsystem=cmake\n"
+
+    assert DebCompression.ZSTD.use_in_rules(rules) == (
+        "%:\n\tdh $@ -v --buildsystem=cmake\n\noverride_dh_builddeb:\n\tdh_builddeb -- -Zzstd\n"
+    )
+
+
+def test_use_in_rules_should_keep_existing_override() -> None:
+    rules = "%:\n\tdh $@\n\noverride_dh_builddeb:\n\tdh_builddeb -- -Zgzip\n"
+
+    assert DebCompression.NONE.use_in_rules(rules) == rules
+
+
+@pytest.mark.skipif(shutil.which("dpkg-deb") is None, reason="needs dpkg-deb")
+@pytest.mark.parametrize("compression", list(DebCompression))
+def test_built_debs_should_be_readable(tmp_path: Path, compression: DebCompression) -> None:
+    root = tmp_path / "example"
+    (root / "DEBIAN").mkdir(parents=True)
+    (root / "DEBIAN" / "control").write_text(
+        "Package: example\nVersion: 1.0.0\nArchitecture: all\nMaintainer: robenv\nDescription: example\n",
+    )
+    (root / "usr" / "share").mkdir(parents=True)
+    (root / "usr" / "share" / "example.txt").write_text("example\n" * 1000)
+
+    run_command(
+        f"dpkg-deb --build --root-owner-group {compression.dpkg_deb_arguments} {root} {tmp_path / 'example.deb'}",
+        env={**os.environ, **compression.get_environment()},
+    )
+    deb = read_deb(tmp_path / "example.deb", extract_to=tmp_path / "extracted")
+
+    assert deb.control["package"] == "example"
+    assert (tmp_path / "extracted" / "usr" / "share" / "example.txt").read_text() == "example\n" * 1000
@@ -0,0 +1,106 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+
+from pathlib import Path
+
+from robenv.ros_package.build_cache import Fingerprint
+from robenv.ros_package.debian_cache import DebianCache
+from robenv.ros_package.debian_cache import compute_debian_fingerprint
+from robenv.ros_package.package import ROSPackage
+from tests.unit.ros_package import create_package
+
+
+def test_debian_fingerprint_should_change_with_bloom_inputs(tmp_path: Path) -> None:
+    package = create_package(tmp_path, "a", ["b"])
+    rosdep_file = tmp_path / "rosdep.yaml"
+    rosdep_file.write_text("b: {ubuntu: [ros-noetic-b]}")
+    sources_index = tmp_path / "index"
+
+    fingerprint = compute_debian_fingerprint(package, rosdep_file, sources_index, "noetic")
+
+    assert fingerprint == compute_debian_fingerprint(package, rosdep_file, sources_index, "noetic")
+    assert fingerprint != compute_debian_fingerprint(package, rosdep_file, sources_index, "humble")
+
+    rosdep_file.write_text("b: {ubuntu: [ros-noetic-other-b]}")
+    assert fingerprint != compute_debian_fingerprint(package, rosdep_file, sources_index, "noetic")
+
+    rosdep_file.write_text("b: {ubuntu: [ros-noetic-b]}")
+    (package.path / "package.xml").write_text(
+        '<package format="2"><name>a</name><version>1.0.0</version><build_depend>b</build_depend></package>',
+    )
+    changed = ROSPackage.from_project(package.path)
+    assert fingerprint != compute_debian_fingerprint(changed, rosdep_file, sources_index, "noetic")
+
+
+def test_debian_cache_should_restore_stored_folder(tmp_path: Path) -> None:
+    cache = DebianCache(tmp_path / "cache", max_size=1024)
+    package = create_package(tmp_path, "a", [])
+    fingerprint = compute_debian_fingerprint(package, tmp_path / "rosdep.yaml", tmp_path / "index")
+    debian_folder = package.path / "debian"
+    (debian_folder / "source").mkdir(parents=True)
+    (debian_folder / "rules").write_text("rules")
+    (debian_folder / "source/format").write_text("3.0 (quilt)")
+
+    assert not cache.restore(fingerprint, debian_folder)
+    cache.store(fingerprint, debian_folder)
+
+    (debian_folder / "rules").write_text("leftover")
+    (debian_folder / "build-artifact").touch()
+
+    assert cache.restore(fingerprint, debian_folder)
+    assert sorted(str(p.relative_to(debian_folder)) for p in debian_folder.rglob("*")) == [
+        "rules",
+        "source",
+        "source/format",
+    ]
+    assert (debian_folder / "rules").read_text() == "rules"
+    assert list((tmp_path / "cache").iterdir()) == [tmp_path / "cache" / fingerprint]
+
+
+def test_debian_cache_should_evict_least_recently_used(tmp_path: Path) -> None:
+    cache = DebianCache(tmp_path / "cache", max_size=20)
+    debian_folder = tmp_path / "debian"
+    debian_folder.mkdir()
+    (debian_folder / "rules").write_text("0123456789")
+
+    cache.store(Fingerprint("old"), debian_folder)
+    os.utime(tmp_path / "cache" / "old", (0, 0))
+    cache.store(Fingerprint("used"), debian_folder)
+    os.utime(tmp_path / "cache" / "used", (1, 1))
+    assert cache.restore(Fingerprint("used"), tmp_path / "restored")
+
+    cache.store(Fingerprint("new"), debian_folder)
+
+    assert sorted(entry.name for entry in (tmp_path / "cache").iterdir()) == ["new", "used"]
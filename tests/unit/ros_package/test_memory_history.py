@@ -0,0 +1,54 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+from robenv.environment.database import RobEnvDatabase
+from robenv.ros_package.memory_history import BuildMemoryHistory
+from robenv.ros_package.package import PackageName
+
+
+def test_memory_history_should_predict_from_previous_builds(tmp_path: Path) -> None:
+    database = RobEnvDatabase(tmp_path / "robenv.db")
+    history = BuildMemoryHistory(database)
+
+    assert history.predict(PackageName("a")) == 0
+
+    history.record(PackageName("a"), 1000)
+    history.record(PackageName("b"), 3000)
+    history.record(PackageName("a"), 2000)
+
+    reloaded = BuildMemoryHistory(database)
+    assert reloaded.predict(PackageName("a")) == 2000  # noqa: PLR2004
+    assert reloaded.predict(PackageName("b")) == 3000  # noqa: PLR2004
+    assert reloaded.predict(PackageName("new")) == 2500  # noqa: PLR2004
@@ -0,0 +1,66 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import dataclasses
+
+from pathlib import Path
+
+import pytest
+
+from robenv.ros_package.package import ROSPackage
+
+
+def test_ros_package_should_extract_dependency_sets(tmp_path: Path) -> None:
+    (tmp_path / "package.xml").write_text(
+        '<package format="2"><name>a</name><version>1.2.3</version>'
+        "<depend>roscpp</depend><build_depend>cmake</build_depend><build_depend>roscpp</build_depend>"
+        "<exec_depend>rospy</exec_depend><export><metapackage/></export></package>",
+    )
+
+    package = ROSPackage.from_project(tmp_path)
+
+    assert package.name == "a"
+    assert package.version == "1.2.3"
+    assert package.get_build_dependencies() == {"roscpp", "cmake"}
+    assert package.get_exec_dependencies() == {"roscpp", "rospy"}
+    assert package.is_metapackage()
+
+
+def test_ros_package_should_be_immutable(tmp_path: Path) -> None:
+    (tmp_path / "package.xml").write_text('<package format="2"><name>a</name><version>0.0.0</version></package>')
+
+    package = ROSPackage.from_project(tmp_path)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        package.version = "1.0.0"  # type: ignore[misc]
+    assert not hasattr(package, "__dict__")
@@ -0,0 +1,77 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from robenv.ros_package.package import ROSPackage
+from robenv.ros_package.package_cache import PackageCache
+from tests.unit.ros_package import create_package
+
+
+def test_package_cache_should_only_parse_changed_manifests(tmp_path: Path, mocker: MockerFixture) -> None:
+    cache_file = tmp_path / "cache/packages.json"
+    expected = create_package(tmp_path, "a", ["b"])
+    first_cache = PackageCache(cache_file)
+    first_cache.get(expected.path)
+    first_cache.save()
+
+    parse = mocker.spy(ROSPackage, "from_project")
+    cache = PackageCache(cache_file)
+
+    assert cache.get(expected.path) == expected
+    parse.assert_not_called()
+
+    (expected.path / "package.xml").write_text(
+        '<package format="2"><name>a</name><version>1.0.0</version><depend>c</depend></package>',
+    )
+
+    changed = cache.get(expected.path)
+
+    parse.assert_called_once()
+    assert changed.version == "1.0.0"
+    assert changed.get_build_dependencies() == {"c"}
+    assert changed.get_exec_dependencies() == {"c"}
+
+
+def test_package_cache_should_ignore_broken_cache_files(tmp_path: Path) -> None:
+    cache_file = tmp_path / "packages.json"
+    cache_file.write_text("{broken")
+    package = create_package(tmp_path, "a", [])
+
+    cache = PackageCache(cache_file)
+
+    assert cache.get(package.path) == package
+    cache.save()
+    assert PackageCache(cache_file).get(package.path) == package
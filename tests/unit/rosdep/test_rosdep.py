@@ -31,17 +31,24 @@
 #
 from __future__ import annotations
 
+import shutil
+
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
 from robenv.catkin_profile.profile import CatkinProfile
 from robenv.environment.distro import RosDistribution
+from robenv.environment.distro import parse_distro
 from robenv.ros_package.workspace import ROSWorkspace
+from robenv.rosdep.rosdep import NotResolvablePackageError
 from robenv.rosdep.rosdep import ResolvedPackageName
 from robenv.rosdep.rosdep import Rosdep
 from robenv.rosdep.rosdep import RosDepDict
 from robenv.rosdep.rosdep import SystemName
+from robenv.rosdep.rosdep import get_sources_cache
+from robenv.rosdep.rosdep import get_sources_list
 
 
 @pytest.fixture()
@@ -78,3 +85,34 @@ def test_generate_should_give_dict_to_workspace(
     )
 
     assert rosdep == expected_rosdep
+
+
+@pytest.fixture()
+def mocked_rosdep(tmp_path: Path, resources: Path, monkeypatch: pytest.MonkeyPatch) -> Rosdep:
+    monkeypatch.setenv("ROS_OS_OVERRIDE", "ubuntu:20.04:focal")
+
+    rosdep_yml = tmp_path / "robenv/rosdep.yaml"
+    rosdep_yml.parent.mkdir(parents=True)
+    rosdep_yml.write_text("{}\n")
+
+    sources_list = get_sources_list(tmp_path)
+    sources_list.parent.mkdir(parents=True)
+    sources_list.write_text(f"yaml file://{rosdep_yml}")
+
+    shutil.copytree(resources / "rosdep_mocks/sources.cache", get_sources_cache(tmp_path))
+
+    return Rosdep(tmp_path, MagicMock(), parse_distro("humble"))
+
+
+def test_resolve_all_should_resolve_in_process(mocked_rosdep: Rosdep) -> None:
+    result = mocked_rosdep.resolve_all(["adder", "python3-yaml", "not-existing"])
+
+    assert result.resolved == {"adder": "ros-humble-adder", "python3-yaml": "python3-yaml"}
+    assert result.unresolvable == ["not-existing"]
+
+
+def test_resolve_should_raise_on_unknown_key(mocked_rosdep: Rosdep) -> None:
+    assert mocked_rosdep.resolve("adder") == "ros-humble-adder"
+
+    with pytest.raises(NotResolvablePackageError):
+        mocked_rosdep.resolve("not-existing")
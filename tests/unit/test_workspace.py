@@ -40,6 +40,7 @@ from robenv.ros_package.package import PackageName
 from robenv.ros_package.workspace import ROSWorkspace
 from tests.conftest import ROS_1_PROJECT_LIST
 from tests.conftest import ROS_2_PROJECT_LIST
+from tests.unit.ros_package import create_package
 
 
 @pytest.fixture(params=["example_project_ros1", "example_project_ros2"])
@@ -163,3 +164,54 @@ def test_ros_workspace_should_give_correct_build_tree(workspace: ROSWorkspace) -
     assert len(tree) == expected_tree_levels
     assert [item.name for item in tree[0]] == first_level
     assert [item.name for item in tree[1]] == ["client", "python_server", "server"]
+
+
+def test_ros_workspace_should_order_deep_dependency_chains(tmp_path: Path) -> None:
+    package_count = 10_000
+    # every package depends on its predecessor and on the root, giving one stage per package
+    packages = [create_package(tmp_path, "p0", [])]
+    packages += [create_package(tmp_path, f"p{i}", [f"p{i - 1}", "p0"]) for i in range(1, package_count)]
+    packages.reverse()
+
+    workspace = ROSWorkspace(tmp_path, packages, [])
+
+    assert [p.name for p in workspace.sort_ros_packages_for_installation()] == [f"p{i}" for i in range(package_count)]
+    assert len(workspace.get_install_tree()) == package_count
+
+
+def test_ros_workspace_should_prune_ignored_directories(tmp_path: Path) -> None:
+    for directory in [
+        "src/a",
+        "src/a/test/nested",
+        "src/ignored/b",
+        "src/colcon_ignored",
+        "build/c",
+        ".git/d",
+        "robenv/robenv",
+        "robenv/opt/ros/noetic/share/e",
+    ]:
+        (tmp_path / directory).mkdir(parents=True)
+    for package in ["src/a", "src/a/test/nested", "src/ignored/b", "src/colcon_ignored", "build/c", ".git/d"]:
+        (tmp_path / package / "package.xml").touch()
+    (tmp_path / "robenv/opt/ros/noetic/share/e/package.xml").touch()
+    (tmp_path / "robenv/robenv/robenv.db").touch()
+    (tmp_path / "src/ignored/CATKIN_IGNORE").touch()
+    (tmp_path / "src/colcon_ignored/COLCON_IGNORE").touch()
+
+    assert ROSWorkspace._get_project_packages_paths(tmp_path) == [tmp_path / "src/a"]  # noqa: SLF001
+
+
+def test_ros_workspace_should_find_packages_behind_symlinks_once(tmp_path: Path) -> None:
+    (tmp_path / "src/a").mkdir(parents=True)
+    (tmp_path / "src/a/package.xml").touch()
+    (tmp_path / "external/b").mkdir(parents=True)
+    (tmp_path / "external/b/package.xml").touch()
+    (tmp_path / "src/loop").symlink_to(tmp_path / "src")
+    (tmp_path / "src/a_again").symlink_to(tmp_path / "src/a")
+    (tmp_path / "src/b").symlink_to(tmp_path / "external/b")
+    (tmp_path / "src/self").symlink_to("self")
+
+    assert ROSWorkspace._get_project_packages_paths(tmp_path / "src") == [  # noqa: SLF001
+        tmp_path / "src/a",
+        tmp_path / "src/b",
+    ]
@@ -0,0 +1,71 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from robenv.environment.run_command import run_command
+from robenv.util.jobserver import Jobserver
+
+
+def test_jobserver_should_hand_out_each_slot_once() -> None:
+    with Jobserver(2) as jobserver, jobserver.token(), jobserver.token():
+        read_fd, _ = jobserver.file_descriptors
+        os.set_blocking(read_fd, False)
+        with pytest.raises(BlockingIOError):
+            os.read(read_fd, 1)
+        os.set_blocking(read_fd, True)
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="needs GNU make")
+def test_jobserver_should_limit_parallel_make_jobs(tmp_path: Path) -> None:
+    targets = " ".join(f"job{i}" for i in range(6))
+    (tmp_path / "Makefile").write_text(
+        f"all: {targets}\njob%:\n\t@touch $@.running; ls *.running | wc -l >> counts; sleep 0.2; rm $@.running\n",
+    )
+
+    with Jobserver(3) as jobserver, jobserver.token():
+        output = run_command(
+            "make",
+            cwd=tmp_path,
+            env={**os.environ, **jobserver.get_environment()},
+            pass_fds=jobserver.file_descriptors,
+        )
+
+    counts = [int(count) for count in (tmp_path / "counts").read_text().split()]
+    assert "warning" not in output
+    assert max(counts) == 3  # noqa: PLR2004
@@ -0,0 +1,70 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+
+from pathlib import Path
+
+from robenv.util.memory import get_available_memory
+from robenv.util.memory import get_process_tree_rss
+
+
+def test_get_available_memory_should_read_meminfo(tmp_path: Path) -> None:
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       16303572 kB\nMemFree:         1145232 kB\nMemAvailable:    9523412 kB\n")
+
+    assert get_available_memory(meminfo) == 9523412 * 1024
+
+
+def test_get_available_memory_should_handle_missing_information(tmp_path: Path) -> None:
+    meminfo = tmp_path / "meminfo"
+
+    assert get_available_memory(meminfo) is None
+    meminfo.write_text("MemTotal:       16303572 kB\n")
+    assert get_available_memory(meminfo) is None
+
+
+def _write_stat(proc: Path, pid: int, parent: int, rss_pages: int) -> None:
+    (proc / str(pid)).mkdir()
+    fields = ["S", str(parent), *["0"] * 19, str(rss_pages)]
+    (proc / str(pid) / "stat").write_text(f"{pid} (make (jobs)) {' '.join(fields)} 0 0\n")
+
+
+def test_get_process_tree_rss_should_sum_up_descendants(tmp_path: Path) -> None:
+    _write_stat(tmp_path, 10, 1, 1)
+    _write_stat(tmp_path, 11, 10, 2)
+    _write_stat(tmp_path, 12, 11, 4)
+    _write_stat(tmp_path, 20, 1, 8)
+    (tmp_path / "meminfo").touch()
+
+    assert get_process_tree_rss(10, tmp_path) == 7 * os.sysconf("SC_PAGE_SIZE")
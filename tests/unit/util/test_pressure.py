@@ -0,0 +1,102 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+
+from robenv.util.pressure import AdaptiveConcurrency
+from robenv.util.pressure import SystemLoad
+from robenv.util.pressure import read_pressure
+from robenv.util.pressure import sample_system_load
+
+
+def _write_pressure(pressure_path: Path, resource: str, some: float, full: float = 0.0) -> None:
+    pressure_path.mkdir(exist_ok=True)
+    (pressure_path / resource).write_text(
+        f"some avg10={some:.2f} avg60=0.00 avg300=0.00 total=0\n"
+        f"full avg10={full:.2f} avg60=0.00 avg300=0.00 total=0\n",
+    )
+
+
+def test_read_pressure_should_read_avg10(tmp_path: Path) -> None:
+    some, full = 12.5, 3.25
+    _write_pressure(tmp_path, "cpu", some, full)
+
+    assert read_pressure("cpu", pressure_path=tmp_path) == some
+    assert read_pressure("cpu", "full", pressure_path=tmp_path) == full
+    assert read_pressure("memory", pressure_path=tmp_path) is None
+
+
+def test_sample_system_load_should_use_pressure(tmp_path: Path) -> None:
+    _write_pressure(tmp_path, "cpu", 5.0)
+    _write_pressure(tmp_path, "memory", 0.0)
+    assert sample_system_load(tmp_path) is SystemLoad.LOW
+
+    _write_pressure(tmp_path, "cpu", 20.0)
+    assert sample_system_load(tmp_path) is SystemLoad.NORMAL
+
+    _write_pressure(tmp_path, "memory", 10.0)
+    assert sample_system_load(tmp_path) is SystemLoad.HIGH
+
+
+def test_sample_system_load_should_fall_back_to_load_average(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch("robenv.util.pressure.get_cpu_count", return_value=4)
+    getloadavg = mocker.patch("robenv.util.pressure.os.getloadavg", return_value=(8.0, 0.0, 0.0))
+
+    assert sample_system_load(tmp_path) is SystemLoad.HIGH
+    getloadavg.return_value = (1.0, 0.0, 0.0)
+    assert sample_system_load(tmp_path) is SystemLoad.LOW
+
+
+def test_adaptive_concurrency_should_grow_slowly_and_shrink_fast() -> None:
+    now = 0.0
+    loads = [SystemLoad.LOW, SystemLoad.LOW, SystemLoad.NORMAL, SystemLoad.HIGH]
+    concurrency = AdaptiveConcurrency(8, interval=10, sample=lambda: loads.pop(0), clock=lambda: now)
+    assert concurrency.limit == 8 // 2
+
+    limits = []
+    for _ in range(4):
+        now += 10
+        limits.append(concurrency.update())
+
+    assert limits == [5, 6, 6, 3]
+
+
+def test_adaptive_concurrency_should_only_sample_once_per_interval() -> None:
+    sample = MagicMock(return_value=SystemLoad.LOW)
+    concurrency = AdaptiveConcurrency(2, interval=10, sample=sample, clock=lambda: 5)
+
+    assert concurrency.update() == 1
+    sample.assert_not_called()